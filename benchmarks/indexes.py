@@ -0,0 +1,87 @@
+"""
+Show query plans and timings of payment queries without and with indexes.
+
+Synthetic payment history is generated first. The queries are then measured with
+the migration adding indexes unapplied and applied.
+
+Usage: python -m benchmarks.indexes [--payments N] [--repeat N]
+
+Use DJANGO_SETTINGS_MODULE to run the benchmark against other database than
+in-memory SQLite. Benchmark data are written to the configured database.
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from typing import Callable, Dict, List
+
+from benchmarks.utils import create_payments, setup_django
+
+WITHOUT_INDEXES = '0010_bankpayment_claim'
+WITH_INDEXES = '0011_bankpayment_indexes'
+
+
+def get_queries() -> Dict[str, Callable]:
+    """Return querysets measured by the benchmark."""
+    from django_pain.constants import PaymentState
+    from django_pain.models import BankPayment
+
+    pending = BankPayment.objects.filter(state__in=[PaymentState.IMPORTED, PaymentState.DEFERRED])
+    return {
+        'process_payments chunk': lambda: pending.order_by('pk')[:1000],
+        'process_payments time range': lambda: pending.filter(create_time__gte=date(2018, 1, 1)).order_by('pk')[:1000],
+        'admin state filter': lambda: BankPayment.objects.filter(state=PaymentState.DEFERRED).order_by('-pk')[:100],
+        'admin account and date filter': lambda: BankPayment.objects.filter(
+            account__account_name='Account 1', transaction_date__gte=date(2018, 1, 1),
+            transaction_date__lt=date(2018, 2, 1)).order_by('-pk')[:100],
+        'admin date filter': lambda: BankPayment.objects.filter(
+            transaction_date__gte=date(2018, 1, 1), transaction_date__lt=date(2018, 1, 8)).order_by('-pk')[:100],
+    }
+
+
+def explain(queryset) -> List[str]:
+    """Return query plan of the queryset."""
+    from django.db import connection
+
+    prefix = {'sqlite': 'EXPLAIN QUERY PLAN', 'postgresql': 'EXPLAIN ANALYZE'}.get(connection.vendor, 'EXPLAIN')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('{} {}'.format(prefix, sql), params)
+        return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+def measure(repeat: int) -> None:
+    """Print query plans and timings of all queries."""
+    for name, get_queryset in sorted(get_queries().items()):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(get_queryset())
+            durations.append(time.perf_counter() - start)
+        print('  {}: best of {} {:.2f} ms'.format(name, repeat, min(durations) * 1000))
+        for line in explain(get_queryset()):
+            print('      ' + line)
+
+
+def main() -> None:
+    """Generate payments and measure queries without and with indexes."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--payments', type=int, default=2000000, help='number of generated payments')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions of each query')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    call_command('migrate', 'django_pain', WITHOUT_INDEXES, verbosity=0)
+    print('Generating {} payments...'.format(args.payments), file=sys.stderr)
+    create_payments(args.payments)
+
+    for title, migration in (('Without indexes', WITHOUT_INDEXES), ('With indexes', WITH_INDEXES)):
+        call_command('migrate', 'django_pain', migration, verbosity=0)
+        print(title)
+        measure(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Parsers used in benchmarks."""
+from datetime import datetime
+from typing import Dict
+
+from djmoney.money import Money
+
+from benchmarks.utils import ACCOUNT_BANK_CODE
+from django_pain.models import BankPayment
+from django_pain.parsers.common import PaymentFactory
+from django_pain.parsers.gpc import GpcStatementParser
+from django_pain.parsers.transproc import StreamingTransprocXMLParser, none_to_str
+
+
+class ReferenceTransprocXMLParser(StreamingTransprocXMLParser):
+    """
+    Streaming transproc parser creating payments by model constructor.
+
+    Reference implementation for comparison with the optimized payment creation.
+    """
+
+    def _get_payment(self, attrs: Dict[str, str], factory: PaymentFactory) -> BankPayment:
+        """Create bank payment from item attributes."""
+        return BankPayment(
+            identifier=attrs['ident'],
+            account=factory.account,
+            transaction_date=datetime.strptime(attrs['date'], '%Y-%m-%d'),
+            counter_account_number=self.compose_account_number(attrs['account_number'], attrs['account_bank_code']),
+            counter_account_name=none_to_str(attrs['name']),
+            amount=Money(attrs['price'], factory.account.currency),
+            description=none_to_str(attrs['memo']),
+            constant_symbol=none_to_str(attrs['const_symbol']),
+            variable_symbol=none_to_str(attrs['var_symbol']),
+            specific_symbol=none_to_str(attrs['spec_symbol']),
+        )
+
+
+class BenchmarkGpcStatementParser(GpcStatementParser):
+    """GPC parser of statements of the benchmark account."""
+
+    bank_code = ACCOUNT_BANK_CODE
@@ -0,0 +1,60 @@
+"""Payment processors used in benchmarks."""
+from typing import List
+
+from django_pain.processors import AbstractPaymentProcessor, ProcessPaymentResult
+
+
+class BenchmarkPaymentProcessor(AbstractPaymentProcessor):
+    """Processor which recognizes payments with even variable symbol."""
+
+    default_objective = 'Benchmark'
+
+    def process_payments(self, payments):
+        """Process payments with even variable symbol."""
+        return [ProcessPaymentResult(result=payment.variable_symbol[-1:] in '02468', objective='Benchmark')
+                for payment in payments]
+
+    def assign_payment(self, payment, client_id):
+        """Assign any payment."""
+        return ProcessPaymentResult(result=True, objective='Benchmark')
+
+
+class AccountPaymentProcessor(BenchmarkPaymentProcessor):
+    """Processor which recognizes payments of a single account with even variable symbol."""
+
+    use_snapshots = True
+    account_number = ''
+    # Number of payments received by all account processors.
+    received = 0
+
+    def process_payments(self, payments):
+        """Process payments of the account with even variable symbol."""
+        payments = list(payments)
+        AccountPaymentProcessor.received += len(payments)
+        return [ProcessPaymentResult(result=payment.account_number == self.account_number
+                                     and payment.variable_symbol[-1:] in '02468', objective='Benchmark')
+                for payment in payments]
+
+
+class FilteredAccountPaymentProcessor(AccountPaymentProcessor):
+    """Processor which recognizes payments of a single account and receives only payments of the account."""
+
+    @property
+    def accounts(self):
+        """Return account number as the only selected account."""
+        return [self.account_number]
+
+
+def get_account_processors(accounts: int, filtered: bool) -> List[str]:
+    """
+    Define processors of benchmark accounts (see ``benchmarks.utils.create_payments``).
+
+    Return paths of the processors for processors setting.
+    """
+    base = FilteredAccountPaymentProcessor if filtered else AccountPaymentProcessor
+    paths = []
+    for index in range(accounts):
+        name = '{}{}'.format(base.__name__, index)
+        globals()[name] = type(name, (base,), {'account_number': '{}/0300'.format(100000 + index)})
+        paths.append('{}.{}'.format(__name__, name))
+    return paths
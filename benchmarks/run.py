@@ -0,0 +1,343 @@
+"""
+Run benchmarks of import and processing hot paths.
+
+Each benchmark runs in a separate process, so the reported peak resident set size
+belongs to that benchmark only. Results are written as JSON.
+
+Usage: python -m benchmarks.run [--size N] [--output FILE] [BENCHMARK ...]
+
+See benchmarks.settings for database configuration.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from io import StringIO
+from typing import IO, Any, Callable, Dict
+
+import django
+
+from benchmarks.utils import (STATEMENT_DATE, create_account, create_payments, generate_items, setup_django,
+                              write_camt053_statement, write_csv_statement, write_gpc_statement,
+                              write_transproc_statement)
+
+
+class QueryCounter(object):
+    """Database execute wrapper counting queries."""
+
+    def __init__(self):
+        """Initialize counter with zero queries."""
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Count database query."""
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(items: int, function: Callable[[], Any]) -> Dict[str, Any]:
+    """Run function and return its timing and number of queries."""
+    from django.db import connection
+
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+    return OrderedDict([
+        ('items', items),
+        ('seconds', duration),
+        ('items_per_second', items / duration),
+        ('ms_per_item', duration * 1000 / items),
+        ('queries', counter.count),
+    ])
+
+
+def parse_statement(parser_path: str, size: int,
+                    write: Callable[[IO[str], int], None] = write_transproc_statement) -> Dict[str, Any]:
+    """Measure parsing of statement written by ``write`` by parser."""
+    from django.utils import module_loading
+
+    create_account()
+    parser = module_loading.import_string(parser_path)()
+    with tempfile.NamedTemporaryFile('w') as statement:
+        write(statement, size)
+        statement.flush()
+        with open(statement.name, 'rb') as handle:
+            return measure(size, lambda: sum(1 for _ in parser.parse(handle)))
+
+
+def bench_parse_tree(size: int) -> Dict[str, Any]:
+    """Measure TransprocXMLParser.parse."""
+    return parse_statement('django_pain.parsers.transproc.TransprocXMLParser', size)
+
+
+def bench_parse_streaming(size: int) -> Dict[str, Any]:
+    """Measure StreamingTransprocXMLParser.parse."""
+    return parse_statement('django_pain.parsers.transproc.StreamingTransprocXMLParser', size)
+
+
+def bench_parse_reference(size: int) -> Dict[str, Any]:
+    """Measure streaming parser creating payments by model constructor."""
+    return parse_statement('benchmarks.parsers.ReferenceTransprocXMLParser', size)
+
+
+def bench_parse_csv(size: int) -> Dict[str, Any]:
+    """Measure CsvStatementParser.parse."""
+    return parse_statement('django_pain.parsers.csv.CsvStatementParser', size, write_csv_statement)
+
+
+def bench_parse_gpc(size: int) -> Dict[str, Any]:
+    """Measure GpcStatementParser.parse."""
+    return parse_statement('benchmarks.parsers.BenchmarkGpcStatementParser', size, write_gpc_statement)
+
+
+def bench_parse_camt053(size: int) -> Dict[str, Any]:
+    """Measure Camt053StatementParser.parse."""
+    return parse_statement('django_pain.parsers.camt.Camt053StatementParser', size, write_camt053_statement)
+
+
+def create_payments_amounts(size: int, reference: bool) -> Dict[str, Any]:
+    """
+    Measure creation and validation of payments as done by parsers and import_payments command.
+
+    Reference creates payments with money amounts and validates amount by money field.
+    """
+    from django.core.exceptions import ValidationError
+    from django.db.models import Model
+    from djmoney.money import Money
+
+    from django_pain.parsers import PaymentFactory
+
+    factory = PaymentFactory(create_account())
+    prices = [item['price'] for item in generate_items(size)]
+
+    def create():
+        for index, price in enumerate(prices):
+            if reference:
+                payment = factory(identifier=str(index), transaction_date=STATEMENT_DATE,
+                                  counter_account_number='123/0300', amount=Money(price, factory.account.currency))
+                Model.clean_fields(payment, exclude=['account'])
+                if payment.account.currency != payment.amount.currency.code:
+                    raise ValidationError('Different currency.')
+            else:
+                payment = factory(identifier=str(index), transaction_date=STATEMENT_DATE,
+                                  counter_account_number='123/0300', amount=Decimal(price))
+                payment.full_clean(exclude=['account'], validate_unique=False)
+
+    return measure(size, create)
+
+
+def bench_payment_amounts(size: int) -> Dict[str, Any]:
+    """Measure creation and validation of payments with decimal amounts."""
+    return create_payments_amounts(size, reference=False)
+
+
+def bench_payment_amounts_reference(size: int) -> Dict[str, Any]:
+    """Measure creation and validation of payments with money amounts."""
+    return create_payments_amounts(size, reference=True)
+
+
+def import_statement(size: int, compress: bool) -> Dict[str, Any]:
+    """Measure import_payments command with plain or gzip compressed statement."""
+    from django.core.management import call_command
+
+    create_account()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'statement.xml.gz' if compress else 'statement.xml')
+        with (gzip.open(path, 'wt') if compress else open(path, 'w')) as output:
+            write_transproc_statement(output, size)
+        return measure(size, lambda: call_command(
+            'import_payments', '--parser=django_pain.parsers.transproc.StreamingTransprocXMLParser', path,
+            verbosity=0))
+
+
+def bench_import_payments(size: int) -> Dict[str, Any]:
+    """Measure import_payments command."""
+    return import_statement(size, compress=False)
+
+
+def bench_import_gzip(size: int) -> Dict[str, Any]:
+    """Measure import_payments command with gzip compressed statement."""
+    return import_statement(size, compress=True)
+
+
+def reimport_statement(size: int, journal: bool) -> Dict[str, Any]:
+    """Measure import_payments command with statement whose payments have already been imported."""
+    from django.core.management import call_command
+
+    from django_pain.models import BankStatement
+
+    create_account()
+    with tempfile.NamedTemporaryFile('w', suffix='.xml') as statement:
+        write_transproc_statement(statement, size)
+        statement.flush()
+        options = ['import_payments', '--parser=django_pain.parsers.transproc.StreamingTransprocXMLParser',
+                   statement.name]
+        call_command(*options, verbosity=0)
+        if not journal:
+            BankStatement.objects.all().delete()
+        return measure(size, lambda: call_command(*options, stderr=StringIO()))
+
+
+def bench_reimport_payments(size: int) -> Dict[str, Any]:
+    """Measure import_payments command with duplicate payments from unknown statement."""
+    return reimport_statement(size, journal=False)
+
+
+def bench_reimport_statement(size: int) -> Dict[str, Any]:
+    """Measure import_payments command with statement which has already been imported."""
+    return reimport_statement(size, journal=True)
+
+
+def bench_reimport_archived(size: int) -> Dict[str, Any]:
+    """Measure import_payments command with duplicate payments which have already been archived."""
+    from django.core.management import call_command
+
+    from django_pain.constants import PaymentState
+    from django_pain.models import BankPayment, BankStatement
+
+    create_account()
+    with tempfile.NamedTemporaryFile('w', suffix='.xml') as statement:
+        write_transproc_statement(statement, size)
+        statement.flush()
+        options = ['import_payments', '--parser=django_pain.parsers.transproc.StreamingTransprocXMLParser',
+                   statement.name]
+        call_command(*options, verbosity=0)
+        BankStatement.objects.all().delete()
+        BankPayment.objects.update(state=PaymentState.PROCESSED)
+        call_command('archive_payments', '--age=0', verbosity=0)
+        return measure(size, lambda: call_command(*options, stderr=StringIO()))
+
+
+def bench_process_payments(size: int) -> Dict[str, Any]:
+    """Measure process_payments command on backlog of imported and deferred payments."""
+    from django.core.management import call_command
+
+    create_payments(size, pending_ratio=1)
+    return measure(size, lambda: call_command('process_payments', '--batch-size=1000'))
+
+
+def process_account_payments(size: int, filtered: bool) -> Dict[str, Any]:
+    """Measure process_payments command with processor for each account, optionally with payment filters."""
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+
+    from benchmarks.processors import AccountPaymentProcessor, get_account_processors
+
+    create_payments(size, pending_ratio=1)
+    with override_settings(PAIN_PROCESSORS=get_account_processors(10, filtered)):
+        result = measure(size, lambda: call_command('process_payments', '--batch-size=1000'))
+    result['processor_payments'] = AccountPaymentProcessor.received
+    return result
+
+
+def bench_process_filtered(size: int) -> Dict[str, Any]:
+    """Measure process_payments command with ten processors filtering payments by account."""
+    return process_account_payments(size, filtered=True)
+
+
+def bench_process_unfiltered(size: int) -> Dict[str, Any]:
+    """Measure process_payments command with ten processors receiving all payments."""
+    return process_account_payments(size, filtered=False)
+
+
+def bench_archive_payments(size: int) -> Dict[str, Any]:
+    """Measure archive_payments command on payment history."""
+    from django.core.management import call_command
+
+    from django_pain.management.commands.archive_payments import SETTLED_STATES
+    from django_pain.models import BankPayment
+
+    create_payments(size)
+    archived = BankPayment.objects.filter(state__in=SETTLED_STATES).count()
+    return measure(archived, lambda: call_command('archive_payments', '--age=0', verbosity=0))
+
+
+def bench_admin_changelist(size: int) -> Dict[str, Any]:
+    """Measure rendering of payment list in admin."""
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    create_payments(size)
+    client = Client()
+    client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def get_changelist():
+        response = client.get('/admin/django_pain/bankpayment/')
+        assert response.status_code == 200
+
+    # Report time of single page load.
+    result = measure(1, get_changelist)
+    result['payments'] = size
+    return result
+
+
+BENCHMARKS = OrderedDict((name[len('bench_'):], function) for name, function in sorted(globals().items())
+                         if name.startswith('bench_'))
+
+
+def run_benchmark(name: str, size: int) -> None:
+    """Run benchmark and print result as JSON."""
+    setup_django()
+    result = OrderedDict([('benchmark', name)])  # type: Dict[str, Any]
+    result.update(BENCHMARKS[name](size))
+    # ru_maxrss is in kilobytes on Linux.
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+
+def get_environment() -> Dict[str, Any]:
+    """Return description of benchmark environment."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
+    from django.db import connection
+    import django_pain
+
+    return OrderedDict([
+        ('python', platform.python_version()),
+        ('django', django.get_version()),
+        ('django_pain', django_pain.__version__),
+        ('database', connection.vendor),
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S%z')),
+    ])
+
+
+def main() -> None:
+    """Run benchmarks in subprocesses and write results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmark', nargs='*', choices=[[]] + list(BENCHMARKS),
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--size', type=int, default=10000, help='number of payments (default: %(default)s)')
+    parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout,
+                        help='output file (default: standard output)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_benchmark(args.benchmark[0], args.size)
+        return
+
+    results = []
+    for name in args.benchmark or BENCHMARKS:
+        print('Running {}...'.format(name), file=sys.stderr)
+        output = subprocess.check_output([sys.executable, '-m', 'benchmarks.run', '--child', '--size', str(args.size),
+                                          name])
+        results.append(json.loads(output.decode().splitlines()[-1], object_pairs_hook=OrderedDict))
+
+    json.dump(OrderedDict([('environment', get_environment()), ('results', results)]), args.output, indent=2)
+    args.output.write('\n')
+
+
+if __name__ == '__main__':
+    main()
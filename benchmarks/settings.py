@@ -0,0 +1,34 @@
+"""
+Settings for benchmarks.
+
+SQLite database is used by default. Set BENCHMARK_DATABASE=postgresql to use PostgreSQL
+database configured by standard libpq environment variables (PGDATABASE, PGHOST, PGUSER, ...).
+All data in the benchmark database are deleted.
+"""
+import os
+import tempfile
+
+from django_pain.tests.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'django_pain.urls'
+
+if os.environ.get('BENCHMARK_DATABASE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'pain_benchmark'),
+            'HOST': os.environ.get('PGHOST', ''),
+            'PORT': os.environ.get('PGPORT', ''),
+            'USER': os.environ.get('PGUSER', ''),
+            'PASSWORD': os.environ.get('PGPASSWORD', ''),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('BENCHMARK_SQLITE_NAME', os.path.join(tempfile.gettempdir(), 'pain_benchmark.db')),
+        }
+    }
+
+PAIN_PROCESSORS = ['benchmarks.processors.BenchmarkPaymentProcessor']
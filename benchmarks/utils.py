@@ -0,0 +1,176 @@
+"""Benchmark utilities."""
+import csv
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import IO, Any, Dict, Iterator, List
+
+import django
+
+ACCOUNT_NUMBER = '123456789'
+ACCOUNT_BANK_CODE = '0123'
+ACCOUNT_IBAN = 'CZ0001230000000123456789'
+STATEMENT_DATE = date(2018, 1, 1)
+
+ITEM_TEMPLATE = '''
+            <item>
+                <ident>{ident}</ident>
+                <account_number>{counter_account}</account_number>
+                <account_bank_code>0300</account_bank_code>
+                <const_symbol>0558</const_symbol>
+                <var_symbol>{variable_symbol}</var_symbol>
+                <spec_symbol></spec_symbol>
+                <price>{price}</price>
+                <memo>Payment number {ident}</memo>
+                <date>{date}</date>
+                <name>Company {counter_account}</name>
+            </item>'''
+
+GPC_ITEM_TEMPLATE = ('075{account}{counter_account}{ident:013d}{amount:012d}2{variable_symbol:010d}00030005580000000000'
+                     '{date}{name:<20}00203{date}\r\n')
+
+CAMT_HEADER_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+    <BkToCstmrStmt>
+        <Stmt>
+            <Id>Benchmark</Id>
+            <Acct><Id><IBAN>{iban}</IBAN></Id><Ccy>CZK</Ccy></Acct>'''
+
+CAMT_ENTRY_TEMPLATE = '''
+            <Ntry>
+                <Amt Ccy="CZK">{price}</Amt>
+                <CdtDbtInd>CRDT</CdtDbtInd>
+                <Sts>BOOK</Sts>
+                <BookgDt><Dt>{date}</Dt></BookgDt>
+                <AcctSvcrRef>{ident}</AcctSvcrRef>
+                <NtryDtls>
+                    <TxDtls>
+                        <Refs><EndToEndId>/VS{variable_symbol}/KS0558</EndToEndId></Refs>
+                        <RltdPties>
+                            <Dbtr><Nm>Company {counter_account}</Nm></Dbtr>
+                            <DbtrAcct><Id><Othr><Id>{counter_account}/0300</Id></Othr></Id></DbtrAcct>
+                        </RltdPties>
+                        <RmtInf><Ustrd>Payment number {ident}</Ustrd></RmtInf>
+                    </TxDtls>
+                </NtryDtls>
+            </Ntry>'''
+
+
+def setup_django() -> None:
+    """Set up django, create database tables and delete all data."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    call_command('flush', interactive=False, verbosity=0)
+
+
+def create_account():
+    """Create bank account used in generated statements."""
+    from django_pain.models import BankAccount
+    account, _ = BankAccount.objects.get_or_create(account_number='{}/{}'.format(ACCOUNT_NUMBER, ACCOUNT_BANK_CODE),
+                                                   defaults={'account_name': 'Benchmark', 'currency': 'CZK'})
+    return account
+
+
+def generate_items(items: int, first_ident: int = 0, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate values of statement items."""
+    rnd = random.Random(seed)
+    for ident in range(first_ident, first_ident + items):
+        yield {
+            'ident': ident,
+            'counter_account': rnd.randint(10 ** 5, 10 ** 9),
+            'variable_symbol': rnd.randint(1, 10 ** 10 - 1),
+            'price': '{}.{:02d}'.format(rnd.randint(1, 10 ** 5), rnd.randint(0, 99)),
+            'date': STATEMENT_DATE + timedelta(days=ident * 30 // max(items, 1)),
+        }
+
+
+def write_transproc_statement(output: IO[str], items: int, first_ident: int = 0, seed: int = 0) -> None:
+    """Write transproc XML statement with given number of items."""
+    output.write('<?xml version="1.0" encoding="UTF-8"?>\n<statements>\n    <statement>\n')
+    output.write('        <account_number>{}</account_number>\n'.format(ACCOUNT_NUMBER))
+    output.write('        <account_bank_code>{}</account_bank_code>\n'.format(ACCOUNT_BANK_CODE))
+    output.write('        <date>{}</date>\n        <items>'.format(STATEMENT_DATE.isoformat()))
+    for item in generate_items(items, first_ident, seed):
+        output.write(ITEM_TEMPLATE.format(**dict(item, date=item['date'].isoformat())))
+    output.write('\n        </items>\n    </statement>\n</statements>\n')
+
+
+def write_csv_statement(output: IO[str], items: int, first_ident: int = 0, seed: int = 0) -> None:
+    """Write CSV statement with given number of items."""
+    writer = csv.writer(output)
+    writer.writerow(['account', 'identifier', 'transaction_date', 'counter_account_number', 'counter_account_name',
+                     'amount', 'description', 'constant_symbol', 'variable_symbol', 'specific_symbol'])
+    account = '{}/{}'.format(ACCOUNT_NUMBER, ACCOUNT_BANK_CODE)
+    for item in generate_items(items, first_ident, seed):
+        writer.writerow([account, item['ident'], item['date'].isoformat(), '{}/0300'.format(item['counter_account']),
+                         'Company {}'.format(item['counter_account']), item['price'],
+                         'Payment number {}'.format(item['ident']), '0558', item['variable_symbol'], ''])
+
+
+def write_gpc_statement(output: IO[str], items: int, first_ident: int = 0, seed: int = 0) -> None:
+    """Write GPC statement with given number of items."""
+    account = ACCOUNT_NUMBER.zfill(16)
+    header = '074{}{:<20}{}'.format(account, 'Benchmark', STATEMENT_DATE.strftime('%d%m%y'))
+    output.write('{:<128}\r\n'.format(header))
+    for item in generate_items(items, first_ident, seed):
+        date = item['date'].strftime('%d%m%y')
+        output.write(GPC_ITEM_TEMPLATE.format(
+            account=account, counter_account=str(item['counter_account']).zfill(16), ident=item['ident'],
+            amount=int(item['price'].replace('.', '')), variable_symbol=item['variable_symbol'], date=date,
+            name='Company {}'.format(item['counter_account'])[:20]))
+
+
+def write_camt053_statement(output: IO[str], items: int, first_ident: int = 0, seed: int = 0) -> None:
+    """Write CAMT.053 statement with given number of items."""
+    output.write(CAMT_HEADER_TEMPLATE.format(iban=ACCOUNT_IBAN))
+    for item in generate_items(items, first_ident, seed):
+        output.write(CAMT_ENTRY_TEMPLATE.format(
+            ident=item['ident'], price=item['price'], date=item['date'].isoformat(),
+            variable_symbol=item['variable_symbol'], counter_account=item['counter_account']))
+    output.write('\n        </Stmt>\n    </BkToCstmrStmt>\n</Document>\n')
+
+
+def create_payments(count: int, accounts: int = 10, pending_ratio: float = 0.05, seed: int = 0,
+                    batch_size: int = 10000) -> None:
+    """
+    Create payment history in database.
+
+    Payments are evenly distributed among ``accounts`` accounts and transaction dates
+    within five years. Share of imported and deferred payments is ``pending_ratio``,
+    the rest is processed or exported.
+    """
+    from django_pain.constants import PaymentState
+    from django_pain.models import BankAccount, BankPayment
+
+    rnd = random.Random(seed)
+    account_objects = [
+        BankAccount.objects.get_or_create(account_number='{}/0300'.format(100000 + i),
+                                          defaults={'account_name': 'Account {}'.format(i), 'currency': 'CZK'})[0]
+        for i in range(accounts)]
+    start = date(2014, 1, 1)
+    first = BankPayment.objects.count()
+
+    batch = []  # type: List[BankPayment]
+    for i in range(first, first + count):
+        if rnd.random() < pending_ratio:
+            state = rnd.choice([PaymentState.IMPORTED, PaymentState.DEFERRED])
+        else:
+            state = rnd.choice([PaymentState.PROCESSED, PaymentState.EXPORTED])
+        batch.append(BankPayment(
+            identifier='BENCH{}'.format(i),
+            account=account_objects[i % accounts],
+            transaction_date=start + timedelta(days=rnd.randint(0, 5 * 365)),
+            counter_account_number='{}/0100'.format(rnd.randint(10 ** 5, 10 ** 9)),
+            amount=Decimal(rnd.randint(100, 10 ** 7)) / 100,
+            amount_currency='CZK',
+            variable_symbol=str(rnd.randint(1, 10 ** 10 - 1)),
+            state=state,
+        ))
+        if len(batch) >= batch_size:
+            BankPayment.objects.bulk_create(batch)
+            batch = []
+    BankPayment.objects.bulk_create(batch)
@@ -1,11 +1,12 @@
 """Django admin."""
 from django.contrib.admin import site
 
-from django_pain.models import BankAccount, BankPayment
+from django_pain.models import ArchivedBankPayment, BankAccount, BankPayment
 
-from .admin import BankAccountAdmin, BankPaymentAdmin
+from .admin import ArchivedBankPaymentAdmin, BankAccountAdmin, BankPaymentAdmin
 
-__all__ = ['BankAccountAdmin', 'BankPaymentAdmin']
+__all__ = ['ArchivedBankPaymentAdmin', 'BankAccountAdmin', 'BankPaymentAdmin']
 
 site.register(BankAccount, BankAccountAdmin)
 site.register(BankPayment, BankPaymentAdmin)
+site.register(ArchivedBankPayment, ArchivedBankPaymentAdmin)
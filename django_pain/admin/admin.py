@@ -1,11 +1,20 @@
 """Admin interface for django_pain."""
-from django.contrib import admin
+from collections import defaultdict
+from typing import Dict, List
+
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import Q
 from django.utils.translation import gettext as _
 
-from django_pain.constants import PaymentState
+from django_pain.constants import UPDATE_BATCH_SIZE, PaymentState
+from django_pain.models import BankPayment
+from django_pain.settings import SETTINGS, get_processor_instance
+from django_pain.utils import chunked, full_class_name
 
-from .filters import PaymentStateListFilter
+from .filters import AccountNameListFilter, PaymentStateListFilter
 from .forms import BankAccountForm, BankPaymentForm
+from .paginator import EstimatedCountPaginator
 
 
 class BankAccountAdmin(admin.ModelAdmin):
@@ -23,8 +32,12 @@ class BankPaymentAdmin(admin.ModelAdmin):
         'amount', 'variable_symbol', 'state'
     )
     list_filter = (
-        ('state', PaymentStateListFilter), 'account__account_name', 'transaction_date',
+        ('state', PaymentStateListFilter), AccountNameListFilter, 'transaction_date',
     )
+    list_select_related = ('account',)
+    # Avoid counting all payments on large tables.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     readonly_fields = (
         'identifier', 'account', 'create_time', 'transaction_date',
@@ -52,8 +65,119 @@ class BankPaymentAdmin(admin.ModelAdmin):
             fieldsets.append((_('Assign payment'), {'fields': ('objective',)}),)  # type: ignore
         return fieldsets
 
+    def get_actions(self, request):
+        """Return admin actions including assignment of selected payments to each payment processor."""
+        actions = super().get_actions(request)
+        if self.actions is None or not self.has_change_permission(request):
+            return actions
+        for processor_class in SETTINGS.processors:
+            name = 'assign_to_%s' % full_class_name(processor_class).replace('.', '_')
+            description = _('Assign selected payments to %(objective)s') % {
+                'objective': get_processor_instance(processor_class).default_objective}
+            actions[name] = (self._get_assign_action(processor_class), name, description)
+        return actions
+
+    @staticmethod
+    def _get_assign_action(processor_class):
+        """Return admin action assigning payments to payment processor."""
+        def assign_action(modeladmin, request, queryset):
+            modeladmin.assign_payments(request, queryset, processor_class)
+        return assign_action
+
+    def assign_payments(self, request, queryset, processor_class):
+        """
+        Assign selected payments to payment processor.
+
+        Only imported and deferred payments are assigned. Payments are passed to processor at once
+        and states of assigned payments are written by a single UPDATE query for each objective.
+        Payments processed concurrently in the meantime are not overwritten and are not counted as assigned.
+        """
+        selected = list(queryset.order_by('pk'))
+        payments = [payment for payment in selected
+                    if payment.state in (PaymentState.IMPORTED, PaymentState.DEFERRED)]
+        processor_name = full_class_name(processor_class)
+        assigned = defaultdict(list)  # type: Dict[str, List[int]]
+        processor = get_processor_instance(processor_class)
+        for payment, result in zip(payments, processor.assign_payments(payments, '')):
+            if result.result:
+                assigned[result.objective].append(payment.pk)
+
+        assigned_count = 0
+        with transaction.atomic():
+            for objective, pks in assigned.items():
+                for pks_chunk in chunked(pks, UPDATE_BATCH_SIZE):
+                    assigned_count += BankPayment.objects.filter(
+                        pk__in=pks_chunk, state__in=[PaymentState.IMPORTED, PaymentState.DEFERRED]
+                    ).update(state=PaymentState.PROCESSED, processor=processor_name, objective=objective)
+
+        if assigned_count:
+            self.message_user(request, _('Number of assigned payments: %(count)d') % {'count': assigned_count},
+                              messages.SUCCESS)
+        if len(selected) > assigned_count:
+            self.message_user(request, _('Number of payments which could not be assigned: %(count)d') % {
+                'count': len(selected) - assigned_count}, messages.WARNING)
+
     @staticmethod
     def account_name(obj):
         """Return related account name."""
         return obj.account.account_name
     account_name.short_description = _('Account name')  # type: ignore
+
+
+class ArchivedBankPaymentAdmin(admin.ModelAdmin):
+    """
+    Read-only model admin for ArchivedBankPayment.
+
+    Archive is searched by exact identifier, variable symbol or counter account number, which is supported by indexes.
+    """
+
+    list_display = (
+        'identifier', 'transaction_date', 'account_name', 'counter_account_name',
+        'amount', 'variable_symbol', 'state'
+    )
+    list_filter = (AccountNameListFilter, 'transaction_date')
+    list_select_related = ('account',)
+    search_fields = ('identifier', 'variable_symbol', 'counter_account_number')
+    # Avoid counting all payments on large tables.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    fields = (
+        'identifier', 'account', 'create_time', 'transaction_date',
+        'counter_account_number', 'counter_account_name', 'amount', 'description', 'state',
+        'constant_symbol', 'variable_symbol', 'specific_symbol', 'objective', 'archive_time',
+    )
+    readonly_fields = fields
+    account_name = staticmethod(BankPaymentAdmin.account_name)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Return archived payments with identifier, variable symbol or counter account number equal to search term."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(Q(identifier=search_term) | Q(variable_symbol=search_term)
+                               | Q(counter_account_number=search_term)), False
+
+    def has_add_permission(self, request):
+        """Disable adding of archived payments, they are created only by archive_payments command."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """
+        Allow only viewing of archived payments.
+
+        Read-only view permission is not available in all supported Django versions,
+        so change permission is granted only to requests which do not modify data.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        return super().has_change_permission(request, obj)
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        """Show archived payment without save buttons."""
+        extra_context = dict(extra_context or {}, show_save=False, show_save_and_continue=False)
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def has_delete_permission(self, request, obj=None):
+        """Disable deletion of archived payments."""
+        return False
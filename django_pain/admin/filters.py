@@ -1,9 +1,9 @@
 """Admin filters."""
-from django.contrib.admin import ChoicesFieldListFilter
+from django.contrib.admin import ChoicesFieldListFilter, SimpleListFilter
 from django.utils.translation import gettext as _
 
 from django_pain.constants import PaymentState
-from django_pain.models import PAYMENT_STATE_CHOICES
+from django_pain.models import PAYMENT_STATE_CHOICES, BankAccount
 
 
 class PaymentStateListFilter(ChoicesFieldListFilter):
@@ -23,3 +23,26 @@ class PaymentStateListFilter(ChoicesFieldListFilter):
                 'query_string': cl.get_query_string({self.lookup_kwarg: str_value}),
                 'display': dict(PAYMENT_STATE_CHOICES)[enum_value],
             }
+
+
+class AccountNameListFilter(SimpleListFilter):
+    """
+    Filter payments by account name.
+
+    Choices are read from bank accounts, so listing them does not scan payments.
+    """
+
+    title = _('Account name')
+    parameter_name = 'account__account_name'
+
+    def lookups(self, request, model_admin):
+        """Return names of bank accounts."""
+        names = BankAccount.objects.exclude(account_name='').order_by('account_name').values_list(
+            'account_name', flat=True).distinct()
+        return [(name, name) for name in names]
+
+    def queryset(self, request, queryset):
+        """Return payments to account with selected name."""
+        if self.value() is not None:
+            return queryset.filter(account__account_name=self.value())
+        return queryset
@@ -6,6 +6,7 @@ from djmoney.settings import CURRENCY_CHOICES
 
 from django_pain.constants import PaymentState
 from django_pain.models import BankAccount, BankPayment
+from django_pain.settings import get_processor_instance
 
 
 class BankAccountForm(forms.ModelForm):
@@ -46,8 +47,7 @@ class BankPaymentForm(forms.ModelForm):
         if cleaned_data.get('processor', None):
             # The only valid choices are those from PAIN_PROCESSORS settings.
             # Those are already validated during startup.
-            processor_class = module_loading.import_string(cleaned_data['processor'])
-            processor = processor_class()
+            processor = get_processor_instance(module_loading.import_string(cleaned_data['processor']))
             result = processor.assign_payment(self.instance, cleaned_data['client_id'])
             if result.result:
                 cleaned_data['state'] = PaymentState.PROCESSED
@@ -0,0 +1,44 @@
+"""Admin paginators."""
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Minimal estimated number of rows for which the estimate is used instead of exact count.
+ESTIMATE_THRESHOLD = 100000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using estimated number of rows of large unfiltered tables.
+
+    Exact count of all rows of a large table requires full scan on PostgreSQL.
+    If the object list is not filtered and table statistics estimate more than
+    ``ESTIMATE_THRESHOLD`` rows, the estimate is used as the number of objects.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        """Return estimated or exact number of objects."""
+        estimate = self.get_estimate()
+        if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+    def get_estimate(self) -> Optional[int]:
+        """Return estimated number of rows of unfiltered queryset or None if it is not available."""
+        if not isinstance(self.object_list, QuerySet) or self.object_list.query.where:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                           [self.object_list.model._meta.db_table])
+            row = cursor.fetchone()
+        # Tables which have never been analyzed have no (or negative) estimate.
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
@@ -5,6 +5,12 @@ from enum import Enum, unique
 # Bitcoin has 8, so 10 should be enough for most practical purposes.
 CURRENCY_PRECISION = 10
 
+# Maximal number of digits of currency amounts.
+AMOUNT_MAX_DIGITS = 64
+
+# Maximal number of primary keys in a single UPDATE query.
+UPDATE_BATCH_SIZE = 500
+
 
 @unique
 class PaymentState(str, Enum):
@@ -14,3 +20,11 @@ class PaymentState(str, Enum):
     PROCESSED = 'processed'
     DEFERRED = 'deferred'
     EXPORTED = 'exported'
+
+
+@unique
+class StatementState(str, Enum):
+    """Bank statement import states constants."""
+
+    IMPORTING = 'importing'
+    IMPORTED = 'imported'
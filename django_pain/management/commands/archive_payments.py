@@ -0,0 +1,87 @@
+"""Command for archiving settled bank payments."""
+from datetime import timedelta
+from typing import List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from django_pain import metrics
+from django_pain.constants import UPDATE_BATCH_SIZE, PaymentState
+from django_pain.models import ArchivedBankPayment, BankPayment
+from django_pain.settings import SETTINGS
+from django_pain.utils import chunked
+
+DEFAULT_BATCH_SIZE = 10000
+# Payments which will not be changed by processing anymore.
+SETTLED_STATES = (PaymentState.PROCESSED, PaymentState.EXPORTED)
+
+
+class Command(BaseCommand):
+    """Archive settled bank payments."""
+
+    help = 'Move processed and exported payments with old transaction date to archive.'
+
+    def add_arguments(self, parser):
+        """Command takes optional age of archived payments and batch size."""
+        parser.add_argument('-a', '--age', type=int,
+                            help='minimal age of archived payments in days since their transaction date '
+                                 '(default: PAIN_ARCHIVE_AGE setting)')
+        parser.add_argument('-b', '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='number of payments archived in a single transaction (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        """Run command."""
+        age = options['age'] if options['age'] is not None else SETTINGS.archive_age
+        if age < 0:
+            raise CommandError('Age has to be non-negative integer.')
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size has to be positive integer.')
+
+        payments = BankPayment.objects.filter(state__in=SETTLED_STATES,
+                                              transaction_date__lt=timezone.now().date() - timedelta(days=age))
+        archived = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                with metrics.measure('archive.query'):
+                    # Selected payments are locked, so they cannot be changed before they are deleted.
+                    pks = list(payments.select_for_update().filter(pk__gt=last_pk).order_by('pk').values_list(
+                        'pk', flat=True)[:options['batch_size']])
+                if not pks:
+                    break
+                with metrics.measure('archive.move'):
+                    for pks_chunk in chunked(pks, UPDATE_BATCH_SIZE):
+                        self.archive_payments(pks_chunk)
+            archived += len(pks)
+            last_pk = pks[-1]
+
+        metrics.count('archive.archived', archived)
+        if options['verbosity'] >= 1:
+            self.stdout.write('Archived %d payments.' % archived)
+
+    @staticmethod
+    def archive_payments(pks: List[int]) -> None:
+        """
+        Move payments with given primary keys to archive.
+
+        Payments are copied by a single INSERT ... SELECT query, so they are not loaded into memory.
+        All fields of archived payments except of the archive time are copied from payments.
+        """
+        connection = connections[router.db_for_write(ArchivedBankPayment)]
+        quote_name = connection.ops.quote_name
+        archive_time_field = ArchivedBankPayment._meta.get_field('archive_time')
+        columns = ', '.join(quote_name(field.column) for field in ArchivedBankPayment._meta.concrete_fields
+                            if field is not archive_time_field)
+        query = 'INSERT INTO {archive} ({columns}, {archive_time}) SELECT {columns}, %s FROM {table} ' \
+                'WHERE {pk} IN ({pks})'.format(
+                    archive=quote_name(ArchivedBankPayment._meta.db_table),
+                    columns=columns,
+                    archive_time=quote_name(archive_time_field.column),
+                    table=quote_name(BankPayment._meta.db_table),
+                    pk=quote_name(BankPayment._meta.pk.column),
+                    pks=', '.join(['%s'] * len(pks)))
+        archive_time = archive_time_field.get_db_prep_value(timezone.now(), connection)
+        with connection.cursor() as cursor:
+            cursor.execute(query, [archive_time] + pks)
+        BankPayment.objects.filter(pk__in=pks).delete()
@@ -1,14 +1,135 @@
 """Command for importing payments from bank."""
+import bz2
+import gzip
+import hashlib
+import lzma
+import multiprocessing
 import sys
-from typing import Iterable
+import zipfile
+from collections import Counter, defaultdict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import IO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from django.core.exceptions import ValidationError
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
 from django.utils import module_loading
 
-from django_pain.models import BankAccount, BankPayment
+from django_pain import metrics
+from django_pain.constants import StatementState
+from django_pain.models import ArchivedBankPayment, BankAccount, BankPayment, BankStatement
 from django_pain.parsers.common import AbstractBankStatementParser
+from django_pain.utils import chunked
+
+DEFAULT_BATCH_SIZE = 1000
+HASH_BLOCK_SIZE = 1024 * 1024
+# Maximal number of input files being parsed or waiting to be saved for each job.
+PENDING_FILES_PER_JOB = 2
+
+# Magic numbers of compressed files and functions opening them for reading.
+DECOMPRESSORS = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)  # type: Tuple[Tuple[bytes, Callable], ...]
+ZIP_MAGIC = b'PK\x03\x04'
+MAGIC_LENGTH = 6
+
+
+def open_input_file(input_file: str) -> IO[bytes]:
+    """
+    Open input file with bank statement or return standard input for '-'.
+
+    Input is read in binary mode. Files compressed by gzip, bzip2 or xz are decompressed while reading,
+    zip archive has to contain a single file. Standard input is never decompressed.
+    """
+    if input_file == '-':
+        return sys.stdin.buffer
+
+    with open(input_file, 'rb') as handle:
+        header = handle.read(MAGIC_LENGTH)
+    for magic, decompressor in DECOMPRESSORS:
+        if header.startswith(magic):
+            return decompressor(input_file, 'rb')
+    if header.startswith(ZIP_MAGIC):
+        return open_zip_file(input_file)
+    return open(input_file, 'rb')
+
+
+def open_zip_file(input_file: str) -> IO[bytes]:
+    """Open the only file in zip archive."""
+    # Archive file stays open until the member is closed.
+    with zipfile.ZipFile(input_file) as archive:
+        members = [info for info in archive.infolist() if not info.filename.endswith('/')]
+        if len(members) != 1:
+            raise CommandError('Zip archive {} has to contain exactly one file.'.format(input_file))
+        return archive.open(members[0])
+
+
+def get_payment_keys(query: Q) -> Set[Tuple[str, int]]:
+    """
+    Return (identifier, account_id) pairs of payments and archived payments matching the query.
+
+    Payments and archived payments are selected by a single query.
+    """
+    payments = BankPayment.objects.filter(query).values_list('identifier', 'account_id')
+    archived_payments = ArchivedBankPayment.objects.filter(query).values_list('identifier', 'account_id')
+    return set(payments.union(archived_payments, all=True))
+
+
+def get_content_hash(input_file: str) -> str:
+    """Return SHA-256 hash of input file content."""
+    content_hash = hashlib.sha256()
+    with open(input_file, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+
+@lru_cache()
+def get_worker_parser(parser_path: str) -> AbstractBankStatementParser:
+    """Return parser instance of worker process."""
+    return module_loading.import_string(parser_path)()
+
+
+def parse_input_file(parser_path: str, input_file: str) -> List[BankPayment]:
+    """Parse input file in worker process."""
+    with open_input_file(input_file) as handle:
+        return list(get_worker_parser(parser_path).parse(handle))
+
+
+def get_process_pool(jobs: int) -> ProcessPoolExecutor:
+    """
+    Return pool of processes parsing input files.
+
+    Worker processes are forked, so they inherit configured Django. Spawned processes would import
+    parsers and models before Django is set up.
+    """
+    if sys.version_info >= (3, 7):
+        return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('fork'))
+    # Older Python always forks processes on POSIX systems.
+    return ProcessPoolExecutor(max_workers=jobs)  # pragma: no cover
+
+
+def parse_input_files(executor: Executor, parser_path: str, input_files: List[str],
+                      max_pending: int) -> Iterator[List[BankPayment]]:
+    """
+    Parse input files by executor and return iterator over their payments in the order of input files.
+
+    At most ``max_pending`` files are parsed or wait to be consumed ahead of the consumed file,
+    so memory consumption does not depend on number of input files.
+    """
+    pending = deque()  # type: Deque[Future]
+    for input_file in input_files:
+        pending.append(executor.submit(parse_input_file, parser_path, input_file))
+        if len(pending) > max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 class Command(BaseCommand):
@@ -19,43 +140,261 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         """Command takes one argument - dotted path to parser class."""
         parser.add_argument('-p', '--parser', type=str, required=True, help='dotted path to parser class')
+        parser.add_argument('-b', '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='number of payments validated and inserted at once (default: %(default)s)')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='number of processes parsing input files (default: %(default)s)')
         parser.add_argument('input_file', nargs='*', type=str, default=['-'], help='input file with bank statement')
 
     def handle(self, *args, **options):
         """Run command."""
         self.options = options
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size has to be positive integer.')
+        if options['jobs'] < 1:
+            raise CommandError('Number of jobs has to be positive integer.')
 
         parser_class = module_loading.import_string(options['parser'])
         if not issubclass(parser_class, AbstractBankStatementParser):
             raise CommandError('Parser argument has to be subclass of AbstractBankStatementParser.')
-        parser = parser_class()  # type: AbstractBankStatementParser
 
-        for input_file in options['input_file']:
-            if input_file == '-':
-                handle = sys.stdin
+        # Numbers of imported, duplicate and invalid payments.
+        self.counts = Counter()  # type: Dict[str, int]
+        # (identifier, account_id) pairs of payments known to be in database
+        # and the oldest transaction date they have been loaded from for each account.
+        self.known_payments = set()  # type: Set[Tuple[str, int]]
+        self.known_since = {}  # type: Dict[int, date]
+        # Primary keys of statements imported by this run.
+        self.statements = set()  # type: Set[int]
+        try:
+            if options['jobs'] > 1:
+                self.import_parallel()
             else:
-                handle = open(input_file)
+                self.import_serial(parser_class())
+        finally:
+            for name in ('imported', 'duplicate', 'invalid'):
+                metrics.count('import.' + name, self.counts[name])
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Imported %(imported)d payments, skipped %(duplicate)d duplicate and %(invalid)d invalid '
+                              'payments.' % self.counts)
+
+    def import_serial(self, parser: AbstractBankStatementParser) -> None:
+        """Parse input files and save payments one file after another."""
+        try:
+            for input_file in self.options['input_file']:
+                statement = self.get_statement(input_file)
+                if self.skip_statement(input_file, statement):
+                    continue
+                handle = open_input_file(input_file)
+                stage = metrics.Stage('import.parse')
+                try:
+                    self.save_payments(stage.iterate(parser.parse(handle)), statement)
+                    stage.emit()
+                except BankAccount.DoesNotExist as e:
+                    raise CommandError(e)
+                finally:
+                    handle.close()
+        finally:
+            # Accounts may be changed before next run.
+            parser.clear_account_cache()
+
+    def import_parallel(self) -> None:
+        """
+        Parse input files in worker processes and save payments in this process.
+
+        Payments are saved in the order of input files as soon as the file is parsed.
+        Only a few files per job are parsed ahead of saving, so parsed payments do not accumulate in memory.
+        Time spent waiting for parsed files is measured as parse stage.
+        """
+        if '-' in self.options['input_file']:
+            raise CommandError('Standard input can not be imported with more jobs.')
 
+        input_files = []
+        statements = []
+        for input_file in self.options['input_file']:
+            statement = self.get_statement(input_file)
+            if not self.skip_statement(input_file, statement):
+                input_files.append(input_file)
+                statements.append(statement)
+
+        # Worker processes must not share database connections with this process.
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+        with get_process_pool(self.options['jobs']) as executor:
+            results = parse_input_files(executor, self.options['parser'], input_files,
+                                        PENDING_FILES_PER_JOB * self.options['jobs'])
+            stage = metrics.Stage('import.parse')
             try:
-                payments = parser.parse(handle)
+                for payments, statement in zip(stage.iterate(results), statements):
+                    self.save_payments(payments, statement)
+                stage.emit()
             except BankAccount.DoesNotExist as e:
                 raise CommandError(e)
-            else:
-                self.save_payments(payments)
-            finally:
-                handle.close()
 
-    def save_payments(self, payments: Iterable[BankPayment]) -> None:
-        """Save payments and related objects to database."""
-        for payment in payments:
+    def get_statement(self, input_file: str) -> Optional[BankStatement]:
+        """Return statement of input file or None for standard input."""
+        if input_file == '-':
+            return None
+        statement, _ = BankStatement.objects.get_or_create(content_hash=get_content_hash(input_file),
+                                                           defaults={'file_name': input_file})
+        return statement
+
+    def skip_statement(self, input_file: str, statement: Optional[BankStatement]) -> bool:
+        """Return whether statement has already been imported, possibly from another input file."""
+        if statement is None:
+            return False
+        if statement.state == StatementState.IMPORTED or statement.pk in self.statements:
+            if self.options['verbosity'] >= 2:
+                self.stdout.write('Statement %s has already been imported.' % input_file)
+            return True
+        self.statements.add(statement.pk)
+        return False
+
+    def save_payments(self, payments: Iterable[BankPayment], statement: Optional[BankStatement] = None) -> None:
+        """
+        Save payments and related objects to database.
+
+        Items of statement committed by interrupted import are skipped.
+        """
+        if statement is not None and statement.item_count:
+            payments = islice(payments, statement.item_count, None)
+        for chunk in chunked(payments, self.options['batch_size']):
+            self.save_chunk(chunk, statement)
+        if statement is not None:
+            statement.state = StatementState.IMPORTED
+            statement.save(update_fields=['state', 'update_time'])
+
+    def save_chunk(self, payments: List[BankPayment], statement: Optional[BankStatement] = None) -> None:
+        """
+        Validate chunk of payments and insert valid ones at once.
+
+        Payments already known from previous chunks are skipped without queries.
+        Uniqueness of the rest is checked by a single query for the whole chunk.
+        If bulk insert fails anyway (e.g. payment has been imported concurrently),
+        payments are saved one by one.
+        Statement progress is committed in the same transaction as payments.
+        """
+        with metrics.measure('import.validate'):
+            self.load_known_payments(payments)
+            unknown = [p for p in payments if (p.identifier, p.account_id) not in self.known_payments]
+            self.known_payments.update(self.get_existing_payments(unknown))
+
+            valid_payments = []
+            for payment in payments:
+                key = (payment.identifier, payment.account_id)
+                try:
+                    if key in self.known_payments:
+                        raise payment.unique_error_message(BankPayment, ('identifier', 'account'))
+                    # Account is set by parser and uniqueness has been checked above, so skip the per-row queries.
+                    payment.full_clean(exclude=['account'], validate_unique=False)
+                except ValidationError as error:
+                    self.report_invalid_payment(error, duplicate=key in self.known_payments)
+                else:
+                    self.known_payments.add(key)
+                    payment.statement = statement
+                    valid_payments.append(payment)
+
+        if not valid_payments and statement is None:
+            return
+
+        with metrics.measure('import.insert'):
             try:
                 with transaction.atomic():
-                    payment.full_clean()
-                    payment.save()
-            except ValidationError as error:
-                if self.options['verbosity'] >= 1:
-                    for message in error.messages:
-                        self.stderr.write(self.style.WARNING(message))
+                    BankPayment.objects.bulk_create(valid_payments)
+                    self.update_statement(statement, payments)
+            except IntegrityError:
+                with transaction.atomic():
+                    for payment in valid_payments:
+                        self.save_payment(payment)
+                    self.update_statement(statement, payments)
+            else:
+                for payment in valid_payments:
+                    self.report_imported_payment(payment)
+
+    def save_payment(self, payment: BankPayment) -> None:
+        """Validate and save single payment."""
+        try:
+            with transaction.atomic():
+                payment.full_clean()
+                payment.save()
+        except ValidationError as error:
+            self.report_invalid_payment(error, duplicate=self.is_duplicate_error(error))
+        else:
+            self.report_imported_payment(payment)
+
+    @staticmethod
+    def update_statement(statement: Optional[BankStatement], payments: List[BankPayment]) -> None:
+        """Add chunk of payments to committed items of statement."""
+        if statement is None:
+            return
+        statement.item_count += len(payments)
+        if statement.account_id is None:
+            statement.account_id = payments[0].account_id
+        statement.save(update_fields=['item_count', 'account', 'update_time'])
+
+    def load_known_payments(self, payments: List[BankPayment]) -> None:
+        """
+        Load payments already present in database (including archive) for accounts of the chunk.
+
+        Bank statements usually overlap with the previous ones only in a few recent days.
+        Payments are loaded once for each account since the oldest transaction date in the chunk
+        and only payments with even older transaction dates are loaded for the following chunks.
+        """
+        oldest_dates = {}  # type: Dict[int, date]
+        for payment in payments:
+            transaction_date = payment.transaction_date
+            if isinstance(transaction_date, datetime):
+                transaction_date = transaction_date.date()
+            elif not isinstance(transaction_date, date):
+                # Invalid payment, it will not pass validation.
+                continue
+            if payment.account_id not in oldest_dates or transaction_date < oldest_dates[payment.account_id]:
+                oldest_dates[payment.account_id] = transaction_date
+
+        query = Q()
+        for account_id, oldest_date in oldest_dates.items():
+            known_since = self.known_since.get(account_id)
+            if known_since is None:
+                query |= Q(account_id=account_id, transaction_date__gte=oldest_date)
+            elif oldest_date < known_since:
+                query |= Q(account_id=account_id, transaction_date__gte=oldest_date, transaction_date__lt=known_since)
             else:
-                if self.options['verbosity'] >= 2:
-                    self.stdout.write(self.style.SUCCESS('Payment ID %s has been imported.' % payment.identifier))
+                continue
+            self.known_since[account_id] = oldest_date
+
+        if query:
+            self.known_payments.update(get_payment_keys(query))
+
+    @staticmethod
+    def get_existing_payments(payments: List[BankPayment]) -> Set[Tuple[str, int]]:
+        """Return set of (identifier, account_id) pairs of payments already present in database (including archive)."""
+        identifiers = defaultdict(set)  # type: Dict[int, Set[str]]
+        for payment in payments:
+            identifiers[payment.account_id].add(payment.identifier)
+
+        query = Q()
+        for account_id, account_identifiers in identifiers.items():
+            query |= Q(account_id=account_id, identifier__in=account_identifiers)
+        if not query:
+            return set()
+        return get_payment_keys(query)
+
+    @staticmethod
+    def is_duplicate_error(error: ValidationError) -> bool:
+        """Return whether validation error is caused by already existing payment."""
+        return any(e.code == 'unique_together' for e in getattr(error, 'error_dict', {}).get(NON_FIELD_ERRORS, []))
+
+    def report_invalid_payment(self, error: ValidationError, duplicate: bool = False) -> None:
+        """Count invalid or duplicate payment and write validation error messages."""
+        self.counts['duplicate' if duplicate else 'invalid'] += 1
+        if self.options['verbosity'] >= 1:
+            for message in error.messages:
+                self.stderr.write(self.style.WARNING(message))
+
+    def report_imported_payment(self, payment: BankPayment) -> None:
+        """Count imported payment and write message about it."""
+        self.counts['imported'] += 1
+        if self.options['verbosity'] >= 2:
+            self.stdout.write(self.style.SUCCESS('Payment ID %s has been imported.' % payment.identifier))
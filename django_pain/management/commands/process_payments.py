@@ -1,12 +1,78 @@
 """Command for processing bank payments."""
+import asyncio
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from datetime import timedelta
+from math import ceil
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import BooleanField, Case, F, Q, QuerySet, Value, When
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-from django_pain.constants import PaymentState
-from django_pain.models import BankPayment
-from django_pain.settings import SETTINGS
+from django_pain import metrics
+from django_pain.constants import UPDATE_BATCH_SIZE, PaymentState
+from django_pain.models import BankAccount, BankPayment
+from django_pain.processors import (AbstractPaymentProcessor, AsyncPaymentProcessor, PaymentSnapshot,
+                                    ProcessPaymentResult)
+from django_pain.settings import SETTINGS, get_processor_instances
+from django_pain.utils import chunked, full_class_name
+
+# Name of annotation marking payments which match filter of n-th payment processor.
+CANDIDATE_ANNOTATION = 'pain_candidate_{}'
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Return delay before next processing of payment deferred for given number of times."""
+    delay = SETTINGS.retry_delay * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, SETTINGS.retry_max_delay))
+
+
+def get_processor_data(processor: AbstractPaymentProcessor, payments: Sequence[BankPayment],
+                       snapshots: Optional[Dict[int, PaymentSnapshot]]) -> Iterable:
+    """
+    Return payments passed to payment processor.
+
+    Processor receives either payment snapshots or copies of payments, so it cannot modify the original payments.
+    Snapshots have to be provided for processors using snapshots.
+    """
+    if processor.use_snapshots:
+        if snapshots is None:
+            raise ValueError('Payment snapshots are required by processor {}.'.format(full_class_name(type(processor))))
+        return (snapshots[payment.pk] for payment in payments)
+    else:
+        return (deepcopy(payment) for payment in payments)
+
+
+def run_processor(processor: AbstractPaymentProcessor, payments: Sequence[BankPayment],
+                  snapshots: Optional[Dict[int, PaymentSnapshot]]) -> List[Tuple[BankPayment, ProcessPaymentResult]]:
+    """Process payments by payment processor and return payments paired with results."""
+    return list(zip(payments, processor.process_payments(get_processor_data(processor, payments, snapshots))))
+
+
+async def run_async_processor(processor: AsyncPaymentProcessor, parts: List[Sequence[BankPayment]],
+                              snapshots: Optional[Dict[int, PaymentSnapshot]]
+                              ) -> List[Tuple[BankPayment, ProcessPaymentResult]]:
+    """Process parts of payments by asynchronous payment processor concurrently and return payments with results."""
+    # Data are prepared before any coroutine starts, so payments are copied only by the event loop thread.
+    coroutines = [processor.process_payments_async(list(get_processor_data(processor, part, snapshots)))
+                  for part in parts]
+    results = await asyncio.gather(*coroutines)
+    return [pair for part, part_results in zip(parts, results) for pair in zip(part, part_results)]
+
+
+def run_processor_in_thread(processor: AbstractPaymentProcessor, payments: Sequence[BankPayment],
+                            snapshots: Optional[Dict[int, PaymentSnapshot]]
+                            ) -> List[Tuple[BankPayment, ProcessPaymentResult]]:
+    """Process payments in worker thread and close database connections opened by the thread."""
+    try:
+        return run_processor(processor, payments, snapshots)
+    finally:
+        connections.close_all()
 
 
 class Command(BaseCommand):
@@ -15,40 +81,271 @@ class Command(BaseCommand):
     help = 'Process unprocessed payments by predefined payment processors.'
 
     def add_arguments(self, parser):
-        """Command takes optional arguments restricting processed time interval."""
+        """
+        Command takes optional arguments restricting processed time interval.
+
+        Without time interval, all imported payments and deferred payments due for next attempt are processed.
+        """
         parser.add_argument('-f', '--from', dest='time_from', type=parse_datetime,
-                            help="ISO datetime after which payments should be processed")
+                            help="ISO datetime after which payments should be processed (including all deferred)")
         parser.add_argument('-t', '--to', dest='time_to', type=parse_datetime,
-                            help="ISO datetime before which payments should be processed")
+                            help="ISO datetime before which payments should be processed (including all deferred)")
+        parser.add_argument('-b', '--batch-size', type=int,
+                            help="number of payments processed and committed at once (default: all payments)")
+        parser.add_argument('-w', '--workers', type=int, default=1,
+                            help="number of threads (or concurrent tasks of asynchronous processors) running each "
+                                 "payment processor (default: %(default)s)")
 
     def handle(self, *args, **options):
         """Run command."""
-        payments = BankPayment.objects.filter(state__in=[PaymentState.IMPORTED, PaymentState.DEFERRED])
-        if options['time_from'] is not None:
-            payments = payments.filter(create_time__gte=options['time_from'])
-        if options['time_to'] is not None:
-            payments = payments.filter(create_time__lte=options['time_to'])
+        self.options = options
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('Batch size has to be positive integer.')
+        if options['workers'] < 1:
+            raise CommandError('Number of workers has to be positive integer.')
+
+        if options['time_from'] is None and options['time_to'] is None:
+            payments = self.get_pending_payments()
+        else:
+            payments = BankPayment.objects.filter(state__in=[PaymentState.IMPORTED, PaymentState.DEFERRED])
+            if options['time_from'] is not None:
+                payments = payments.filter(create_time__gte=options['time_from'])
+            if options['time_to'] is not None:
+                payments = payments.filter(create_time__lte=options['time_to'])
+
+        processors = get_processor_instances()
+
+        self.executor = None  # type: Optional[ThreadPoolExecutor]
+        if options['workers'] > 1:
+            self.executor = ThreadPoolExecutor(max_workers=options['workers'])
+        # Event loop is created by the first asynchronous processor.
+        self.loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        try:
+            self.process_payments(payments, processors)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+            if self.loop is not None:
+                self.loop.close()
+
+    @staticmethod
+    def get_pending_payments() -> QuerySet:
+        """
+        Return imported payments and deferred payments due for next attempt.
+
+        Imported payments are selected by their state, so payments committed by a long running import
+        after payments with higher primary keys are never skipped.
+        """
+        due = Q(next_attempt_time__isnull=True) | Q(next_attempt_time__lte=timezone.now())
+        return BankPayment.objects.filter(Q(state=PaymentState.IMPORTED) | Q(due, state=PaymentState.DEFERRED))
+
+    def process_payments(self, payments: QuerySet, processors: List[AbstractPaymentProcessor]) -> None:
+        """
+        Process payments chunk by chunk.
+
+        Payments are claimed before processing, so concurrently running commands never process the same payment.
+        Chunks are locked in a transaction if database supports skipping of locked rows and locking of rows
+        of a single table. Without batch size, all payments are claimed at once and processed without
+        transaction, so a long run does not hold locks.
+        """
+        self.payment_filters = {}  # type: Dict[int, Q]
+        for index, processor in enumerate(processors):
+            payment_filter = processor.get_payment_filter()
+            if payment_filter is not None:
+                self.payment_filters[index] = payment_filter
 
-        processors = [processor() for processor in SETTINGS.processors]
+        features = connections[router.db_for_write(BankPayment)].features
+        if self.options['batch_size'] is not None and features.has_select_for_update_skip_locked \
+                and features.has_select_for_update_of:
+            process_next_chunk = self.process_locked_chunk
+        else:
+            process_next_chunk = self.process_claimed_chunk
 
-        for processor in processors:
+        last_pk = None
+        while True:
+            pks = process_next_chunk(payments, last_pk, processors)
+            if not pks or self.options['batch_size'] is None:
+                break
+            last_pk = pks[-1]
+
+    def process_locked_chunk(self, payments: QuerySet, last_pk: Optional[int],
+                             processors: List[AbstractPaymentProcessor]) -> List[int]:
+        """
+        Lock next chunk of payments, process it and return primary keys of processed payments.
+
+        Payments locked by other transactions are skipped. Locks are held until the chunk is committed.
+        Only payments are locked, not bank accounts joined by payment filters, which would block other commands.
+        If payment processor fails, results of the previous processors are committed before the error is raised,
+        because the processors may have already passed the payments to other systems.
+        """
+        failure = None  # type: Optional[Exception]
+        with transaction.atomic():
+            with metrics.measure('process.query'):
+                locked = payments.select_for_update(skip_locked=True, of=('self',))
+                chunk = self.get_chunk(self.annotate_candidates(locked), last_pk)
+            try:
+                self.process_chunk(chunk, processors)
+            except DatabaseError:
+                # Transaction cannot be committed anymore.
+                raise
+            except Exception as error:
+                failure = error
+        if failure is not None:
+            raise failure
+        return [payment.pk for payment in chunk]
+
+    def process_claimed_chunk(self, payments: QuerySet, last_pk: Optional[int],
+                              processors: List[AbstractPaymentProcessor]) -> List[int]:
+        """
+        Claim next chunk of payments, process it and return primary keys of claim candidates.
+
+        Unclaimed payments are marked with unique claim token, which makes the claim visible to other
+        commands. Payments are processed without transaction, so results of each processor are committed
+        as soon as the processor finishes. Claims are refreshed before each processor runs and released
+        once the chunk is processed. Claims left by failed commands expire after ``PAIN_CLAIM_TIMEOUT`` seconds,
+        so a single processor must not run longer.
+        """
+        token = uuid.uuid4()
+        now = timezone.now()
+        unclaimed = Q(claim_token__isnull=True) | Q(claim_time__lt=now - timedelta(seconds=SETTINGS.claim_timeout))
+        chunk = []  # type: List[BankPayment]
+        with metrics.measure('process.query'):
+            pks = self.get_chunk(payments.filter(unclaimed).values_list('pk', flat=True), last_pk)
+            # Claimed payments are selected by primary keys, claim token is not indexed.
+            for pks_chunk in chunked(pks, UPDATE_BATCH_SIZE):
+                payments.filter(unclaimed, pk__in=pks_chunk).update(claim_token=token, claim_time=now)
+                claimed = BankPayment.objects.filter(pk__in=pks_chunk, claim_token=token)
+                chunk.extend(self.annotate_candidates(claimed).order_by('pk'))
+
+        try:
+            self.process_chunk(chunk, processors, token)
+        finally:
+            self.update_claimed_payments([payment.pk for payment in chunk], token, claim_token=None, claim_time=None)
+        return pks
+
+    def annotate_candidates(self, payments: QuerySet) -> QuerySet:
+        """
+        Mark payments which match filters of payment processors.
+
+        Filters are evaluated by the query selecting payments, so no other queries are needed.
+        """
+        return payments.annotate(**{
+            CANDIDATE_ANNOTATION.format(index): Case(When(payment_filter, then=Value(True)), default=Value(False),
+                                                     output_field=BooleanField())
+            for index, payment_filter in self.payment_filters.items()})
+
+    def get_candidates(self, payments: Sequence[BankPayment], index: int) -> Sequence[BankPayment]:
+        """Return payments which match filter of n-th payment processor."""
+        if index not in self.payment_filters:
+            return payments
+        annotation = CANDIDATE_ANNOTATION.format(index)
+        return [payment for payment in payments if getattr(payment, annotation)]
+
+    def get_chunk(self, payments: QuerySet, last_pk: Optional[int]) -> list:
+        """Return next chunk of payments ordered by primary key."""
+        payments = payments.order_by('pk')
+        if last_pk is not None:
+            payments = payments.filter(pk__gt=last_pk)
+        if self.options['batch_size'] is not None:
+            payments = payments[:self.options['batch_size']]
+        return list(payments)
+
+    def process_chunk(self, payments: Sequence[BankPayment], processors: List[AbstractPaymentProcessor],
+                      claim_token: Optional[uuid.UUID] = None) -> None:
+        """
+        Process chunk of payments by payment processors.
+
+        Each processor receives only payments which match its filter and which have not been processed
+        by previous processors. Payments processed by a processor are written by a single UPDATE query
+        for each objective as soon as the processor finishes, before the next processor runs.
+        Processors are measured separately. Unprocessed payments are deferred and their next attempt
+        is scheduled according to the number of previous attempts.
+
+        If claim token is given, claims of the payments are refreshed before each processor runs,
+        so they do not expire while the chunk is processed.
+        """
+        snapshots = None  # type: Optional[Dict[int, PaymentSnapshot]]
+        for index, processor in enumerate(processors):
             if not payments:
                 break
+            processor_name = full_class_name(type(processor))
+            candidates = self.get_candidates(payments, index)
+            if len(candidates) < len(payments):
+                metrics.count('process.skipped', len(payments) - len(candidates), processor=processor_name)
+            if not candidates:
+                continue
+            if processor.use_snapshots and snapshots is None:
+                with metrics.measure('process.query'):
+                    snapshots = self.get_snapshots(payments)
+            if claim_token is not None:
+                with metrics.measure('process.query'):
+                    self.update_claimed_payments([payment.pk for payment in payments], claim_token,
+                                                 claim_time=timezone.now())
+
+            processed = defaultdict(list)  # type: Dict[str, List[int]]
+            with metrics.measure('process.processor', processor=processor_name):
+                for payment, result in self.run_processor(processor, candidates, snapshots):
+                    if result.result:
+                        processed[result.objective].append(payment.pk)
+
+            with metrics.measure('process.save'):
+                for objective, pks in processed.items():
+                    self.update_payments(pks, state=PaymentState.PROCESSED, processor=processor_name,
+                                         objective=objective)
+            processed_pks = {pk for pks in processed.values() for pk in pks}
+            if processed_pks:
+                metrics.count('process.processed', len(processed_pks), processor=processor_name)
+
+            payments = [payment for payment in payments if payment.pk not in processed_pks]
+
+        with metrics.measure('process.save'):
+            deferred = defaultdict(list)  # type: Dict[int, List[int]]
+            for payment in payments:
+                deferred[payment.processing_attempts + 1].append(payment.pk)
+            now = timezone.now()
+            for attempts, pks in deferred.items():
+                self.update_payments(pks, state=PaymentState.DEFERRED, processing_attempts=F('processing_attempts') + 1,
+                                     next_attempt_time=now + get_retry_delay(attempts))
+        metrics.count('process.deferred', len(payments))
+
+    @staticmethod
+    def get_snapshots(payments: Sequence[BankPayment]) -> Dict[int, PaymentSnapshot]:
+        """Return snapshots of payments by primary key."""
+        accounts = BankAccount.objects.in_bulk({payment.account_id for payment in payments})
+        return {payment.pk: PaymentSnapshot.from_payment(payment, accounts[payment.account_id])
+                for payment in payments}
+
+    def run_processor(self, processor: AbstractPaymentProcessor, payments: Sequence[BankPayment],
+                      snapshots: Optional[Dict[int, PaymentSnapshot]]
+                      ) -> Iterable[Tuple[BankPayment, ProcessPaymentResult]]:
+        """
+        Run payment processor on payments.
 
-            results = processor.process_payments(deepcopy(payment) for payment in payments)  # pragma: no cover
-            unprocessed_payments = []
+        If there are more workers, payments are split into equal parts processed concurrently.
+        Asynchronous processors process the parts on event loop in this thread, other processors
+        in worker threads. Results are returned in the original order of payments.
+        """
+        size = ceil(len(payments) / self.options['workers'])
+        if isinstance(processor, AsyncPaymentProcessor):
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+            return self.loop.run_until_complete(
+                run_async_processor(processor, list(chunked(payments, size)), snapshots))
+        if self.executor is None:
+            return run_processor(processor, payments, snapshots)
 
-            for payment, processed in zip(payments, results):
-                if processed.result:
-                    payment.state = PaymentState.PROCESSED
-                    payment.processor = "%s.%s" % (type(processor).__module__, type(processor).__qualname__)
-                    payment.objective = processed.objective
-                    payment.save()
-                else:
-                    unprocessed_payments.append(payment)
+        futures = [self.executor.submit(run_processor_in_thread, processor, part, snapshots)
+                   for part in chunked(payments, size)]
+        return [pair for future in futures for pair in future.result()]
 
-            payments = unprocessed_payments
+    @staticmethod
+    def update_payments(pks: List[int], **values: Any) -> None:
+        """Update payments with given primary keys."""
+        for pks_chunk in chunked(pks, UPDATE_BATCH_SIZE):
+            BankPayment.objects.filter(pk__in=pks_chunk).update(**values)
 
-        for unprocessed_payment in payments:
-            unprocessed_payment.state = PaymentState.DEFERRED
-            unprocessed_payment.save()
+    @staticmethod
+    def update_claimed_payments(pks: List[int], token: uuid.UUID, **values: Any) -> None:
+        """Update payments with given primary keys which are claimed with given token."""
+        for pks_chunk in chunked(pks, UPDATE_BATCH_SIZE):
+            BankPayment.objects.filter(pk__in=pks_chunk, claim_token=token).update(**values)
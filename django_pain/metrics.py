@@ -0,0 +1,200 @@
+"""
+Metrics of payment import and processing.
+
+Commands emit timings, counts and numbers of database queries to metrics backend
+defined by ``PAIN_METRICS_BACKEND`` setting.
+"""
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Dict, FrozenSet, Generator, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from django.db import connections
+from django.utils import module_loading
+
+from django_pain.settings import SETTINGS
+
+T = TypeVar('T')
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AbstractMetricsBackend(ABC):
+    """
+    Metrics backend.
+
+    Metrics are identified by name and optional tags (e.g. ``processor``).
+    """
+
+    @abstractmethod
+    def timing(self, name: str, seconds: float, **tags: str) -> None:
+        """Record duration of a stage in seconds."""
+
+    @abstractmethod
+    def count(self, name: str, value: int, **tags: str) -> None:
+        """Increase counter by value."""
+
+
+class NullMetricsBackend(AbstractMetricsBackend):
+    """Metrics backend discarding all metrics."""
+
+    def timing(self, name: str, seconds: float, **tags: str) -> None:
+        """Discard timing."""
+
+    def count(self, name: str, value: int, **tags: str) -> None:
+        """Discard count."""
+
+
+class MemoryMetricsBackend(AbstractMetricsBackend):
+    """Metrics backend summing up metrics in memory."""
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Delete all recorded metrics."""
+        self.timings = defaultdict(float)  # type: Dict[Tuple[str, FrozenSet], float]
+        self.counts = defaultdict(int)  # type: Dict[Tuple[str, FrozenSet], int]
+
+    def timing(self, name: str, seconds: float, **tags: str) -> None:
+        """Add duration to total duration of the stage."""
+        self.timings[(name, frozenset(tags.items()))] += seconds
+
+    def count(self, name: str, value: int, **tags: str) -> None:
+        """Increase counter by value."""
+        self.counts[(name, frozenset(tags.items()))] += value
+
+    def get_timing(self, name: str, **tags: str) -> float:
+        """Return total duration of the stage."""
+        return self.timings.get((name, frozenset(tags.items())), 0.0)
+
+    def get_count(self, name: str, **tags: str) -> int:
+        """Return value of counter."""
+        return self.counts.get((name, frozenset(tags.items())), 0)
+
+
+class LoggingMetricsBackend(AbstractMetricsBackend):
+    """Metrics backend writing metrics to ``django_pain.metrics`` logger."""
+
+    def timing(self, name: str, seconds: float, **tags: str) -> None:
+        """Log timing."""
+        LOGGER.info('%s [%s]: %.6f s', name, self._format_tags(tags), seconds)
+
+    def count(self, name: str, value: int, **tags: str) -> None:
+        """Log count."""
+        LOGGER.info('%s [%s]: %d', name, self._format_tags(tags), value)
+
+    @staticmethod
+    def _format_tags(tags: Dict[str, str]) -> str:
+        """Return tags formatted as comma separated list."""
+        return ','.join('%s=%s' % item for item in sorted(tags.items()))
+
+
+@lru_cache()
+def _get_backend(path: str) -> AbstractMetricsBackend:
+    """Return cached instance of metrics backend."""
+    return module_loading.import_string(path)()
+
+
+def get_backend() -> AbstractMetricsBackend:
+    """Return instance of metrics backend defined in settings."""
+    return _get_backend(SETTINGS.metrics_backend)
+
+
+class Stage(object):
+    """
+    Stage of import or processing.
+
+    Stage is measured whenever it is used as a context manager. Total duration and number of database
+    queries of all measurements are sent to metrics backend by ``emit``. Only queries made by current
+    thread are counted.
+    """
+
+    def __init__(self, name: str, **tags: str):
+        """Initialize stage with zero duration and number of queries."""
+        self.name = name
+        self.tags = tags
+        self.seconds = 0.0
+        self.queries = 0
+        self._stack = None  # type: Optional[ExitStack]
+        self._start = 0.0
+        self._active = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """Count database query made while the stage is measured."""
+        if self._active:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> 'Stage':
+        """Start measurement."""
+        self._stack = ExitStack()
+        self._stack.enter_context(self._count_queries())
+        self._active = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop measurement."""
+        self.seconds += time.perf_counter() - self._start
+        self._active = False
+        if self._stack is not None:
+            self._stack.close()
+
+    @contextmanager
+    def _count_queries(self) -> Iterator[None]:
+        """Install the stage as execute wrapper of database connections of current thread."""
+        wrapped = list(connections.all())
+        for connection in wrapped:
+            connection.execute_wrappers.append(self)
+        try:
+            yield
+        finally:
+            for connection in wrapped:
+                # Wrappers of other stages may have been installed in the meantime, so the stage is removed by identity.
+                connection.execute_wrappers.remove(self)
+
+    def iterate(self, iterable: Iterable[T]) -> Generator[T, None, None]:
+        """
+        Iterate over iterable and measure retrieval of items.
+
+        Execute wrapper is installed once for the whole iteration, so retrieval of each item
+        is measured only by performance counter.
+        """
+        iterator = iter(iterable)
+        with self._count_queries():
+            while True:
+                self._active = True
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.seconds += time.perf_counter() - start
+                    self._active = False
+                yield item
+
+    def emit(self) -> None:
+        """Send measured duration and number of queries to metrics backend."""
+        backend = get_backend()
+        backend.timing(self.name, self.seconds, **self.tags)
+        backend.count(self.name + '.queries', self.queries, **self.tags)
+
+
+@contextmanager
+def measure(name: str, **tags: str) -> Iterator[Stage]:
+    """Measure stage and send the results to metrics backend."""
+    stage = Stage(name, **tags)
+    with stage:
+        yield stage
+    stage.emit()
+
+
+def count(name: str, value: int, **tags: str) -> None:
+    """Send count to metrics backend."""
+    get_backend().count(name, value, **tags)
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_pain', '0009_auto_20180718_0416'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankpayment',
+            name='claim_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='bankpayment',
+            name='claim_token',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.28 on 2026-10-17 20:36
+
+from django.db import migrations, models
+
+from django_pain.operations import AddIndexConcurrently
+
+PENDING_INDEX = 'django_pain_bankpayment_pending_idx'
+
+
+def create_pending_index(apps, schema_editor):
+    """Create partial index of payments waiting for processing on PostgreSQL without blocking writes."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY {} ON django_pain_bankpayment (id) "
+            "WHERE state IN ('imported', 'deferred')".format(PENDING_INDEX))
+
+
+def drop_pending_index(apps, schema_editor):
+    """Drop partial index of payments waiting for processing on PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY {}'.format(PENDING_INDEX))
+
+
+class Migration(migrations.Migration):
+
+    # Indexes of large table are created concurrently on PostgreSQL, which is not possible in transaction.
+    atomic = False
+
+    dependencies = [
+        ('django_pain', '0010_bankpayment_claim'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bankpayment',
+            index=models.Index(fields=['state', 'create_time'], name='django_pain_state_9d2879_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bankpayment',
+            index=models.Index(fields=['account', 'transaction_date'], name='django_pain_account_5a8803_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bankpayment',
+            index=models.Index(fields=['transaction_date'], name='django_pain_transac_27e0d8_idx'),
+        ),
+        migrations.RunPython(create_pending_index, drop_pending_index),
+    ]
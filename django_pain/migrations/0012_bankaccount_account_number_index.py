@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-17 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_pain', '0011_bankpayment_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankaccount',
+            name='account_number',
+            field=models.TextField(db_index=True, verbose_name='Account number'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+from django_pain.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Index of large table is created concurrently on PostgreSQL, which is not possible in transaction.
+    atomic = False
+
+    dependencies = [
+        ('django_pain', '0012_bankaccount_account_number_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankpayment',
+            name='next_attempt_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='bankpayment',
+            name='processing_attempts',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        AddIndexConcurrently(
+            model_name='bankpayment',
+            index=models.Index(fields=['state', 'next_attempt_time'], name='django_pain_state_ccda23_idx'),
+        ),
+    ]
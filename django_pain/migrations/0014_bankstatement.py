@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import django_pain.constants
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_pain', '0013_bankpayment_next_attempt_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.TextField(unique=True)),
+                ('file_name', models.TextField(blank=True)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('state', models.TextField(choices=[(django_pain.constants.StatementState('importing'), 'importing'), (django_pain.constants.StatementState('imported'), 'imported')], default=django_pain.constants.StatementState('importing'))),
+                ('create_time', models.DateTimeField(auto_now_add=True)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='django_pain.BankAccount')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bankpayment',
+            name='statement',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments', to='django_pain.BankStatement'),
+        ),
+    ]
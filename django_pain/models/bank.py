@@ -1,14 +1,18 @@
 """Payments and invoices models."""
 import uuid
+from decimal import Context, Decimal, Inexact, InvalidOperation
+from typing import Dict, List
 
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import BLANK_CHOICE_DASH
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from djmoney.models.fields import CurrencyField, MoneyField
+from djmoney.money import Money
 
-from django_pain.constants import CURRENCY_PRECISION, PaymentState
-from django_pain.settings import SETTINGS
+from django_pain.constants import AMOUNT_MAX_DIGITS, CURRENCY_PRECISION, PaymentState, StatementState
+from django_pain.settings import SETTINGS, get_processor_instance
 from django_pain.utils import full_class_name
 
 PAYMENT_STATE_CHOICES = (
@@ -18,11 +22,21 @@ PAYMENT_STATE_CHOICES = (
     (PaymentState.EXPORTED, _('exported')),
 )
 
+# Quantizer of amounts to precision of amount field, cached because amounts of all imported payments are checked.
+AMOUNT_QUANTUM = Decimal(1).scaleb(-CURRENCY_PRECISION)
+# Quantization in this context fails if amount has more digits or decimal places than amount field can store.
+AMOUNT_CONTEXT = Context(prec=AMOUNT_MAX_DIGITS, traps=[InvalidOperation, Inexact])
+
+STATEMENT_STATE_CHOICES = (
+    (StatementState.IMPORTING, StatementState.IMPORTING.value),
+    (StatementState.IMPORTED, StatementState.IMPORTED.value),
+)
+
 
 class BankAccount(models.Model):
     """Bank account."""
 
-    account_number = models.TextField(verbose_name=_('Account number'))
+    account_number = models.TextField(db_index=True, verbose_name=_('Account number'))
     account_name = models.TextField(blank=True, verbose_name=_('Account name'))
     currency = CurrencyField()
 
@@ -31,8 +45,29 @@ class BankAccount(models.Model):
         return self.account_number
 
 
-class BankPayment(models.Model):
-    """Bank payment."""
+class BankStatement(models.Model):
+    """
+    Journal of bank statement import.
+
+    Statement is identified by hash of its content. Number of items is increased together
+    with commit of each chunk of payments, so interrupted import can be resumed.
+    """
+
+    content_hash = models.TextField(unique=True)
+    file_name = models.TextField(blank=True)
+    account = models.ForeignKey(BankAccount, null=True, blank=True, on_delete=models.CASCADE)
+    item_count = models.PositiveIntegerField(default=0)
+    state = models.TextField(choices=STATEMENT_STATE_CHOICES, default=StatementState.IMPORTING)
+    create_time = models.DateTimeField(auto_now_add=True)
+    update_time = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """Return string representation of bank statement."""
+        return self.file_name or self.content_hash
+
+
+class AbstractBankPayment(models.Model):
+    """Base of bank payments and archived bank payments."""
 
     identifier = models.TextField(verbose_name=_('Payment ID'))
     uuid = models.UUIDField(unique=True, editable=False, default=uuid.uuid4)
@@ -43,7 +78,7 @@ class BankPayment(models.Model):
     counter_account_number = models.TextField(verbose_name=_('Counter account number'))
     counter_account_name = models.TextField(blank=True, verbose_name=_('Counter account name'))
 
-    amount = MoneyField(max_digits=64, decimal_places=CURRENCY_PRECISION, verbose_name=_('Amount'))
+    amount = MoneyField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=CURRENCY_PRECISION, verbose_name=_('Amount'))
     description = models.TextField(blank=True, verbose_name=_('Description'))
     state = models.TextField(choices=PAYMENT_STATE_CHOICES, default=PaymentState.IMPORTED,
                              verbose_name=_('Payment state'))
@@ -59,13 +94,63 @@ class BankPayment(models.Model):
     class Meta:
         """Model Meta class."""
 
+        abstract = True
         unique_together = ('identifier', 'account')
 
+    def clean_fields(self, exclude=None):
+        """
+        Clean all fields that aren't in exclude.
+
+        Amount is checked by ``clean_amount``, because validation of money field constructs money objects
+        several times, which is slow for imports of large statements.
+        """
+        exclude = list(exclude or [])
+        errors = {}  # type: Dict[str, List[ValidationError]]
+        if 'amount' not in exclude:
+            try:
+                self.clean_amount()
+            except ValidationError as error:
+                errors = error.update_error_dict(errors)
+        try:
+            super().clean_fields(exclude=exclude + ['amount'])
+        except ValidationError as error:
+            errors = error.update_error_dict(errors)
+        if errors:
+            raise ValidationError(errors)
+
+    def clean_amount(self):
+        """
+        Check whether amount can be stored in amount field.
+
+        Amount is checked by a single quantization, which fails if any digit would be lost.
+        Unlike validation of decimal fields, trailing zeros beyond the field precision are accepted.
+        """
+        # Amount is read without the field descriptor, which would construct money object.
+        if 'amount' not in self.__dict__:
+            # Money field descriptor does not load deferred amount, so it is loaded explicitly.
+            self.__dict__['amount'] = type(self)._base_manager.using(self._state.db).values_list(
+                'amount', flat=True).get(pk=self.pk)
+        amount = self.__dict__['amount']
+        if isinstance(amount, Money):
+            amount = amount.amount
+        if amount is None:
+            raise ValidationError({'amount': ValidationError(
+                self._meta.get_field('amount').error_messages['null'], code='null')})
+        try:
+            valid = Decimal(amount).quantize(AMOUNT_QUANTUM, context=AMOUNT_CONTEXT).is_finite()
+        except (InvalidOperation, Inexact, TypeError, ValueError):
+            valid = False
+        if not valid:
+            raise ValidationError({'amount': ValidationError(
+                _('Ensure that amount has at most %(max_digits)s digits and %(decimal_places)s decimal places.'),
+                code='invalid', params={'max_digits': AMOUNT_MAX_DIGITS, 'decimal_places': CURRENCY_PRECISION})})
+
     def clean(self):
         """Check whether payment currency is the same as currency of related bank account."""
-        if self.account.currency != self.amount.currency.code:
+        # Currency codes are compared, so amount does not have to be converted to money.
+        if self.account.currency != self.amount_currency:
             raise ValidationError('Bank payment {} is in different currency ({}) than bank account {} ({}).'.format(
-                self.identifier, self.amount.currency.code, self.account.account_number, self.account.currency
+                self.identifier, self.amount_currency, self.account.account_number, self.account.currency
             ))
         super().clean()
 
@@ -74,6 +159,62 @@ class BankPayment(models.Model):
         """Return payment processor default objectives choices."""
         choices = BLANK_CHOICE_DASH.copy()
         for proc_class in SETTINGS.processors:
-            proc = proc_class()
+            proc = get_processor_instance(proc_class)
             choices.append((full_class_name(proc_class), proc.default_objective))
         return choices
+
+
+class BankPayment(AbstractBankPayment):
+    """
+    Bank payment.
+
+    Settled payments may be moved to archive (see ``ArchivedBankPayment``).
+    """
+
+    # Claim of payment by process_payments command on databases which cannot skip locked rows.
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    claim_time = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Number of unsuccessful processing attempts and time when deferred payment should be processed again.
+    processing_attempts = models.PositiveIntegerField(default=0, editable=False)
+    next_attempt_time = models.DateTimeField(null=True, blank=True, editable=False)
+
+    statement = models.ForeignKey(BankStatement, null=True, blank=True, editable=False, on_delete=models.SET_NULL,
+                                  related_name='payments')
+
+    class Meta(AbstractBankPayment.Meta):
+        """Model Meta class."""
+
+        indexes = [
+            # Selection of payments to process. PostgreSQL also has partial index of pending payments.
+            models.Index(fields=['state', 'create_time'], name='django_pain_state_9d2879_idx'),
+            # Selection of deferred payments due for processing.
+            models.Index(fields=['state', 'next_attempt_time'], name='django_pain_state_ccda23_idx'),
+            # Admin filters.
+            models.Index(fields=['account', 'transaction_date'], name='django_pain_account_5a8803_idx'),
+            models.Index(fields=['transaction_date'], name='django_pain_transac_27e0d8_idx'),
+        ]
+
+
+class ArchivedBankPayment(AbstractBankPayment):
+    """
+    Archived bank payment.
+
+    Processed and exported payments are moved from ``BankPayment`` table by ``archive_payments`` command,
+    so the table of payments stays small. Archived payments keep their primary keys.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    archive_time = models.DateTimeField(default=timezone.now, verbose_name=_('Archive time'))
+
+    class Meta(AbstractBankPayment.Meta):
+        """Model Meta class."""
+
+        verbose_name = _('archived bank payment')
+        verbose_name_plural = _('archived bank payments')
+        indexes = [
+            # Detection of duplicate payments, admin filters and search.
+            models.Index(fields=['account', 'transaction_date'], name='django_pain_account_110971_idx'),
+            models.Index(fields=['variable_symbol'], name='django_pain_variabl_63f214_idx'),
+            models.Index(fields=['counter_account_number'], name='django_pain_counter_0e4f51_idx'),
+        ]
@@ -0,0 +1,43 @@
+"""Custom migration operations."""
+from django.db import NotSupportedError, migrations
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    Add index without blocking writes to the table.
+
+    On PostgreSQL, index is built by ``CREATE INDEX CONCURRENTLY``, which cannot run in a transaction,
+    so migration containing this operation has to be non-atomic. Other databases add index as usual.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        """Create index concurrently on PostgreSQL."""
+        if schema_editor.connection.vendor != 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+            return
+        self._check_atomic(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            sql = str(self.index.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        """Drop index concurrently on PostgreSQL."""
+        if schema_editor.connection.vendor != 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+            return
+        self._check_atomic(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute('DROP INDEX CONCURRENTLY {}'.format(schema_editor.quote_name(self.index.name)))
+
+    def describe(self):
+        """Return description of the operation."""
+        return 'Concurrently create index {} on field(s) {} of model {}'.format(
+            self.index.name, ', '.join(self.index.fields), self.model_name)
+
+    @staticmethod
+    def _check_atomic(schema_editor):
+        """Raise an error if migration runs in a transaction."""
+        if schema_editor.atomic_migration:
+            raise NotSupportedError('Indexes cannot be created concurrently in atomic migration.')
@@ -1,4 +1,4 @@
 """Parsers module."""
-from .common import AbstractBankStatementParser
+from .common import AbstractBankStatementParser, PaymentFactory, parse_iso_date
 
-__all__ = ['AbstractBankStatementParser']
+__all__ = ['AbstractBankStatementParser', 'PaymentFactory', 'parse_iso_date']
@@ -0,0 +1,126 @@
+"""
+CAMT.053 parser.
+
+CAMT.053 is XML format of bank statements defined by ISO 20022 (message Bank to Customer Statement).
+"""
+import re
+from typing import IO, Dict, Iterator, List, Optional
+
+from lxml import etree
+
+from django_pain.parsers.czechslovak import CzechSlovakBankStatementParser
+from django_pain.parsers.records import Column, RecordBankStatementParser, date_parser
+
+# Payment symbols in references of entries, e.g. '/VS1234/SS5678/KS0558'.
+SYMBOL_RE = re.compile(r'(VS|SS|KS)[:/]?([0-9]{1,10})')
+
+
+class Camt053StatementParser(RecordBankStatementParser, CzechSlovakBankStatementParser):
+    """
+    Parser of bank statements in CAMT.053 format.
+
+    Each entry (``Ntry``) is one payment, only the first transaction details of batch entries are used.
+    Czech and Slovak IBANs are converted to national account numbers. Payment symbols are read
+    from end-to-end identifier of the transaction in the form used by Czech banks (``/VS1234/KS0558``).
+
+    Statement is parsed incrementally, processed entries are discarded.
+    """
+
+    columns = {
+        'account': Column('account'),
+        'identifier': Column('identifier'),
+        'transaction_date': Column('transaction_date', date_parser('%Y-%m-%d')),
+        'counter_account_number': Column('counter_account_number'),
+        'counter_account_name': Column('counter_account_name'),
+        'amount': Column('amount'),
+        'description': Column('description'),
+        'constant_symbol': Column('constant_symbol'),
+        'variable_symbol': Column('variable_symbol'),
+        'specific_symbol': Column('specific_symbol'),
+    }
+
+    def iter_records(self, bank_statement: IO[bytes]) -> Iterator[Dict[str, str]]:
+        """Return iterator over statement entries."""
+        account = ''
+        events = etree.iterparse(bank_statement, events=('end',), resolve_entities=False, tag=('{*}Acct', '{*}Ntry'))
+        for _, element in events:
+            if etree.QName(element).localname == 'Ntry':
+                yield self.parse_entry(element, account)
+                # Drop processed entry together with already processed siblings.
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            elif etree.QName(element.getparent()).localname == 'Stmt':
+                account = self.get_account_number(get_values(element))
+
+    def parse_entry(self, entry: etree._Element, account: str) -> Dict[str, str]:
+        """Return record of statement entry."""
+        values = get_values(entry)
+        credit = get_value(values, 'CdtDbtInd') == 'CRDT'
+        amount = get_value(values, 'Amt').strip()
+        if not credit:
+            amount = '-' + amount
+        record = {
+            'account': account,
+            'identifier': get_value(values, 'AcctSvcrRef') or get_value(values, 'NtryRef'),
+            'transaction_date': get_value(values, 'BookgDt/Dt') or get_value(values, 'BookgDt/DtTm')[:10],
+            'amount': amount,
+            'description': get_value(values, 'AddtlNtryInf'),
+        }
+
+        # Counterparty is the debtor of incoming payments and the creditor of outgoing payments.
+        party = 'Dbtr' if credit else 'Cdtr'
+        account_prefix = 'RltdPties/{}Acct/'.format(party)
+        account_values = {path[len(account_prefix):]: value for path, value in values.items()
+                          if path.startswith(account_prefix)}
+        if account_values:
+            record['counter_account_number'] = self.get_account_number(account_values)
+        record['counter_account_name'] = get_value(values, 'RltdPties/{}/Nm'.format(party))
+        remittance = ' '.join(values.get('RmtInf/Ustrd', ()))
+        if remittance:
+            record['description'] = remittance
+        symbols = dict(SYMBOL_RE.findall(get_value(values, 'Refs/EndToEndId')))
+        record['variable_symbol'] = symbols.get('VS', '')
+        record['specific_symbol'] = symbols.get('SS', '')
+        record['constant_symbol'] = symbols.get('KS', '')
+        return record
+
+    def get_account_number(self, values: Dict[str, List[str]]) -> str:
+        """Return number of account (IBAN or other identification)."""
+        iban = get_value(values, 'Id/IBAN')
+        if iban:
+            return self.iban_to_account_number(iban)
+        return get_value(values, 'Id/Othr/Id')
+
+
+def get_values(element: etree._Element, prefix: str = '',
+               values: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+    """
+    Return texts of descendant elements by their paths without namespaces.
+
+    Transaction details (``NtryDtls/TxDtls``) are flattened into entry, only the first one is used.
+    Flattening of the whole element at once is much faster than separate searches for each value.
+    """
+    if values is None:
+        values = {}
+    for child in element:
+        tag = child.tag
+        if not isinstance(tag, str):
+            # Comment or processing instruction.
+            continue
+        name = tag[tag.find('}') + 1:]
+        if name == 'NtryDtls':
+            details = next(iter(child), None)
+            if details is not None:
+                get_values(details, prefix, values)
+        elif len(child):
+            get_values(child, prefix + name + '/', values)
+        elif child.text is not None:
+            values.setdefault(prefix + name, []).append(child.text)
+    return values
+
+
+def get_value(values: Dict[str, List[str]], path: str) -> str:
+    """Return the first text of elements with given path or empty string."""
+    texts = values.get(path)
+    return texts[0] if texts else ''
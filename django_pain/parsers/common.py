@@ -1,8 +1,64 @@
 """Base bank statement parser module."""
+import re
 from abc import ABC, abstractmethod
-from typing import IO, Iterable
+from datetime import datetime
+from functools import lru_cache
+from typing import IO, Any, Callable, Dict, Iterable, List, Tuple
 
-from django_pain.models import BankPayment
+from django_pain.models import BankAccount, BankPayment
+
+ISO_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}\Z')
+
+
+@lru_cache(maxsize=1024)
+def parse_iso_date(value: str) -> datetime:
+    """
+    Return datetime parsed from date in ISO format (YYYY-MM-DD).
+
+    Result is equal to ``datetime.strptime(value, '%Y-%m-%d')``, which is much slower.
+    Results are cached, because statements usually contain only a few distinct dates.
+    """
+    if isinstance(value, str) and ISO_DATE_RE.match(value):
+        return datetime(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+class PaymentFactory(object):
+    """
+    Fast constructor of bank payments of a single bank account.
+
+    Payments are created with positional arguments, which skips processing of keyword
+    arguments and default values in model constructor. Values are passed by field attribute
+    names; fields which are not passed get their default values.
+
+    Currency of payments is set to currency of the account once for all payments, so amounts may be passed
+    as decimals. Money objects are then constructed only when the amount is accessed.
+    """
+
+    def __init__(self, account: BankAccount):
+        """Prepare default values of payment fields."""
+        self.account = account
+        fields = BankPayment._meta.concrete_fields
+        self._indexes = {field.attname: index for index, field in enumerate(fields)}
+        # Callable defaults (e.g. UUID) have to be evaluated for each payment.
+        self._default_callables = [(index, field.default) for index, field in enumerate(fields)
+                                   if field.has_default() and callable(field.default)
+                                   ]  # type: List[Tuple[int, Callable]]
+        self._defaults = [field.get_default() for field in fields]  # type: List[Any]
+        self._defaults[self._indexes['account_id']] = account.pk
+        self._defaults[self._indexes['amount_currency']] = account.currency
+        self._account_field = BankPayment._meta.get_field('account')
+
+    def __call__(self, **values: Any) -> BankPayment:
+        """Return new bank payment with given field values."""
+        args = self._defaults.copy()
+        for index, default in self._default_callables:
+            args[index] = default()
+        for name, value in values.items():
+            args[self._indexes[name]] = value
+        payment = BankPayment(*args)
+        self._account_field.set_cached_value(payment, self.account)
+        return payment
 
 
 class AbstractBankStatementParser(ABC):
@@ -23,3 +79,23 @@ class AbstractBankStatementParser(ABC):
         If bank account does not exist in database, parser should raise
         BankAccount.DoesNotExist exception.
         """
+
+    def get_account(self, account_number: str) -> BankAccount:
+        """
+        Return bank account with given account number.
+
+        Accounts are cached, so parsing many statements of the same account queries
+        the database only once. Raise BankAccount.DoesNotExist if account does not exist.
+        """
+        if not hasattr(self, '_account_cache'):
+            self._account_cache = {}  # type: Dict[str, BankAccount]
+        if account_number not in self._account_cache:
+            try:
+                self._account_cache[account_number] = BankAccount.objects.get(account_number=account_number)
+            except BankAccount.DoesNotExist:
+                raise BankAccount.DoesNotExist('Bank account %s does not exist.' % account_number)
+        return self._account_cache[account_number]
+
+    def clear_account_cache(self) -> None:
+        """Clear cache of bank accounts."""
+        self._account_cache = {}
@@ -0,0 +1,40 @@
+"""CSV parser."""
+import csv
+from io import TextIOWrapper
+from typing import IO, Dict, Iterator, Type, Union
+
+from django_pain.parsers.records import Column, RecordBankStatementParser, date_parser
+
+
+class CsvStatementParser(RecordBankStatementParser):
+    """
+    Parser of bank statements in CSV format.
+
+    The first row contains column names. By default, columns are named after payment fields,
+    account number is in column ``account`` and dates are in ISO format. Subclasses may change
+    ``encoding``, ``dialect`` and ``columns`` to read exports of particular banks.
+    """
+
+    encoding = 'utf-8-sig'
+    dialect = 'excel'  # type: Union[str, Type[csv.Dialect]]
+    columns = {
+        'account': Column('account'),
+        'identifier': Column('identifier'),
+        'transaction_date': Column('transaction_date', date_parser('%Y-%m-%d')),
+        'counter_account_number': Column('counter_account_number'),
+        'counter_account_name': Column('counter_account_name'),
+        'amount': Column('amount'),
+        'description': Column('description'),
+        'constant_symbol': Column('constant_symbol'),
+        'variable_symbol': Column('variable_symbol'),
+        'specific_symbol': Column('specific_symbol'),
+    }
+
+    def iter_records(self, bank_statement: IO[bytes]) -> Iterator[Dict[str, str]]:
+        """Return iterator over rows of CSV file."""
+        text = TextIOWrapper(bank_statement, encoding=self.encoding, newline='')
+        try:
+            yield from csv.DictReader(text, dialect=self.dialect)
+        finally:
+            # Bank statement is closed by its owner.
+            text.detach()
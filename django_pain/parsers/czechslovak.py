@@ -13,3 +13,24 @@ class CzechSlovakBankStatementParser(AbstractBankStatementParser):
         Czech and Slovak bank accounts have account number separated from bank code using slash.
         """
         return '{}/{}'.format(number, bank_code)
+
+    @classmethod
+    def compose_prefixed_account_number(cls, prefix: str, number: str, bank_code: str) -> str:
+        """
+        Compose account number from zero padded prefix, number and bank code.
+
+        Leading zeros are removed and non-zero prefix is separated from number using dash.
+        """
+        prefix = prefix.lstrip('0')
+        number = number.lstrip('0')
+        if prefix:
+            number = '{}-{}'.format(prefix, number)
+        return cls.compose_account_number(number, bank_code)
+
+    @classmethod
+    def iban_to_account_number(cls, iban: str) -> str:
+        """Return account number of Czech or Slovak IBAN. Other IBANs are returned unchanged."""
+        iban = iban.replace(' ', '')
+        if iban[:2] in ('CZ', 'SK') and len(iban) == 24:
+            return cls.compose_prefixed_account_number(iban[8:14], iban[14:], iban[4:8])
+        return iban
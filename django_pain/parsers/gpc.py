@@ -0,0 +1,82 @@
+"""
+GPC (ABO) parser.
+
+GPC is fixed-width format of bank statements used by Czech and Slovak banks.
+Statement consists of lines with 128 characters. Each line starts with type of the record.
+"""
+from abc import abstractmethod
+from io import TextIOWrapper
+from typing import IO, Dict, Iterator
+
+from django_pain.parsers.czechslovak import CzechSlovakBankStatementParser
+from django_pain.parsers.records import Column, RecordBankStatementParser, date_parser, parse_amount
+
+# Type of transaction record.
+TRANSACTION_RECORD = '075'
+# Accounting codes of debit transactions and cancelled credit transactions.
+NEGATIVE_ACCOUNTING_CODES = ('1', '5')
+
+
+class GpcStatementParser(RecordBankStatementParser, CzechSlovakBankStatementParser):
+    """
+    Parser of bank statements in GPC format.
+
+    Only transaction records (075) are used, other records are skipped.
+    Account numbers are expected in the standard (not internal) GPC format.
+    Bank code of statement accounts is not part of the format, so it has to be defined by subclasses.
+    """
+
+    encoding = 'cp1250'
+    columns = {
+        'account': Column('account'),
+        'identifier': Column('identifier'),
+        'transaction_date': Column('transaction_date', date_parser('%d%m%y')),
+        'counter_account_number': Column('counter_account_number'),
+        'counter_account_name': Column('counter_account_name'),
+        'amount': Column('amount'),
+        'constant_symbol': Column('constant_symbol'),
+        'variable_symbol': Column('variable_symbol'),
+        'specific_symbol': Column('specific_symbol'),
+    }
+
+    @property
+    @abstractmethod
+    def bank_code(self) -> str:
+        """Return bank code of accounts in statements."""
+
+    def iter_records(self, bank_statement: IO[bytes]) -> Iterator[Dict[str, str]]:
+        """Return iterator over transaction records."""
+        text = TextIOWrapper(bank_statement, encoding=self.encoding)
+        try:
+            for line in text:
+                if line.startswith(TRANSACTION_RECORD):
+                    yield self.parse_transaction(line)
+        finally:
+            # Bank statement is closed by its owner.
+            text.detach()
+
+    def parse_transaction(self, line: str) -> Dict[str, str]:
+        """Return record of transaction line."""
+        amount = parse_amount(line[48:60])
+        if amount is not None:
+            amount = amount.scaleb(-2)
+            if line[60] in NEGATIVE_ACCOUNTING_CODES:
+                amount = -amount
+        counter_account = line[19:35]
+        if counter_account.strip('0 '):
+            counter_account_number = self.compose_prefixed_account_number(
+                counter_account[:6], counter_account[6:], line[73:77])
+        else:
+            counter_account_number = ''
+        return {
+            'account': self.compose_prefixed_account_number(line[3:9], line[9:19], self.bank_code),
+            'identifier': line[35:48].strip(),
+            'transaction_date': line[91:97],
+            'counter_account_number': counter_account_number,
+            'counter_account_name': line[97:117].strip(),
+            # Invalid amount is reported by validation of the payment.
+            'amount': '' if amount is None else str(amount),
+            'constant_symbol': line[77:81].strip('0 ') and line[77:81],
+            'variable_symbol': line[61:71].lstrip('0 '),
+            'specific_symbol': line[81:91].lstrip('0 '),
+        }
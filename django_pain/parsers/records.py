@@ -0,0 +1,97 @@
+"""Base of parsers of bank statements consisting of flat records."""
+from abc import abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+
+from django_pain.models import BankPayment
+from django_pain.parsers.common import AbstractBankStatementParser, PaymentFactory, parse_iso_date
+
+
+def date_parser(date_format: str) -> Callable[[str], datetime]:
+    """Return function parsing dates in given format with cached results."""
+    if date_format == '%Y-%m-%d':
+        return parse_iso_date
+
+    @lru_cache(maxsize=1024)
+    def parse_date(value: str) -> datetime:
+        return datetime.strptime(value, date_format)
+    return parse_date
+
+
+class Column(object):
+    """
+    Declaration of record value mapped to payment field.
+
+    Value of ``source`` key of the record is converted by ``convert`` function.
+    Missing and empty values are replaced by ``default`` without conversion.
+    Values which cannot be converted are left as they are, so they are reported by validation of the payment.
+    """
+
+    __slots__ = ('source', 'convert', 'default')
+
+    def __init__(self, source: str, convert: Optional[Callable[[str], Any]] = None, default: Any = ''):
+        """Initialize column."""
+        self.source = source
+        self.convert = convert
+        self.default = default
+
+    def get_value(self, record: Dict[str, str]) -> Any:
+        """Return converted value of the column in record."""
+        value = record.get(self.source)
+        if value is None or value == '':
+            return self.default
+        if self.convert is None:
+            return value
+        try:
+            return self.convert(value)
+        except (ArithmeticError, TypeError, ValueError):
+            return value
+
+
+def parse_amount(value: Any) -> Optional[Decimal]:
+    """
+    Return amount as decimal.
+
+    Missing or invalid amount is returned as None, so the payment is reported by its validation.
+    Money field does not accept any other values which are not decimal numbers.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(value)
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+
+
+class RecordBankStatementParser(AbstractBankStatementParser):
+    """
+    Parser of bank statements consisting of flat records.
+
+    Subclasses implement ``iter_records``, which yields records (dictionaries of strings) one by one,
+    and declare mapping of payment fields to record values in ``columns``. Column ``account`` contains
+    number of bank account and column ``amount`` contains amount in currency of the account.
+    Other columns are mapped to payment fields of the same name.
+
+    Payments are created as records are read, so memory consumption does not depend on size of the statement.
+    """
+
+    columns = {}  # type: Dict[str, Column]
+
+    @abstractmethod
+    def iter_records(self, bank_statement: IO[bytes]) -> Iterator[Dict[str, str]]:
+        """Return iterator over records of bank statement."""
+
+    def parse(self, bank_statement: IO[bytes]) -> Iterator[BankPayment]:
+        """Parse records of bank statement."""
+        factories = {}  # type: Dict[str, PaymentFactory]
+        columns = list(self.columns.items())
+        for record in self.iter_records(bank_statement):
+            values = {name: column.get_value(record) for name, column in columns}
+            account_number = values.pop('account')
+            factory = factories.get(account_number)
+            if factory is None:
+                factory = factories[account_number] = PaymentFactory(self.get_account(account_number))
+            values['amount'] = parse_amount(values['amount'])
+            yield factory(**values)
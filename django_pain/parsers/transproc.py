@@ -6,13 +6,13 @@ transforming them into unified XML format.
 
 URL: https://github.com/CZ-NIC/fred-transproc
 """
-from datetime import datetime
-from typing import IO, Iterator
+from decimal import Decimal
+from typing import IO, Dict, Iterator, Optional
 
-from djmoney.money import Money
 from lxml import etree
 
 from django_pain.models import BankAccount, BankPayment
+from django_pain.parsers.common import PaymentFactory, parse_iso_date
 from django_pain.parsers.czechslovak import CzechSlovakBankStatementParser
 
 
@@ -22,34 +22,81 @@ def none_to_str(value: str) -> str:
 
 
 class TransprocXMLParser(CzechSlovakBankStatementParser):
-    """Transproc XML parser."""
+    """
+    Transproc XML parser.
+
+    By default, whole XML tree is loaded into memory before first payment is returned.
+    If ``streaming`` is set to True, statement is parsed incrementally and processed items
+    are discarded, so memory consumption does not depend on size of the statement.
+    """
+
+    streaming = False
 
     def parse(self, bank_statement: IO[bytes]) -> Iterator[BankPayment]:
         """Parse XML input."""
+        if self.streaming:
+            return self._parse_stream(bank_statement)
+        else:
+            return self._parse_tree(bank_statement)
+
+    def _parse_tree(self, bank_statement: IO[bytes]) -> Iterator[BankPayment]:
+        """Parse XML input loaded into element tree."""
         parser = etree.XMLParser(resolve_entities=False)
         tree = etree.parse(bank_statement, parser)
 
-        account_number = self.compose_account_number(tree.find('//*/account_number').text,
-                                                     tree.find('//*/account_bank_code').text)
-        try:
-            account = BankAccount.objects.get(account_number=account_number)
-        except BankAccount.DoesNotExist:
-            raise BankAccount.DoesNotExist('Bank account %s does not exist.' % account_number)
+        account = self._get_account(tree.find('//*/account_number').text, tree.find('//*/account_bank_code').text)
+        factory = PaymentFactory(account)
 
         for item in tree.findall('//*/*/item'):
-            attrs = dict((el.tag, el.text) for el in item.iterchildren())
-
-            payment = BankPayment(
-                identifier=attrs['ident'],
-                account=account,
-                transaction_date=datetime.strptime(attrs['date'], '%Y-%m-%d'),
-                counter_account_number=self.compose_account_number(attrs['account_number'], attrs['account_bank_code']),
-                counter_account_name=none_to_str(attrs['name']),
-                amount=Money(attrs['price'], account.currency),
-                description=none_to_str(attrs['memo']),
-                constant_symbol=none_to_str(attrs['const_symbol']),
-                variable_symbol=none_to_str(attrs['var_symbol']),
-                specific_symbol=none_to_str(attrs['spec_symbol']),
-            )
-
-            yield payment
+            yield self._get_payment({el.tag: el.text for el in item}, factory)
+
+    def _parse_stream(self, bank_statement: IO[bytes]) -> Iterator[BankPayment]:
+        """
+        Parse XML input incrementally.
+
+        Account header has to precede items of the statement, otherwise ValueError is raised.
+        """
+        factory = None  # type: Optional[PaymentFactory]
+        header = {}  # type: Dict[str, str]
+        events = etree.iterparse(bank_statement, events=('end',), resolve_entities=False,
+                                 tag=('account_number', 'account_bank_code', 'item'))
+
+        for _, element in events:
+            if element.tag == 'item':
+                if factory is None:
+                    raise ValueError('Statement item precedes account header.')
+                yield self._get_payment({el.tag: el.text for el in element}, factory)
+                # Drop processed item together with already processed siblings.
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            elif factory is None and element.getparent().tag != 'item':
+                # Account header precedes items. As in tree mode, the first statement header determines account.
+                header[element.tag] = element.text
+                if len(header) == 2:
+                    factory = PaymentFactory(self._get_account(header['account_number'],
+                                                               header['account_bank_code']))
+
+    def _get_account(self, number: str, bank_code: str) -> BankAccount:
+        """Return bank account or raise an exception if it does not exist."""
+        return self.get_account(self.compose_account_number(number, bank_code))
+
+    def _get_payment(self, attrs: Dict[str, str], factory: PaymentFactory) -> BankPayment:
+        """Create bank payment from item attributes."""
+        return factory(
+            identifier=attrs['ident'],
+            transaction_date=parse_iso_date(attrs['date']),
+            counter_account_number=self.compose_account_number(attrs['account_number'], attrs['account_bank_code']),
+            counter_account_name=none_to_str(attrs['name']),
+            amount=Decimal(attrs['price']),
+            description=none_to_str(attrs['memo']),
+            constant_symbol=none_to_str(attrs['const_symbol']),
+            variable_symbol=none_to_str(attrs['var_symbol']),
+            specific_symbol=none_to_str(attrs['spec_symbol']),
+        )
+
+
+class StreamingTransprocXMLParser(TransprocXMLParser):
+    """Transproc XML parser with streaming mode enabled."""
+
+    streaming = True
@@ -1,4 +1,4 @@
 """Processors module."""
-from .common import AbstractPaymentProcessor, ProcessPaymentResult
+from .common import AbstractPaymentProcessor, AsyncPaymentProcessor, PaymentSnapshot, ProcessPaymentResult
 
-__all__ = ['AbstractPaymentProcessor', 'ProcessPaymentResult']
+__all__ = ['AbstractPaymentProcessor', 'AsyncPaymentProcessor', 'PaymentSnapshot', 'ProcessPaymentResult']
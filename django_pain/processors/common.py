@@ -1,15 +1,81 @@
 """Base payment processor module."""
 from abc import ABC, abstractmethod
 from collections import namedtuple
-from typing import Iterable
+from decimal import Decimal
+from functools import reduce
+from operator import and_
+from typing import Iterable, List, Optional, Sequence, Union
 
-from django_pain.models import BankPayment
+from django.db.models import Q
+
+from django_pain.models import BankAccount, BankPayment
 
 ProcessPaymentResult = namedtuple('ProcessPaymentResult', ['result', 'objective'])
 
 
+class PaymentSnapshot(namedtuple('PaymentSnapshot', [
+        'uuid', 'identifier', 'account_number', 'create_time', 'transaction_date',
+        'counter_account_number', 'counter_account_name', 'amount', 'description', 'state',
+        'constant_symbol', 'variable_symbol', 'specific_symbol'])):
+    """
+    Immutable snapshot of bank payment.
+
+    Lightweight alternative to BankPayment objects passed to payment processors.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_payment(cls, payment: BankPayment, account: Optional[BankAccount] = None) -> 'PaymentSnapshot':
+        """
+        Create snapshot of bank payment.
+
+        Related bank account may be provided to avoid its loading from database.
+        """
+        if account is None:
+            account = payment.account
+        return cls(
+            uuid=payment.uuid,
+            identifier=payment.identifier,
+            account_number=account.account_number,
+            create_time=payment.create_time,
+            transaction_date=payment.transaction_date,
+            counter_account_number=payment.counter_account_number,
+            counter_account_name=payment.counter_account_name,
+            amount=payment.amount,
+            description=payment.description,
+            state=payment.state,
+            constant_symbol=payment.constant_symbol,
+            variable_symbol=payment.variable_symbol,
+            specific_symbol=payment.specific_symbol,
+        )
+
+
 class AbstractPaymentProcessor(ABC):
-    """Bank payment processor."""
+    """
+    Bank payment processor.
+
+    By default, processor receives copies of BankPayment objects. If ``use_snapshots``
+    is set to True, processor receives PaymentSnapshot objects instead, which are
+    much cheaper to create and store.
+
+    Processors are instantiated once and the instance is reused by commands and admin
+    (see ``django_pain.settings.get_processor_instance``).
+
+    Processors may declare selection criteria of payments they are able to process:
+    account numbers (``accounts``), currency codes (``currencies``), regular expression
+    of variable symbol (``variable_symbol_regex``, in syntax of the database) and range of amounts
+    (``min_amount`` and ``max_amount``, inclusive). ``process_payments`` command passes only payments
+    matching all the criteria to the processor (see ``get_payment_filter``).
+    """
+
+    use_snapshots = False
+
+    accounts = None  # type: Optional[Sequence[str]]
+    currencies = None  # type: Optional[Sequence[str]]
+    variable_symbol_regex = None  # type: Optional[str]
+    min_amount = None  # type: Optional[Decimal]
+    max_amount = None  # type: Optional[Decimal]
 
     @property
     @abstractmethod
@@ -21,7 +87,8 @@ class AbstractPaymentProcessor(ABC):
         """
 
     @abstractmethod
-    def process_payments(self, payments: Iterable[BankPayment]) -> Iterable[ProcessPaymentResult]:
+    def process_payments(self, payments: Iterable[Union[BankPayment, PaymentSnapshot]]
+                         ) -> Iterable[ProcessPaymentResult]:
         """
         Process bank payment.
 
@@ -30,6 +97,12 @@ class AbstractPaymentProcessor(ABC):
         recognized and processed, n-th position of returned iterable must
         have ``result`` set to True, otherwise value of ``result`` must be
         False.
+
+        Payments are either BankPayment objects or PaymentSnapshot objects
+        (see ``use_snapshots``).
+
+        If ``process_payments`` command runs with more workers, this method
+        is called concurrently from several threads with parts of payments.
         """
 
     @abstractmethod
@@ -41,3 +114,64 @@ class AbstractPaymentProcessor(ABC):
         implements forced assignment of payment to particular payment
         processor. As a hint, ``client_id`` may be provided.
         """
+
+    def get_payment_filter(self) -> Optional[Q]:
+        """
+        Return filter of payments which may be processed by this payment processor.
+
+        By default, filter is compiled from selection criteria of the processor. Processors may override
+        this method to select payments by other conditions. Filter must not be based on related models
+        other than bank account. If None is returned, processor receives all payments.
+        """
+        conditions = []  # type: List[Q]
+        if self.accounts is not None:
+            # Subquery of accounts avoids join, which would be locked together with payments.
+            conditions.append(Q(account__in=BankAccount.objects.filter(account_number__in=self.accounts)))
+        if self.currencies is not None:
+            conditions.append(Q(amount_currency__in=self.currencies))
+        if self.variable_symbol_regex is not None:
+            conditions.append(Q(variable_symbol__regex=self.variable_symbol_regex))
+        if self.min_amount is not None:
+            conditions.append(Q(amount__gte=self.min_amount))
+        if self.max_amount is not None:
+            conditions.append(Q(amount__lte=self.max_amount))
+        if not conditions:
+            return None
+        return reduce(and_, conditions)
+
+    def assign_payments(self, payments: Iterable[BankPayment], client_id: str) -> Iterable[ProcessPaymentResult]:
+        """
+        Assign bank payments to this payment processor.
+
+        Result is iterable of named tuples (``ProcessPaymentResult``) in the order of payments.
+        By default, each payment is assigned by ``assign_payment``. Processors may override
+        this method to assign many payments at once.
+        """
+        return [self.assign_payment(payment, client_id) for payment in payments]
+
+
+class AsyncPaymentProcessor(AbstractPaymentProcessor):
+    """
+    Bank payment processor with asynchronous processing of payments.
+
+    Suitable for processors which spend most of the time waiting for network services.
+    Processors implement coroutine ``process_payments_async`` instead of ``process_payments``.
+    ``process_payments`` command runs parts of payments concurrently on asyncio event loop.
+    """
+
+    def process_payments(self, payments: Iterable[Union[BankPayment, PaymentSnapshot]]
+                         ) -> Iterable[ProcessPaymentResult]:
+        """Raise an error, asynchronous processors process payments by ``process_payments_async``."""
+        raise NotImplementedError('Asynchronous payment processor {} processes payments by '
+                                  'process_payments_async.'.format(type(self).__name__))
+
+    @abstractmethod
+    async def process_payments_async(self, payments: Iterable[Union[BankPayment, PaymentSnapshot]]
+                                     ) -> Iterable[ProcessPaymentResult]:
+        """
+        Process bank payments asynchronously.
+
+        Coroutine has the same arguments and result as ``AbstractPaymentProcessor.process_payments``.
+        If ``process_payments`` command runs with more workers, parts of payments are processed
+        concurrently by the same event loop. Coroutine must not access database.
+        """
@@ -1,5 +1,9 @@
 """django_pain settings."""
+from functools import lru_cache
+
 import appsettings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils import module_loading
 
 
@@ -15,6 +19,17 @@ class PainSettings(appsettings.AppSettings):
     """Application specific settings."""
 
     processors = ClassListSetting(required=True, item_type=str)
+    # Number of seconds after which payments claimed by unfinished process_payments command may be claimed again.
+    claim_timeout = appsettings.PositiveIntegerSetting(default=3600)
+    # Number of seconds before the first retry of deferred payment. Delay doubles with each unsuccessful attempt
+    # up to the maximal delay.
+    retry_delay = appsettings.PositiveIntegerSetting(default=3600)
+    retry_max_delay = appsettings.PositiveIntegerSetting(default=86400)
+    # Number of days after transaction date when processed and exported payments are moved to archive
+    # by archive_payments command.
+    archive_age = appsettings.PositiveIntegerSetting(default=365)
+    # Dotted path to metrics backend class, see django_pain.metrics.
+    metrics_backend = appsettings.StringSetting(default='django_pain.metrics.NullMetricsBackend')
 
     class Meta:
         """Meta class."""
@@ -23,3 +38,25 @@ class PainSettings(appsettings.AppSettings):
 
 
 SETTINGS = PainSettings()
+
+
+@lru_cache()
+def get_processor_instance(processor_class: type):
+    """
+    Return cached instance of payment processor class.
+
+    Processors are created lazily and shared by all callers. Cache may be reset by ``cache_clear``.
+    """
+    return processor_class()
+
+
+def get_processor_instances() -> list:
+    """Return instances of payment processors defined in settings."""
+    return [get_processor_instance(processor_class) for processor_class in SETTINGS.processors]
+
+
+@receiver(setting_changed)
+def reset_processor_instances(setting, **kwargs):
+    """Reset cached payment processors when processors setting changes (e.g. in tests)."""
+    if setting == 'PAIN_PROCESSORS':
+        get_processor_instance.cache_clear()
@@ -1,12 +1,29 @@
 """Test admin views."""
+from datetime import date
+from unittest.mock import patch
+
 from django.contrib import admin
 from django.contrib.auth.models import User
 from django.test import RequestFactory, TestCase, override_settings
+from djmoney.money import Money
 
-from django_pain.admin import BankPaymentAdmin
+from django_pain.admin import ArchivedBankPaymentAdmin, BankPaymentAdmin
 from django_pain.constants import PaymentState
-from django_pain.models import BankPayment
-from django_pain.tests.utils import get_account, get_payment
+from django_pain.models import ArchivedBankPayment, BankPayment
+from django_pain.processors import ProcessPaymentResult
+from django_pain.tests.utils import DummyPaymentProcessor, get_account, get_payment
+
+
+class EvenPaymentProcessor(DummyPaymentProcessor):
+    """Processor assigning payments with even identifier and recording batches."""
+
+    default_objective = 'Even objective'
+    batches = []  # type: list
+
+    def assign_payments(self, payments, client_id):
+        self.batches.append([payment.identifier for payment in payments])
+        return [ProcessPaymentResult(result=int(payment.identifier[-1]) % 2 == 0, objective=self.default_objective)
+                for payment in payments]
 
 
 @override_settings(ROOT_URLCONF='django_pain.urls')
@@ -70,3 +87,175 @@ class TestBankPaymentAdmin(TestCase):
         """Test account_name method."""
         modeladmin = BankPaymentAdmin(BankPayment, admin.site)
         self.assertEqual(modeladmin.account_name(self.imported_payment), 'My Account')
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.admin.test_admin.EvenPaymentProcessor'])
+    def test_get_actions(self):
+        """Test get_actions method."""
+        modeladmin = BankPaymentAdmin(BankPayment, admin.site)
+        request = self.request_factory.get('/', {})
+        request.user = self.admin
+
+        actions = modeladmin.get_actions(request)
+        name = 'assign_to_django_pain_tests_admin_test_admin_EvenPaymentProcessor'
+        self.assertIn(name, actions)
+        self.assertEqual(actions[name][1:], (name, 'Assign selected payments to Even objective'))
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.admin.test_admin.EvenPaymentProcessor'])
+    def test_assign_payments(self):
+        """Test bulk assignment of payments to payment processor."""
+        payments = [get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.DEFERRED)
+                    for i in range(1, 5)]
+        for payment in payments:
+            payment.save()
+        EvenPaymentProcessor.batches = []
+
+        self.client.force_login(self.admin)
+        response = self.client.post('/admin/django_pain/bankpayment/', {
+            'action': 'assign_to_django_pain_tests_admin_test_admin_EvenPaymentProcessor',
+            '_selected_action': [payment.pk for payment in payments] + [self.processed_payment.pk],
+        }, follow=True)
+
+        self.assertEqual(EvenPaymentProcessor.batches, [['PAYMENT_1', 'PAYMENT_2', 'PAYMENT_3', 'PAYMENT_4']])
+        self.assertQuerysetEqual(
+            BankPayment.objects.filter(pk__in=[payment.pk for payment in payments]).values_list(
+                'identifier', 'state', 'processor', 'objective'),
+            [('PAYMENT_1', PaymentState.DEFERRED, '', ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'django_pain.tests.admin.test_admin.EvenPaymentProcessor',
+              'Even objective'),
+             ('PAYMENT_3', PaymentState.DEFERRED, '', ''),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'django_pain.tests.admin.test_admin.EvenPaymentProcessor',
+              'Even objective')],
+            transform=tuple, ordered=False)
+        self.assertEqual([str(message) for message in response.context['messages']], [
+            'Number of assigned payments: 2',
+            'Number of payments which could not be assigned: 3',
+        ])
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.admin.test_admin.EvenPaymentProcessor'])
+    def test_assign_payments_processed_concurrently(self):
+        """Test bulk assignment does not overwrite payments processed in the meantime."""
+        payments = [get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.IMPORTED)
+                    for i in range(1, 5)]
+        for payment in payments:
+            payment.save()
+        modeladmin = BankPaymentAdmin(BankPayment, admin.site)
+        request = self.request_factory.post('/', {})
+        request.user = self.admin
+        original_assign_payments = EvenPaymentProcessor.assign_payments
+
+        def assign_payments(processor, payments, client_id):
+            # Payment is processed by another command while the processor runs.
+            BankPayment.objects.filter(identifier='PAYMENT_2').update(
+                state=PaymentState.PROCESSED, processor='other', objective='Other objective')
+            return original_assign_payments(processor, payments, client_id)
+
+        with patch.object(EvenPaymentProcessor, 'assign_payments', assign_payments):
+            with patch.object(modeladmin, 'message_user') as message_user_mock:
+                modeladmin.assign_payments(request, BankPayment.objects.filter(identifier__startswith='PAYMENT_'),
+                                           EvenPaymentProcessor)
+
+        self.assertQuerysetEqual(
+            BankPayment.objects.filter(pk__in=[payment.pk for payment in payments]).values_list(
+                'identifier', 'state', 'processor', 'objective'),
+            [('PAYMENT_1', PaymentState.IMPORTED, '', ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'other', 'Other objective'),
+             ('PAYMENT_3', PaymentState.IMPORTED, '', ''),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'django_pain.tests.admin.test_admin.EvenPaymentProcessor',
+              'Even objective')],
+            transform=tuple, ordered=False)
+        self.assertEqual([str(call[0][1]) for call in message_user_mock.call_args_list], [
+            'Number of assigned payments: 1',
+            'Number of payments which could not be assigned: 3',
+        ])
+
+    def test_get_list_queries(self):
+        """Test number of queries of model list does not depend on number of payments and accounts."""
+        for i in range(20):
+            account = get_account(account_number='%s/0300' % i, account_name='Account %s' % i)
+            account.save()
+            get_payment(identifier='PAYMENT_%s' % i, account=account).save()
+        self.client.force_login(self.admin)
+
+        # Session, user, count, bank account names and payments with accounts.
+        with self.assertNumQueries(5):
+            response = self.client.get('/admin/django_pain/bankpayment/')
+        self.assertContains(response, 'Account 19')
+
+
+@override_settings(ROOT_URLCONF='django_pain.urls')
+class TestArchivedBankPaymentAdmin(TestCase):
+    """Test ArchivedBankPaymentAdmin."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.request_factory = RequestFactory()
+
+        self.account = get_account(account_name='My Account')
+        self.account.save()
+        self.payment = ArchivedBankPayment(
+            id=1, identifier='My Payment 1', account=self.account, transaction_date=date(2018, 5, 9),
+            counter_account_number='098765/4321', amount=Money('42.00', 'CZK'), variable_symbol='1234',
+            state=PaymentState.PROCESSED)
+        self.payment.save()
+        self.other_payment = ArchivedBankPayment(
+            id=2, identifier='My Payment 2', account=self.account, transaction_date=date(2018, 5, 9),
+            counter_account_number='123456/0100', amount=Money('42.00', 'CZK'), variable_symbol='12345',
+            state=PaymentState.EXPORTED)
+        self.other_payment.save()
+
+    def test_get_list(self):
+        """Test GET request on model list."""
+        self.client.force_login(self.admin)
+        response = self.client.get('/admin/django_pain/archivedbankpayment/')
+        self.assertContains(response, 'My Payment 1')
+        self.assertContains(response, 'My Payment 2')
+        self.assertContains(response, 'My Account')
+
+    def test_get_detail(self):
+        """Test GET request on archived payment detail."""
+        self.client.force_login(self.admin)
+        response = self.client.get('/admin/django_pain/archivedbankpayment/1/change/')
+        self.assertContains(response, 'My Payment 1')
+        self.assertNotContains(response, 'name="_save"')
+
+    def test_search(self):
+        """Test search matches exact values only."""
+        self.client.force_login(self.admin)
+        response = self.client.get('/admin/django_pain/archivedbankpayment/', {'q': '1234'})
+        self.assertContains(response, 'My Payment 1')
+        self.assertNotContains(response, 'My Payment 2')
+
+        response = self.client.get('/admin/django_pain/archivedbankpayment/', {'q': ' 123456/0100 '})
+        self.assertNotContains(response, 'My Payment 1')
+        self.assertContains(response, 'My Payment 2')
+
+        response = self.client.get('/admin/django_pain/archivedbankpayment/', {'q': 'My Payment'})
+        self.assertNotContains(response, 'My Payment 1')
+        self.assertNotContains(response, 'My Payment 2')
+
+    def test_permissions(self):
+        """Test archived payments can be viewed, but cannot be added, changed nor deleted."""
+        modeladmin = ArchivedBankPaymentAdmin(ArchivedBankPayment, admin.site)
+        request = self.request_factory.get('/', {})
+        request.user = self.admin
+        self.assertFalse(modeladmin.has_add_permission(request))
+        self.assertTrue(modeladmin.has_change_permission(request, self.payment))
+        self.assertFalse(modeladmin.has_delete_permission(request, self.payment))
+        self.assertEqual(modeladmin.get_readonly_fields(request, self.payment), modeladmin.fields)
+
+        request = self.request_factory.post('/', {})
+        request.user = self.admin
+        self.assertFalse(modeladmin.has_change_permission(request, self.payment))
+
+    def test_post_detail(self):
+        """Test POST request on archived payment detail does not change the payment."""
+        self.client.force_login(self.admin)
+        response = self.client.post('/admin/django_pain/archivedbankpayment/1/change/', {'objective': 'Changed'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(ArchivedBankPayment.objects.get(pk=1).objective, '')
+
+    def test_index(self):
+        """Test archive is listed in admin index."""
+        self.client.force_login(self.admin)
+        response = self.client.get('/admin/')
+        self.assertContains(response, '/admin/django_pain/archivedbankpayment/')
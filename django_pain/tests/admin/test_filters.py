@@ -5,6 +5,7 @@ from django.test import RequestFactory, TestCase
 
 from django_pain.admin import BankPaymentAdmin
 from django_pain.models import BankPayment
+from django_pain.tests.utils import get_account, get_payment
 
 
 class TestChoicesFieldListFilter(TestCase):
@@ -28,3 +29,32 @@ class TestChoicesFieldListFilter(TestCase):
             {'selected': False, 'query_string': '?state__exact=deferred', 'display': 'deferred'},
             {'selected': False, 'query_string': '?state__exact=exported', 'display': 'exported'},
         ]))
+
+
+class TestAccountNameListFilter(TestCase):
+    """Test AccountNameListFilter."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.request_factory = RequestFactory()
+        self.account = get_account(account_number='123456/0300', account_name='My Account')
+        self.account.save()
+        get_account(account_number='654321/0300', account_name='Other Account').save()
+        get_account(account_number='000000/0300', account_name='').save()
+        get_payment(identifier='PAYMENT_1', account=self.account).save()
+
+    def test_filter(self):
+        modeladmin = BankPaymentAdmin(BankPayment, admin.site)
+        request = self.request_factory.get('/', {'account__account_name': 'My Account'})
+        request.user = self.admin
+        changelist = modeladmin.get_changelist_instance(request)
+        filterspec = changelist.get_filters(request)[0][1]
+        self.assertEqual([choice['display'] for choice in filterspec.choices(changelist)],
+                         ['All', 'My Account', 'Other Account'])
+        self.assertQuerysetEqual(changelist.get_queryset(request).values_list('identifier', flat=True),
+                                 ['PAYMENT_1'], transform=str)
+
+        request = self.request_factory.get('/', {'account__account_name': 'Other Account'})
+        request.user = self.admin
+        changelist = modeladmin.get_changelist_instance(request)
+        self.assertFalse(changelist.get_queryset(request).exists())
@@ -0,0 +1,47 @@
+"""Test admin paginators."""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from django_pain.admin.paginator import EstimatedCountPaginator
+from django_pain.models import BankAccount
+from django_pain.tests.utils import get_account
+
+
+class TestEstimatedCountPaginator(TestCase):
+    """Test EstimatedCountPaginator."""
+
+    def setUp(self):
+        get_account(account_number='123456/0300').save()
+        get_account(account_number='654321/0300').save()
+
+    def test_count(self):
+        """Test exact count is used if estimate is not available."""
+        paginator = EstimatedCountPaginator(BankAccount.objects.order_by('pk'), 1)
+        self.assertIsNone(paginator.get_estimate())
+        self.assertEqual(paginator.count, 2)
+
+    def test_count_estimate(self):
+        """Test estimate is used for large tables."""
+        paginator = EstimatedCountPaginator(BankAccount.objects.order_by('pk'), 1)
+        with patch.object(EstimatedCountPaginator, 'get_estimate', return_value=1000000):
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 1000000)
+
+    def test_count_small_estimate(self):
+        """Test exact count is used for small tables."""
+        paginator = EstimatedCountPaginator(BankAccount.objects.order_by('pk'), 1)
+        with patch.object(EstimatedCountPaginator, 'get_estimate', return_value=10):
+            self.assertEqual(paginator.count, 2)
+
+    def test_get_estimate_filtered(self):
+        """Test estimate is not available for filtered querysets."""
+        paginator = EstimatedCountPaginator(BankAccount.objects.filter(account_number='123456/0300'), 1)
+        with patch('django_pain.admin.paginator.connections') as connections_mock:
+            connections_mock.__getitem__.return_value.vendor = 'postgresql'
+            self.assertIsNone(paginator.get_estimate())
+        self.assertEqual(paginator.count, 1)
+
+    def test_get_estimate_list(self):
+        """Test estimate is not available for lists."""
+        self.assertIsNone(EstimatedCountPaginator([1, 2, 3], 1).get_estimate())
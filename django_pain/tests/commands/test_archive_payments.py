@@ -0,0 +1,136 @@
+"""Test archive_payments command."""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from django_pain.constants import PaymentState
+from django_pain.models import ArchivedBankPayment, BankAccount, BankPayment
+from django_pain.tests.utils import get_memory_metrics_backend, get_payment
+
+
+@freeze_time('2019-06-10 12:00')
+class TestArchivePayments(TestCase):
+    """Test archive_payments command."""
+
+    def setUp(self):
+        self.account = BankAccount(account_number='123456/7890', currency='CZK')
+        self.account.save()
+        self.processed = get_payment(identifier='PAYMENT_1', account=self.account, state=PaymentState.PROCESSED,
+                                     transaction_date=date(2018, 5, 9), variable_symbol='1234',
+                                     processor='dummy', objective='Dummy objective')
+        self.processed.save()
+        self.exported = get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.EXPORTED,
+                                    transaction_date=date(2018, 6, 9))
+        self.exported.save()
+        self.imported = get_payment(identifier='PAYMENT_3', account=self.account, state=PaymentState.IMPORTED,
+                                    transaction_date=date(2018, 5, 9))
+        self.imported.save()
+        self.deferred = get_payment(identifier='PAYMENT_4', account=self.account, state=PaymentState.DEFERRED,
+                                    transaction_date=date(2018, 5, 9))
+        self.deferred.save()
+        self.recent = get_payment(identifier='PAYMENT_5', account=self.account, state=PaymentState.PROCESSED,
+                                  transaction_date=date(2019, 6, 1))
+        self.recent.save()
+
+    def test_archive_payments(self):
+        """Test command moves old settled payments to archive."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'Archived 2 payments.')
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_3', 'PAYMENT_4', 'PAYMENT_5'], transform=str, ordered=False)
+        self.assertQuerysetEqual(ArchivedBankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_1', 'PAYMENT_2'], transform=str, ordered=False)
+
+    def test_archived_fields(self):
+        """Test archived payment keeps primary key and fields of the payment."""
+        call_command('archive_payments', '--no-color', stdout=StringIO())
+
+        archived = ArchivedBankPayment.objects.get(pk=self.processed.pk)
+        self.assertEqual(archived.uuid, self.processed.uuid)
+        self.assertEqual(archived.identifier, 'PAYMENT_1')
+        self.assertEqual(archived.account, self.account)
+        self.assertEqual(archived.create_time, self.processed.create_time)
+        self.assertEqual(archived.transaction_date, date(2018, 5, 9))
+        self.assertEqual(archived.counter_account_number, '098765/4321')
+        self.assertEqual(archived.counter_account_name, 'Another account')
+        self.assertEqual(archived.amount.amount, Decimal('42.00'))
+        self.assertEqual(archived.amount.currency.code, 'CZK')
+        self.assertEqual(archived.state, PaymentState.PROCESSED)
+        self.assertEqual(archived.variable_symbol, '1234')
+        self.assertEqual(archived.processor, 'dummy')
+        self.assertEqual(archived.objective, 'Dummy objective')
+        self.assertEqual(archived.archive_time, timezone.now())
+
+    def test_age(self):
+        """Test command archives payments older than given age."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', '--age=5', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'Archived 3 payments.')
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_3', 'PAYMENT_4'], transform=str, ordered=False)
+
+    @override_settings(PAIN_ARCHIVE_AGE=366)
+    def test_age_setting(self):
+        """Test command archives payments older than age from settings by default."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'Archived 1 payments.')
+        self.assertQuerysetEqual(ArchivedBankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_1'], transform=str)
+
+    def test_batch_size(self):
+        """Test command archives payments in more batches."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', '--age=0', '--batch-size=1', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'Archived 3 payments.')
+        self.assertQuerysetEqual(ArchivedBankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_1', 'PAYMENT_2', 'PAYMENT_5'], transform=str, ordered=False)
+
+    def test_nothing_to_archive(self):
+        """Test command without payments to archive."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', '--age=1000', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'Archived 0 payments.')
+        self.assertEqual(BankPayment.objects.count(), 5)
+        self.assertFalse(ArchivedBankPayment.objects.exists())
+
+    def test_quiet_command(self):
+        """Test command with verbosity 0."""
+        out = StringIO()
+        call_command('archive_payments', '--no-color', '--verbosity=0', stdout=out)
+
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(ArchivedBankPayment.objects.count(), 2)
+
+    def test_invalid_age(self):
+        """Test command call with invalid age."""
+        with self.assertRaisesMessage(CommandError, 'Age has to be non-negative integer.'):
+            call_command('archive_payments', '--no-color', '--age=-1')
+
+    def test_invalid_batch_size(self):
+        """Test command call with invalid batch size."""
+        with self.assertRaisesMessage(CommandError, 'Batch size has to be positive integer.'):
+            call_command('archive_payments', '--no-color', '--batch-size=0')
+
+    @override_settings(PAIN_METRICS_BACKEND='django_pain.metrics.MemoryMetricsBackend')
+    def test_metrics(self):
+        """Test command emits metrics."""
+        backend = get_memory_metrics_backend()
+        call_command('archive_payments', '--no-color', '--batch-size=1', stdout=StringIO())
+
+        self.assertEqual(backend.get_count('archive.archived'), 2)
+        # Time is frozen, so only check the stages have been measured.
+        for stage in ('archive.query', 'archive.move'):
+            self.assertIn((stage, frozenset()), backend.timings)
@@ -1,18 +1,29 @@
 """Test import_payments command."""
-from datetime import date
+import bz2
+import gzip
+import lzma
+import sys
+import zipfile
+from concurrent.futures import Future
+from datetime import date, datetime
 from decimal import Decimal
 from io import StringIO
-from typing import List
+from multiprocessing.context import BaseContext
+from typing import List, cast
+from unittest.mock import Mock, patch
 
 from django.core.management import call_command
 from django.core.management.base import CommandError
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from djmoney.money import Money
 from testfixtures import TempDirectory
 
-from django_pain.models import BankAccount, BankPayment
+from django_pain.constants import PaymentState, StatementState
+from django_pain.management.commands.import_payments import (Command, get_process_pool, open_input_file,
+                                                             parse_input_files)
+from django_pain.models import ArchivedBankPayment, BankAccount, BankPayment, BankStatement
 from django_pain.parsers import AbstractBankStatementParser
-from django_pain.tests.utils import get_payment
+from django_pain.tests.utils import get_memory_metrics_backend, get_payment
 
 
 class DummyPaymentsParser(AbstractBankStatementParser):
@@ -26,6 +37,16 @@ class DummyPaymentsParser(AbstractBankStatementParser):
         ]
 
 
+class DummyManyPaymentsParser(AbstractBankStatementParser):
+    """Simple parser that returns many payments with one duplicate."""
+
+    def parse(self, bank_statement) -> List[BankPayment]:
+        account = BankAccount.objects.get(account_number='123456/7890')
+        payments = [get_payment(identifier='PAYMENT_%s' % i, account=account) for i in range(40)]
+        payments.append(get_payment(identifier='PAYMENT_0', account=account))
+        return payments
+
+
 class DummyExceptionParser(AbstractBankStatementParser):
     """Simple parser that just throws account not exist exception."""
 
@@ -33,9 +54,103 @@ class DummyExceptionParser(AbstractBankStatementParser):
         raise BankAccount.DoesNotExist('Bank account ACCOUNT does not exist.')
 
 
+STATEMENT = b'''<?xml version="1.0" encoding="UTF-8"?>
+<statements>
+    <statement>
+        <account_number>123456789</account_number>
+        <account_bank_code>0123</account_bank_code>
+        <items>
+            <item>
+                <ident>111</ident>
+                <account_number>123456777</account_number>
+                <account_bank_code>0123</account_bank_code>
+                <const_symbol>0558</const_symbol>
+                <var_symbol>11111111</var_symbol>
+                <spec_symbol></spec_symbol>
+                <price>1000.00</price>
+                <memo>See you later</memo>
+                <date>2012-12-20</date>
+                <name>Company Inc.</name>
+            </item>
+        </items>
+    </statement>
+</statements>
+'''
+
+
+class TestOpenInputFile(SimpleTestCase):
+    """Test open_input_file."""
+
+    def test_stdin(self):
+        self.assertIs(open_input_file('-'), sys.stdin.buffer)
+
+    def test_plain(self):
+        with TempDirectory() as d:
+            d.write('input_file.xml', STATEMENT)
+            with open_input_file('/'.join([d.path, 'input_file.xml'])) as handle:
+                self.assertEqual(handle.read(), STATEMENT)
+
+    def test_compressed(self):
+        for module in (gzip, bz2, lzma):
+            with self.subTest(module=module.__name__):
+                with TempDirectory() as d:
+                    with module.open('/'.join([d.path, 'input_file']), 'wb') as output:
+                        output.write(STATEMENT)
+                    with open_input_file('/'.join([d.path, 'input_file'])) as handle:
+                        self.assertEqual(handle.read(), STATEMENT)
+
+    def test_zip(self):
+        with TempDirectory() as d:
+            with zipfile.ZipFile('/'.join([d.path, 'input_file.zip']), 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('statement/', b'')
+                archive.writestr('statement/input_file.xml', STATEMENT)
+            with open_input_file('/'.join([d.path, 'input_file.zip'])) as handle:
+                self.assertEqual(handle.read(), STATEMENT)
+
+    def test_zip_more_files(self):
+        with TempDirectory() as d:
+            with zipfile.ZipFile('/'.join([d.path, 'input_file.zip']), 'w') as archive:
+                archive.writestr('input_file_1.xml', STATEMENT)
+                archive.writestr('input_file_2.xml', STATEMENT)
+            with self.assertRaisesMessage(CommandError, 'has to contain exactly one file.'):
+                open_input_file('/'.join([d.path, 'input_file.zip']))
+
+
+class TestParseInputFiles(SimpleTestCase):
+    """Test parse_input_files function."""
+
+    def test_max_pending(self):
+        """Test only limited number of files is submitted ahead of consumed results."""
+        submitted = []
+
+        def submit(function, parser_path, input_file):
+            submitted.append(input_file)
+            future = Future()  # type: Future
+            future.set_result([input_file])
+            return future
+
+        executor = Mock(submit=submit)
+        results = parse_input_files(executor, 'parser', ['file_1', 'file_2', 'file_3', 'file_4'], 2)
+
+        self.assertEqual(next(results), ['file_1'])
+        self.assertEqual(submitted, ['file_1', 'file_2', 'file_3'])
+        self.assertEqual(list(results), [['file_2'], ['file_3'], ['file_4']])
+        self.assertEqual(submitted, ['file_1', 'file_2', 'file_3', 'file_4'])
+
+    def test_process_pool_fork(self):
+        """Test worker processes are forked, so they inherit configured Django."""
+        with get_process_pool(2) as executor:
+            context = executor._mp_context
+            self.assertIsNotNone(context)
+            self.assertEqual(cast(BaseContext, context).get_start_method(), 'fork')
+
+
 class TestImportPayments(TestCase):
     """Test import_payments command."""
 
+    # SHA-256 hash of '<whatever></whatever>'.
+    STATEMENT_HASH = '5be7c59bcd81c5957376b8574165aedb214aad9512e5d5528783b4c62dca3dc5'
+
     def setUp(self):
         account = BankAccount(account_number='123456/7890', currency='CZK')
         account.save()
@@ -50,6 +165,7 @@ class TestImportPayments(TestCase):
         self.assertEqual(out.getvalue().strip().split('\n'), [
             'Payment ID PAYMENT_1 has been imported.',
             'Payment ID PAYMENT_2 has been imported.',
+            'Imported 2 payments, skipped 0 duplicate and 0 invalid payments.',
         ])
 
         self.assertQuerysetEqual(BankPayment.objects.values_list(
@@ -75,12 +191,63 @@ class TestImportPayments(TestCase):
         call_command('import_payments', '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
                      '--no-color', stdout=out)
         call_command('import_payments', '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
-                     '--no-color', stderr=err)
+                     '--no-color', stdout=out, stderr=err)
 
         self.assertEqual(err.getvalue().strip().split('\n'), [
             'Bank payment with this Payment ID and Account already exists.',
             'Bank payment with this Payment ID and Account already exists.',
         ])
+        self.assertEqual(out.getvalue().strip().split('\n')[-1],
+                         'Imported 0 payments, skipped 2 duplicate and 0 invalid payments.')
+
+    def test_payment_already_archived(self):
+        """Test command for payments that already exist in archive."""
+        ArchivedBankPayment(id=1, identifier='PAYMENT_1', account=self.account, transaction_date=date(2018, 5, 9),
+                            counter_account_number='098765/4321', amount=Money('42.00', 'CZK'),
+                            state=PaymentState.EXPORTED).save()
+        out = StringIO()
+        call_command('import_payments', '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                     '--no-color', stdout=out, stderr=StringIO())
+
+        self.assertEqual(out.getvalue().strip(), 'Imported 1 payments, skipped 1 duplicate and 0 invalid payments.')
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', flat=True), ['PAYMENT_2'], transform=str)
+
+    def test_payment_already_exist_queries(self):
+        """Test duplicate payments are detected without per-payment queries."""
+        call_command('import_payments',
+                     '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                     '--no-color', stdout=StringIO(), stderr=StringIO())
+
+        out = StringIO()
+        # Select account and select payments known since the oldest transaction date.
+        with self.assertNumQueries(2):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                         '--no-color', '--batch-size=10', stdout=out, stderr=StringIO())
+
+        self.assertEqual(out.getvalue().strip(), 'Imported 0 payments, skipped 41 duplicate and 0 invalid payments.')
+
+    def test_load_known_payments(self):
+        """Test payments with older transaction dates are loaded for following chunks."""
+        get_payment(identifier='PAYMENT_1', account=self.account, transaction_date=date(2018, 5, 1)).save()
+        get_payment(identifier='PAYMENT_2', account=self.account, transaction_date=date(2018, 5, 9)).save()
+        command = Command()
+        command.known_payments = set()
+        command.known_since = {}
+
+        with self.assertNumQueries(1):
+            command.load_known_payments([get_payment(account=self.account, transaction_date=datetime(2018, 5, 5)),
+                                         get_payment(account=self.account, transaction_date=None)])
+        self.assertEqual(command.known_payments, {('PAYMENT_2', self.account.pk)})
+        self.assertEqual(command.known_since, {self.account.pk: date(2018, 5, 5)})
+
+        with self.assertNumQueries(0):
+            command.load_known_payments([get_payment(account=self.account, transaction_date=date(2018, 5, 7))])
+
+        with self.assertNumQueries(1):
+            command.load_known_payments([get_payment(account=self.account, transaction_date=date(2018, 4, 1))])
+        self.assertEqual(command.known_payments, {('PAYMENT_1', self.account.pk), ('PAYMENT_2', self.account.pk)})
+        self.assertEqual(command.known_since, {self.account.pk: date(2018, 4, 1)})
 
     def test_quiet_command(self):
         """Test command call with verbosity set to 0."""
@@ -108,6 +275,124 @@ class TestImportPayments(TestCase):
         self.assertEqual(out.getvalue(), '')
         self.assertEqual(err.getvalue(), '')
 
+    def test_statement(self):
+        """Test command records imported statement."""
+        with TempDirectory() as d:
+            d.write('input_file.xml', b'<whatever></whatever>')
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=0', '/'.join([d.path, 'input_file.xml']))
+
+            statement = BankStatement.objects.get()
+            self.assertEqual(statement.content_hash, self.STATEMENT_HASH)
+            self.assertEqual(statement.file_name, '/'.join([d.path, 'input_file.xml']))
+            self.assertEqual(statement.account, self.account)
+            self.assertEqual(statement.item_count, 2)
+            self.assertEqual(statement.state, StatementState.IMPORTED)
+            self.assertQuerysetEqual(statement.payments.values_list('identifier', flat=True),
+                                     ['PAYMENT_1', 'PAYMENT_2'], transform=str, ordered=False)
+
+    def test_statement_invalid_values(self):
+        """Test command imports valid payments of statement with invalid values."""
+        out = StringIO()
+        err = StringIO()
+        with TempDirectory() as d:
+            d.write('input_file.csv', b'account,identifier,transaction_date,counter_account_number,amount\n'
+                                      b'123456/7890,PAYMENT_1,2012-12-20,98765/4321,100\n'
+                                      b'123456/7890,PAYMENT_2,2012-12-21,98765/4321,\n'
+                                      b'123456/7890,PAYMENT_3,2012-12-32,98765/4321,300\n'
+                                      b'123456/7890,PAYMENT_4,2012-12-23,98765/4321,400\n')
+            call_command('import_payments', '--parser=django_pain.parsers.csv.CsvStatementParser', '--no-color',
+                         '/'.join([d.path, 'input_file.csv']), stdout=out, stderr=err)
+
+        statement = BankStatement.objects.get()
+        self.assertEqual(statement.item_count, 4)
+        self.assertEqual(statement.state, StatementState.IMPORTED)
+        self.assertQuerysetEqual(statement.payments.values_list('identifier', flat=True),
+                                 ['PAYMENT_1', 'PAYMENT_4'], transform=str, ordered=False)
+        self.assertEqual(out.getvalue().strip(), 'Imported 2 payments, skipped 0 duplicate and 2 invalid payments.')
+        self.assertEqual(err.getvalue().strip().split('\n'), [
+            'This field cannot be null.',
+            "'2012-12-32' value has the correct format (YYYY-MM-DD) but it is an invalid date.",
+        ])
+
+    def test_statement_stdin(self):
+        """Test command does not record statement from standard input."""
+        call_command('import_payments', '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                     '--no-color', '--verbosity=0')
+
+        self.assertFalse(BankStatement.objects.exists())
+        self.assertEqual(BankPayment.objects.count(), 2)
+
+    def test_statement_already_imported(self):
+        """Test command skips already imported statement."""
+        out = StringIO()
+        with TempDirectory() as d:
+            d.write('input_file_1.xml', b'<whatever></whatever>')
+            d.write('input_file_2.xml', b'<whatever></whatever>')
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=0', '/'.join([d.path, 'input_file_1.xml']))
+            BankPayment.objects.all().delete()
+
+            with self.assertNumQueries(1):
+                call_command('import_payments',
+                             '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                             '--no-color', '--verbosity=2', '/'.join([d.path, 'input_file_2.xml']), stdout=out)
+
+            self.assertEqual(out.getvalue().strip().split('\n'), [
+                'Statement {}/input_file_2.xml has already been imported.'.format(d.path),
+                'Imported 0 payments, skipped 0 duplicate and 0 invalid payments.',
+            ])
+        self.assertFalse(BankPayment.objects.exists())
+
+    def test_statement_resume(self):
+        """Test command resumes interrupted import of statement."""
+        out = StringIO()
+        with TempDirectory() as d:
+            d.write('input_file.xml', b'<whatever></whatever>')
+            BankStatement.objects.create(content_hash=self.STATEMENT_HASH, account=self.account, item_count=1)
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=2', '/'.join([d.path, 'input_file.xml']), stdout=out)
+
+        self.assertEqual(out.getvalue().strip().split('\n'), [
+            'Payment ID PAYMENT_2 has been imported.',
+            'Imported 1 payments, skipped 0 duplicate and 0 invalid payments.',
+        ])
+        statement = BankStatement.objects.get()
+        self.assertEqual(statement.item_count, 2)
+        self.assertEqual(statement.state, StatementState.IMPORTED)
+
+    def test_statement_interrupted(self):
+        """Test statement progress is committed with chunks of payments."""
+        with TempDirectory() as d:
+            d.write('input_file.xml', b'<whatever></whatever>')
+            with patch('django_pain.management.commands.import_payments.Command.report_imported_payment',
+                       side_effect=[None, None, KeyboardInterrupt]):
+                with self.assertRaises(KeyboardInterrupt):
+                    call_command('import_payments',
+                                 '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                                 '--no-color', '--verbosity=0', '--batch-size=2', '/'.join([d.path, 'input_file.xml']))
+
+        # The second chunk has been committed before the interruption.
+        statement = BankStatement.objects.get()
+        self.assertEqual(statement.item_count, 4)
+        self.assertEqual(statement.state, StatementState.IMPORTING)
+        self.assertEqual(BankPayment.objects.count(), 4)
+
+    def test_compressed_input(self):
+        """Test command imports compressed statement."""
+        BankAccount.objects.create(account_number='123456789/0123', currency='CZK')
+        with TempDirectory() as d:
+            with gzip.open('/'.join([d.path, 'input_file.xml.gz']), 'wb') as output:
+                output.write(STATEMENT)
+            call_command('import_payments', '--parser=django_pain.parsers.transproc.StreamingTransprocXMLParser',
+                         '--no-color', '--verbosity=0', '/'.join([d.path, 'input_file.xml.gz']))
+
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', 'amount'),
+                                 [('111', Decimal('1000.00'))], transform=tuple)
+
     def test_invalid_parser(self):
         """Test command call with invalid parser."""
         with self.assertRaises(CommandError) as cm:
@@ -115,3 +400,154 @@ class TestImportPayments(TestCase):
                          '--no-color')
 
         self.assertEqual(str(cm.exception), 'Parser argument has to be subclass of AbstractBankStatementParser.')
+
+    def test_import_payments_bulk(self):
+        """Test import_payments command inserts payments in batches."""
+        out = StringIO()
+        err = StringIO()
+        # Select account, select known payments, select existing payments and insert payments (in savepoint).
+        with self.assertNumQueries(6):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                         '--no-color', stdout=out, stderr=err)
+
+        self.assertEqual(BankPayment.objects.count(), 40)
+        self.assertEqual(err.getvalue().strip().split('\n'), [
+            'Bank payment with this Payment ID and Account already exists.',
+        ])
+        self.assertEqual(out.getvalue().strip(), 'Imported 40 payments, skipped 1 duplicate and 0 invalid payments.')
+
+    def test_import_payments_batch_size(self):
+        """Test import_payments command with batch size."""
+        out = StringIO()
+        err = StringIO()
+        call_command('import_payments', '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                     '--no-color', '--batch-size=1', stdout=out, stderr=err)
+        call_command('import_payments',
+                     '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                     '--no-color', '--batch-size=7', stdout=out, stderr=err)
+
+        self.assertEqual(BankPayment.objects.count(), 40)
+        self.assertEqual(err.getvalue().strip().split('\n'), [
+            'Bank payment with this Payment ID and Account already exists.',
+            'Bank payment with this Payment ID and Account already exists.',
+            'Bank payment with this Payment ID and Account already exists.',
+        ])
+        self.assertEqual(out.getvalue().strip().split('\n'), [
+            'Imported 2 payments, skipped 0 duplicate and 0 invalid payments.',
+            'Imported 38 payments, skipped 3 duplicate and 0 invalid payments.',
+        ])
+
+    def test_invalid_batch_size(self):
+        """Test command call with invalid batch size."""
+        with self.assertRaisesMessage(CommandError, 'Batch size has to be positive integer.'):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--batch-size=0')
+
+    @override_settings(PAIN_METRICS_BACKEND='django_pain.metrics.MemoryMetricsBackend')
+    def test_metrics(self):
+        """Test command emits metrics."""
+        backend = get_memory_metrics_backend()
+        get_payment(identifier='PAYMENT_3', account=self.account).save()
+        with patch('django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser.parse',
+                   return_value=[get_payment(identifier='PAYMENT_%s' % i, account=self.account) for i in range(5)]
+                   + [get_payment(identifier='PAYMENT_5', account=self.account, transaction_date=None)]):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyManyPaymentsParser',
+                         '--no-color', '--batch-size=4', stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(backend.get_count('import.imported'), 4)
+        self.assertEqual(backend.get_count('import.duplicate'), 1)
+        self.assertEqual(backend.get_count('import.invalid'), 1)
+        # Select known payments and select existing payments in both batches.
+        self.assertEqual(backend.get_count('import.validate.queries'), 3)
+        for stage in ('import.parse', 'import.validate', 'import.insert'):
+            self.assertGreater(backend.get_timing(stage), 0)
+
+    def test_bulk_insert_conflict(self):
+        """Test payments are saved one by one if bulk insert fails."""
+        out = StringIO()
+        err = StringIO()
+        get_payment(identifier='PAYMENT_2', account=self.account).save()
+        with patch('django_pain.management.commands.import_payments.Command.load_known_payments'), \
+                patch('django_pain.management.commands.import_payments.Command.get_existing_payments',
+                      return_value=set()):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=2', stdout=out, stderr=err)
+
+        self.assertEqual(out.getvalue().strip().split('\n'), [
+            'Payment ID PAYMENT_1 has been imported.',
+            'Imported 1 payments, skipped 1 duplicate and 0 invalid payments.',
+        ])
+        self.assertEqual(err.getvalue().strip(), 'Bank payment with this Payment ID and Account already exists.')
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_1', 'PAYMENT_2'], transform=str, ordered=False)
+
+    def test_jobs(self):
+        """Test command call with more jobs."""
+        out = StringIO()
+        err = StringIO()
+        with TempDirectory() as d:
+            d.write('input_file_1.xml', b'<whatever>1</whatever>')
+            d.write('input_file_2.xml', b'<whatever>2</whatever>')
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=2', '--jobs=2',
+                         '/'.join([d.path, 'input_file_1.xml']), '/'.join([d.path, 'input_file_2.xml']),
+                         stdout=out, stderr=err)
+
+        self.assertEqual(out.getvalue().strip().split('\n'), [
+            'Payment ID PAYMENT_1 has been imported.',
+            'Payment ID PAYMENT_2 has been imported.',
+            'Imported 2 payments, skipped 2 duplicate and 0 invalid payments.',
+        ])
+        self.assertEqual(err.getvalue().strip().split('\n'), [
+            'Bank payment with this Payment ID and Account already exists.',
+            'Bank payment with this Payment ID and Account already exists.',
+        ])
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', flat=True),
+                                 ['PAYMENT_1', 'PAYMENT_2'], transform=str, ordered=False)
+
+    def test_jobs_same_statement(self):
+        """Test command with more jobs imports statement only once."""
+        out = StringIO()
+        with TempDirectory() as d:
+            d.write('input_file_1.xml', b'<whatever></whatever>')
+            d.write('input_file_2.xml', b'<whatever></whatever>')
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--verbosity=2', '--jobs=2',
+                         '/'.join([d.path, 'input_file_1.xml']), '/'.join([d.path, 'input_file_2.xml']),
+                         stdout=out)
+
+            self.assertEqual(out.getvalue().strip().split('\n'), [
+                'Statement {}/input_file_2.xml has already been imported.'.format(d.path),
+                'Payment ID PAYMENT_1 has been imported.',
+                'Payment ID PAYMENT_2 has been imported.',
+                'Imported 2 payments, skipped 0 duplicate and 0 invalid payments.',
+            ])
+
+    def test_jobs_account_not_exist(self):
+        """Test command with more jobs while account does not exist."""
+        with TempDirectory() as d:
+            d.write('input_file.xml', b'<whatever></whatever>')
+            with self.assertRaisesMessage(CommandError, 'Bank account ACCOUNT does not exist.'):
+                call_command('import_payments',
+                             '--parser=django_pain.tests.commands.test_import_payments.DummyExceptionParser',
+                             '--no-color', '--jobs=2', '/'.join([d.path, 'input_file.xml']))
+
+    def test_jobs_stdin(self):
+        """Test command with more jobs does not accept standard input."""
+        with self.assertRaisesMessage(CommandError, 'Standard input can not be imported with more jobs.'):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--jobs=2')
+
+    def test_invalid_jobs(self):
+        """Test command call with invalid number of jobs."""
+        with self.assertRaisesMessage(CommandError, 'Number of jobs has to be positive integer.'):
+            call_command('import_payments',
+                         '--parser=django_pain.tests.commands.test_import_payments.DummyPaymentsParser',
+                         '--no-color', '--jobs=0')
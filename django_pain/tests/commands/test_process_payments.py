@@ -1,12 +1,25 @@
 """Test process_payments command."""
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from djmoney.money import Money
 from freezegun import freeze_time
 
 from django_pain.constants import PaymentState
+from django_pain.management.commands.process_payments import get_processor_data, get_retry_delay
 from django_pain.models import BankAccount, BankPayment
-from django_pain.processors import ProcessPaymentResult
-from django_pain.tests.utils import DummyPaymentProcessor, get_payment
+from django_pain.processors import AsyncPaymentProcessor, PaymentSnapshot, ProcessPaymentResult
+from django_pain.tests.utils import DummyPaymentProcessor, get_memory_metrics_backend, get_payment
 
 
 class DummyTruePaymentProcessor(DummyPaymentProcessor):
@@ -25,6 +38,80 @@ class DummyFalsePaymentProcessor(DummyPaymentProcessor):
         return [ProcessPaymentResult(result=False, objective=self.default_objective)]
 
 
+class DummyEvenPaymentProcessor(DummyPaymentProcessor):
+    """Simple processor that processes payments with even identifier and records batches."""
+
+    default_objective = 'Even objective'
+    batches = []  # type: list
+
+    def process_payments(self, payments):
+        payments = list(payments)
+        self.batches.append([payment.identifier for payment in payments])
+        return [ProcessPaymentResult(result=int(payment.identifier[-1]) % 2 == 0, objective=self.default_objective)
+                for payment in payments]
+
+
+class DummyFilterPaymentProcessor(DummyEvenPaymentProcessor):
+    """Simple processor that processes only selected payments with even identifier."""
+
+    default_objective = 'Filter objective'
+    batches = []  # type: list
+    accounts = ['123456/7890']
+    currencies = ['CZK']
+    variable_symbol_regex = '^[0-9]+$'
+    min_amount = Decimal('10')
+    max_amount = Decimal('100')
+
+
+class DummySleepPaymentProcessor(DummyPaymentProcessor):
+    """Simple processor that waits and processes payments with identifier ending with 3 or 7."""
+
+    default_objective = 'Sleep objective'
+    threads = set()  # type: set
+
+    def process_payments(self, payments):
+        payments = list(payments)
+        self.threads.add(threading.get_ident())
+        time.sleep(0.1)
+        return [ProcessPaymentResult(result=payment.identifier[-1] in '37', objective=self.default_objective)
+                for payment in payments]
+
+
+class DummySnapshotPaymentProcessor(DummyEvenPaymentProcessor):
+    """Simple processor that uses payment snapshots."""
+
+    default_objective = 'Snapshot objective'
+    use_snapshots = True
+    payments = []  # type: list
+
+    def process_payments(self, payments):
+        payments = list(payments)
+        self.payments.extend(payments)
+        return super().process_payments(payments)
+
+
+class DummyAsyncPaymentProcessor(AsyncPaymentProcessor):
+    """Asynchronous processor that waits and processes payments with identifier ending with 3 or 7."""
+
+    default_objective = 'Async objective'
+    batches = []  # type: list
+    running = 0
+    max_running = 0
+
+    async def process_payments_async(self, payments):
+        payments = list(payments)
+        DummyAsyncPaymentProcessor.batches.append([payment.identifier for payment in payments])
+        DummyAsyncPaymentProcessor.running += 1
+        DummyAsyncPaymentProcessor.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0)
+        DummyAsyncPaymentProcessor.running -= 1
+        return [ProcessPaymentResult(result=payment.identifier[-1] in '37', objective=self.default_objective)
+                for payment in payments]
+
+    def assign_payment(self, payment, client_id):
+        return ProcessPaymentResult(result=True, objective=self.default_objective)
+
+
 @freeze_time('2018-01-01')
 class TestProcessPayments(TestCase):
     """Test process_payments command."""
@@ -69,3 +156,425 @@ class TestProcessPayments(TestCase):
             BankPayment.objects.values_list('identifier', 'account', 'state', 'processor', 'objective'),
             [('PAYMENT_1', self.account.pk, PaymentState.IMPORTED, '', '')],
             transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_batch_size(self):
+        """Test payments processed in batches."""
+        for i in range(2, 6):
+            get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.DEFERRED).save()
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments', '--batch-size', '2')
+
+        self.assertEqual(DummyEvenPaymentProcessor.batches, [
+            ['PAYMENT_1', 'PAYMENT_2'], ['PAYMENT_3', 'PAYMENT_4'], ['PAYMENT_5'],
+        ])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective'),
+            [('PAYMENT_1', PaymentState.DEFERRED, ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_3', PaymentState.DEFERRED, ''),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_5', PaymentState.DEFERRED, '')],
+            transform=tuple, ordered=False)
+
+    def test_invalid_batch_size(self):
+        """Test invalid batch size."""
+        with self.assertRaisesMessage(CommandError, 'Batch size has to be positive integer.'):
+            call_command('process_payments', '--batch-size', '0')
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_bulk_update(self):
+        """Test payment states are updated in bulk."""
+        for i in range(2, 21):
+            get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.IMPORTED).save()
+
+        # Select and claim payments, select payments, refresh claims, update processed payments,
+        # update deferred payments, release claims.
+        with self.assertNumQueries(7):
+            call_command('process_payments')
+
+        self.assertEqual(BankPayment.objects.filter(state=PaymentState.PROCESSED).count(), 10)
+        self.assertEqual(BankPayment.objects.filter(state=PaymentState.DEFERRED).count(), 10)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_claims_by_primary_key(self):
+        """Test claimed payments are selected and updated by primary keys, because claim token is not indexed."""
+        with CaptureQueriesContext(connection) as context:
+            call_command('process_payments')
+
+        # Select claimed payments, refresh claims and release claims.
+        claim_queries = [query['sql'] for query in context.captured_queries
+                         if '"django_pain_bankpayment"."claim_token" = ' in query['sql']]
+        self.assertEqual(len(claim_queries), 3)
+        for sql in claim_queries:
+            self.assertIn('"id" IN (', sql)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummySleepPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'],
+                       PAIN_METRICS_BACKEND='django_pain.metrics.MemoryMetricsBackend')
+    def test_metrics(self):
+        """Test command emits metrics."""
+        backend = get_memory_metrics_backend()
+        for i in range(2, 6):
+            get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.IMPORTED).save()
+
+        call_command('process_payments', '--batch-size', '3')
+
+        sleep_processor = 'django_pain.tests.commands.test_process_payments.DummySleepPaymentProcessor'
+        even_processor = 'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'
+        self.assertEqual(backend.get_count('process.processed', processor=sleep_processor), 1)
+        self.assertEqual(backend.get_count('process.processed', processor=even_processor), 2)
+        self.assertEqual(backend.get_count('process.deferred'), 2)
+        # Update payments processed by each processor and deferred payments in both batches.
+        self.assertEqual(backend.get_count('process.save.queries'), 5)
+        # Time is frozen, so only check the stages have been measured.
+        self.assertEqual(set(backend.timings), {
+            ('process.query', frozenset()),
+            ('process.processor', frozenset([('processor', sleep_processor)])),
+            ('process.processor', frozenset([('processor', even_processor)])),
+            ('process.save', frozenset()),
+        })
+
+    @override_settings(PAIN_PROCESSORS=[
+        'django_pain.tests.commands.test_process_payments.DummySleepPaymentProcessor',
+        'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_workers(self):
+        """Test payments processed by more workers."""
+        for i in range(2, 9):
+            get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.IMPORTED).save()
+        DummySleepPaymentProcessor.threads = set()
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments', '--workers', '4')
+
+        self.assertEqual(len(DummySleepPaymentProcessor.threads), 4)
+        # Only payments not processed by the first processor are passed to the second one.
+        self.assertEqual(sorted(DummyEvenPaymentProcessor.batches), [
+            ['PAYMENT_1', 'PAYMENT_2'], ['PAYMENT_4', 'PAYMENT_5'], ['PAYMENT_6', 'PAYMENT_8'],
+        ])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective'),
+            [('PAYMENT_1', PaymentState.DEFERRED, ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_3', PaymentState.PROCESSED, 'Sleep objective'),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_5', PaymentState.DEFERRED, ''),
+             ('PAYMENT_6', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_7', PaymentState.PROCESSED, 'Sleep objective'),
+             ('PAYMENT_8', PaymentState.PROCESSED, 'Even objective')],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=[
+        'django_pain.tests.commands.test_process_payments.DummyAsyncPaymentProcessor',
+        'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_async_processor(self):
+        """Test payments processed by asynchronous processor together with synchronous one."""
+        for i in range(2, 9):
+            get_payment(identifier='PAYMENT_%s' % i, account=self.account, state=PaymentState.IMPORTED).save()
+        DummyAsyncPaymentProcessor.batches = []
+        DummyAsyncPaymentProcessor.max_running = 0
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments', '--workers', '4')
+
+        self.assertEqual(DummyAsyncPaymentProcessor.batches, [
+            ['PAYMENT_1', 'PAYMENT_2'], ['PAYMENT_3', 'PAYMENT_4'], ['PAYMENT_5', 'PAYMENT_6'],
+            ['PAYMENT_7', 'PAYMENT_8'],
+        ])
+        self.assertEqual(DummyAsyncPaymentProcessor.max_running, 4)
+        # Only payments not processed by the first processor are passed to the second one.
+        self.assertEqual(sorted(DummyEvenPaymentProcessor.batches), [
+            ['PAYMENT_1', 'PAYMENT_2'], ['PAYMENT_4', 'PAYMENT_5'], ['PAYMENT_6', 'PAYMENT_8'],
+        ])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective'),
+            [('PAYMENT_1', PaymentState.DEFERRED, ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_3', PaymentState.PROCESSED, 'Async objective'),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_5', PaymentState.DEFERRED, ''),
+             ('PAYMENT_6', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_7', PaymentState.PROCESSED, 'Async objective'),
+             ('PAYMENT_8', PaymentState.PROCESSED, 'Even objective')],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyAsyncPaymentProcessor'])
+    def test_async_processor_single_worker(self):
+        """Test asynchronous processor with a single worker."""
+        get_payment(identifier='PAYMENT_3', account=self.account, state=PaymentState.IMPORTED).save()
+        DummyAsyncPaymentProcessor.batches = []
+
+        call_command('process_payments')
+
+        self.assertEqual(DummyAsyncPaymentProcessor.batches, [['PAYMENT_1', 'PAYMENT_3']])
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', 'state'),
+                                 [('PAYMENT_1', PaymentState.DEFERRED), ('PAYMENT_3', PaymentState.PROCESSED)],
+                                 transform=tuple, ordered=False)
+
+    def test_invalid_workers(self):
+        """Test invalid number of workers."""
+        with self.assertRaisesMessage(CommandError, 'Number of workers has to be positive integer.'):
+            call_command('process_payments', '--workers', '0')
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_claimed_payments(self):
+        """Test payments claimed by other command are skipped."""
+        claimed = get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.IMPORTED,
+                              claim_token=uuid.uuid4(), claim_time=datetime(2017, 12, 31, 23, 30))
+        claimed.save()
+        expired = get_payment(identifier='PAYMENT_4', account=self.account, state=PaymentState.IMPORTED,
+                              claim_token=uuid.uuid4(), claim_time=datetime(2017, 12, 31, 22, 30))
+        expired.save()
+
+        with patch.object(connection.features, 'has_select_for_update_skip_locked', False):
+            call_command('process_payments')
+
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'claim_token'),
+            [('PAYMENT_1', PaymentState.DEFERRED, None),
+             ('PAYMENT_2', PaymentState.IMPORTED, claimed.claim_token),
+             ('PAYMENT_4', PaymentState.PROCESSED, None)],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyFalsePaymentProcessor'])
+    def test_claim_refreshed(self):
+        """Test claims are refreshed before each processor, so they do not expire during processing."""
+        claim_times = []
+        with freeze_time('2018-01-01') as frozen_time:
+            def process_payments(payments):
+                payments = list(payments)
+                claim_times.append(BankPayment.objects.get(identifier='PAYMENT_1').claim_time)
+                frozen_time.tick(timedelta(hours=1))
+                return [ProcessPaymentResult(result=False, objective='') for payment in payments]
+
+            with patch.object(connection.features, 'has_select_for_update_skip_locked', False), \
+                    patch.object(DummyEvenPaymentProcessor, 'process_payments', side_effect=process_payments), \
+                    patch.object(DummyFalsePaymentProcessor, 'process_payments', side_effect=process_payments):
+                call_command('process_payments')
+
+        self.assertEqual(claim_times, [datetime(2018, 1, 1), datetime(2018, 1, 1, 1)])
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_claim_released_on_error(self):
+        """Test claims are released if processing fails."""
+        with patch.object(connection.features, 'has_select_for_update_skip_locked', False), \
+                patch.object(DummyEvenPaymentProcessor, 'process_payments', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                call_command('process_payments')
+
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'claim_token'),
+            [('PAYMENT_1', PaymentState.IMPORTED, None)],
+            transform=tuple, ordered=False)
+
+    def _test_processor_error(self, *options):
+        """Test results of processors are kept if the following processor fails."""
+        get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.IMPORTED).save()
+
+        with patch.object(DummyFalsePaymentProcessor, 'process_payments', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                call_command('process_payments', *options)
+
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective', 'claim_token'),
+            [('PAYMENT_1', PaymentState.IMPORTED, '', None),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Even objective', None)],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyFalsePaymentProcessor'])
+    def test_processor_error(self):
+        with patch.multiple(connection.features, has_select_for_update_skip_locked=True,
+                            has_select_for_update_of=True):
+            self._test_processor_error()
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyFalsePaymentProcessor'])
+    def test_processor_error_locked(self):
+        with patch.multiple(connection.features, has_select_for_update_skip_locked=True,
+                            has_select_for_update_of=True), \
+                patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                      side_effect=lambda queryset, **kwargs: queryset):
+            self._test_processor_error('--batch-size', '10')
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_locked_payments(self):
+        """Test payments are locked if database supports skipping locked rows."""
+        get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.IMPORTED).save()
+
+        with patch.multiple(connection.features, has_select_for_update_skip_locked=True,
+                            has_select_for_update_of=True), \
+                patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                      side_effect=lambda queryset, **kwargs: queryset) as select_for_update_mock:
+            call_command('process_payments', '--batch-size', '1')
+
+        self.assertEqual(select_for_update_mock.call_args[1], {'skip_locked': True, 'of': ('self',)})
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'claim_token'),
+            [('PAYMENT_1', PaymentState.DEFERRED, None),
+             ('PAYMENT_2', PaymentState.PROCESSED, None)],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_locked_payments_of_not_supported(self):
+        """Test payments are claimed if database cannot lock rows of a single table (e.g. MySQL)."""
+        get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.IMPORTED).save()
+
+        with patch.multiple(connection.features, has_select_for_update_skip_locked=True,
+                            has_select_for_update_of=False), \
+                patch('django.db.models.query.QuerySet.select_for_update') as select_for_update_mock:
+            call_command('process_payments', '--batch-size', '1')
+
+        self.assertFalse(select_for_update_mock.called)
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'claim_token'),
+            [('PAYMENT_1', PaymentState.DEFERRED, None),
+             ('PAYMENT_2', PaymentState.PROCESSED, None)],
+            transform=tuple, ordered=False)
+
+    def _test_filters(self, *options):
+        """Test processor receives only payments matching its filter."""
+        other_account = BankAccount(account_number='654321/7890', currency='CZK')
+        other_account.save()
+        get_payment(identifier='PAYMENT_2', account=self.account, variable_symbol='123').save()
+        get_payment(identifier='PAYMENT_3', account=self.account, variable_symbol='123').save()
+        get_payment(identifier='PAYMENT_4', account=self.account, variable_symbol='123',
+                    amount=Money('5', 'CZK')).save()
+        get_payment(identifier='PAYMENT_5', account=self.account, variable_symbol='123',
+                    amount=Money('500', 'CZK')).save()
+        get_payment(identifier='PAYMENT_6', account=other_account, variable_symbol='123').save()
+        get_payment(identifier='PAYMENT_8', account=self.account, variable_symbol='12A').save()
+        DummyFilterPaymentProcessor.batches = []
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments', *options)
+
+        self.assertEqual(DummyFilterPaymentProcessor.batches, [['PAYMENT_2', 'PAYMENT_3']])
+        self.assertEqual(DummyEvenPaymentProcessor.batches, [
+            ['PAYMENT_1', 'PAYMENT_3', 'PAYMENT_4', 'PAYMENT_5', 'PAYMENT_6', 'PAYMENT_8']])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective'),
+            [('PAYMENT_1', PaymentState.DEFERRED, ''),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Filter objective'),
+             ('PAYMENT_3', PaymentState.DEFERRED, ''),
+             ('PAYMENT_4', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_5', PaymentState.DEFERRED, ''),
+             ('PAYMENT_6', PaymentState.PROCESSED, 'Even objective'),
+             ('PAYMENT_8', PaymentState.PROCESSED, 'Even objective')],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyFilterPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_filters(self):
+        with patch.object(connection.features, 'has_select_for_update_skip_locked', False):
+            self._test_filters()
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyFilterPaymentProcessor',
+                                        'django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_filters_locked(self):
+        with patch.multiple(connection.features, has_select_for_update_skip_locked=True,
+                            has_select_for_update_of=True), \
+                patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                      side_effect=lambda queryset, **kwargs: queryset):
+            self._test_filters('--batch-size', '10')
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyFilterPaymentProcessor'],
+                       PAIN_METRICS_BACKEND='django_pain.metrics.MemoryMetricsBackend')
+    def test_filters_skipped(self):
+        """Test processor is not called without matching payments."""
+        backend = get_memory_metrics_backend()
+        DummyFilterPaymentProcessor.batches = []
+
+        call_command('process_payments')
+
+        self.assertEqual(DummyFilterPaymentProcessor.batches, [])
+        self.assertEqual(backend.get_count('process.skipped',
+                                           processor='django_pain.tests.commands.test_process_payments.'
+                                                     'DummyFilterPaymentProcessor'), 1)
+        self.assertEqual(backend.get_count('process.deferred'), 1)
+
+    @override_settings(PAIN_PROCESSORS=[
+        'django_pain.tests.commands.test_process_payments.DummySnapshotPaymentProcessor',
+        'django_pain.tests.commands.test_process_payments.DummyTruePaymentProcessor'])
+    def test_snapshots(self):
+        """Test processors using payment snapshots."""
+        get_payment(identifier='PAYMENT_2', account=self.account, state=PaymentState.IMPORTED).save()
+        DummySnapshotPaymentProcessor.payments = []
+
+        call_command('process_payments')
+
+        self.assertEqual([type(payment) for payment in DummySnapshotPaymentProcessor.payments],
+                         [PaymentSnapshot, PaymentSnapshot])
+        self.assertEqual([(payment.identifier, payment.account_number, payment.state)
+                          for payment in DummySnapshotPaymentProcessor.payments],
+                         [('PAYMENT_1', '123456/7890', PaymentState.IMPORTED),
+                          ('PAYMENT_2', '123456/7890', PaymentState.IMPORTED)])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'objective'),
+            [('PAYMENT_1', PaymentState.PROCESSED, 'True objective'),
+             ('PAYMENT_2', PaymentState.PROCESSED, 'Snapshot objective')],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'],
+                       PAIN_RETRY_DELAY=3600, PAIN_RETRY_MAX_DELAY=5400)
+    def test_retry_delay(self):
+        """Test deferred payments are processed again after retry delay."""
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments')
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'processing_attempts', 'next_attempt_time'),
+            [('PAYMENT_1', PaymentState.DEFERRED, 1, datetime(2018, 1, 1, 1))],
+            transform=tuple, ordered=False)
+
+        with freeze_time('2018-01-01 00:59'):
+            call_command('process_payments')
+        with freeze_time('2018-01-01 01:00'):
+            call_command('process_payments')
+        with freeze_time('2018-01-01 02:30'):
+            call_command('process_payments')
+
+        self.assertEqual(DummyEvenPaymentProcessor.batches, [['PAYMENT_1'], ['PAYMENT_1'], ['PAYMENT_1']])
+        self.assertQuerysetEqual(
+            BankPayment.objects.values_list('identifier', 'state', 'processing_attempts', 'next_attempt_time'),
+            [('PAYMENT_1', PaymentState.DEFERRED, 3, datetime(2018, 1, 1, 4))],
+            transform=tuple, ordered=False)
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_retry_delay_interval(self):
+        """Test all deferred payments are processed with explicit time interval."""
+        BankPayment.objects.update(state=PaymentState.DEFERRED, next_attempt_time=datetime(2018, 1, 2))
+        DummyEvenPaymentProcessor.batches = []
+
+        call_command('process_payments')
+        call_command('process_payments', '--from', '2017-01-01 00:00')
+
+        self.assertEqual(DummyEvenPaymentProcessor.batches, [['PAYMENT_1']])
+
+    @override_settings(PAIN_PROCESSORS=['django_pain.tests.commands.test_process_payments.DummyEvenPaymentProcessor'])
+    def test_late_imported_payment(self):
+        """Test imported payment is processed even if it is committed after payments with higher primary key."""
+        get_payment(pk=self.payment.pk + 2, identifier='PAYMENT_3', account=self.account,
+                    state=PaymentState.IMPORTED).save()
+        DummyEvenPaymentProcessor.batches = []
+        call_command('process_payments')
+
+        # Payment with lower primary key committed by long running import.
+        get_payment(pk=self.payment.pk + 1, identifier='PAYMENT_2', account=self.account,
+                    state=PaymentState.IMPORTED).save()
+        call_command('process_payments')
+
+        self.assertEqual(DummyEvenPaymentProcessor.batches, [['PAYMENT_1', 'PAYMENT_3'], ['PAYMENT_2']])
+
+    def test_get_retry_delay(self):
+        """Test get_retry_delay."""
+        with override_settings(PAIN_RETRY_DELAY=600, PAIN_RETRY_MAX_DELAY=3600):
+            self.assertEqual([get_retry_delay(attempts).total_seconds() for attempts in range(1, 6)],
+                             [600, 1200, 2400, 3600, 3600])
+
+    def test_get_processor_data_snapshots_missing(self):
+        """Test get_processor_data requires snapshots for processors using them."""
+        with self.assertRaisesMessage(ValueError, 'Payment snapshots are required by processor'):
+            list(get_processor_data(DummySnapshotPaymentProcessor(), [self.payment], None))
@@ -0,0 +1,83 @@
+"""Test Camt053StatementParser."""
+from datetime import datetime
+from io import BytesIO
+
+from django.test import TestCase
+from djmoney.money import Money
+
+from django_pain.parsers.camt import Camt053StatementParser
+from django_pain.tests.utils import get_account
+
+
+class TestCamt053StatementParser(TestCase):
+    """Test Camt053StatementParser."""
+
+    XML_INPUT = b'''<?xml version="1.0" encoding="UTF-8"?>
+        <Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+            <BkToCstmrStmt>
+                <GrpHdr>
+                    <MsgId>MSG-1</MsgId>
+                    <CreDtTm>2012-12-31T10:00:00</CreDtTm>
+                </GrpHdr>
+                <Stmt>
+                    <Id>STMT-1</Id>
+                    <Acct>
+                        <Id><IBAN>CZ6503000000000123456789</IBAN></Id>
+                        <Ccy>CZK</Ccy>
+                    </Acct>
+                    <Ntry>
+                        <NtryRef>1</NtryRef>
+                        <Amt Ccy="CZK">1000.50</Amt>
+                        <CdtDbtInd>CRDT</CdtDbtInd>
+                        <Sts>BOOK</Sts>
+                        <BookgDt><Dt>2012-12-20</Dt></BookgDt>
+                        <AcctSvcrRef>111</AcctSvcrRef>
+                        <NtryDtls>
+                            <TxDtls>
+                                <Refs><EndToEndId>/VS1234/SS600/KS0558</EndToEndId></Refs>
+                                <RltdPties>
+                                    <Dbtr><Nm>Company Inc.</Nm></Dbtr>
+                                    <DbtrAcct><Id><IBAN>CZ5501000000190000123457</IBAN></Id></DbtrAcct>
+                                    <Cdtr><Nm>Account owner</Nm></Cdtr>
+                                    <CdtrAcct><Id><IBAN>CZ6503000000000123456789</IBAN></Id></CdtrAcct>
+                                </RltdPties>
+                                <RmtInf><Ustrd>See you</Ustrd><Ustrd>later</Ustrd></RmtInf>
+                            </TxDtls>
+                        </NtryDtls>
+                    </Ntry>
+                    <Ntry>
+                        <NtryRef>2</NtryRef>
+                        <Amt Ccy="CZK">20.00</Amt>
+                        <CdtDbtInd>DBIT</CdtDbtInd>
+                        <Sts>BOOK</Sts>
+                        <BookgDt><DtTm>2012-12-21T08:30:00</DtTm></BookgDt>
+                        <NtryDtls>
+                            <TxDtls>
+                                <RltdPties>
+                                    <Cdtr><Nm>Supplier</Nm></Cdtr>
+                                    <CdtrAcct><Id><Othr><Id>DE-12345</Id></Othr></Id></CdtrAcct>
+                                </RltdPties>
+                            </TxDtls>
+                        </NtryDtls>
+                        <AddtlNtryInf>Card payment</AddtlNtryInf>
+                    </Ntry>
+                </Stmt>
+            </BkToCstmrStmt>
+        </Document>'''
+
+    def setUp(self):
+        self.account = get_account(account_number='123456789/0300', currency='CZK')
+        self.account.save()
+
+    def test_parse(self):
+        payments = list(Camt053StatementParser().parse(BytesIO(self.XML_INPUT)))
+
+        self.assertEqual(
+            [(p.account, p.identifier, p.transaction_date, p.counter_account_number, p.counter_account_name,
+              p.amount, p.description, p.constant_symbol, p.variable_symbol, p.specific_symbol) for p in payments],
+            [(self.account, '111', datetime(2012, 12, 20), '19-123457/0100', 'Company Inc.',
+              Money('1000.50', 'CZK'), 'See you later', '0558', '1234', '600'),
+             (self.account, '2', datetime(2012, 12, 21), 'DE-12345', 'Supplier',
+              Money('-20.00', 'CZK'), 'Card payment', '', '', '')])
+        for payment in payments:
+            payment.full_clean()
@@ -0,0 +1,129 @@
+"""Test AbstractBankStatementParser."""
+from datetime import datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from djmoney.money import Money
+
+from django_pain.constants import PaymentState
+from django_pain.models import BankAccount, BankPayment
+from django_pain.parsers import AbstractBankStatementParser, PaymentFactory, parse_iso_date
+from django_pain.tests.utils import get_account
+
+
+class DummyParser(AbstractBankStatementParser):
+    """Parser without any payments."""
+
+    def parse(self, bank_statement):
+        return []
+
+
+class TestAbstractBankStatementParser(TestCase):
+    """Test AbstractBankStatementParser."""
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/7890')
+        self.account.save()
+
+    def test_get_account(self):
+        """Test get_account caches accounts."""
+        parser = DummyParser()
+        with self.assertNumQueries(1):
+            self.assertEqual(parser.get_account('123456/7890'), self.account)
+            self.assertEqual(parser.get_account('123456/7890'), self.account)
+
+    def test_get_account_not_exists(self):
+        """Test get_account raises exception if account does not exist."""
+        parser = DummyParser()
+        with self.assertRaisesMessage(BankAccount.DoesNotExist, 'Bank account 987654/3210 does not exist.'):
+            parser.get_account('987654/3210')
+
+    def test_clear_account_cache(self):
+        """Test clear_account_cache."""
+        parser = DummyParser()
+        parser.get_account('123456/7890')
+        parser.clear_account_cache()
+        with self.assertNumQueries(1):
+            parser.get_account('123456/7890')
+
+
+class TestParseIsoDate(SimpleTestCase):
+    """Test parse_iso_date."""
+
+    def test_parse(self):
+        self.assertEqual(parse_iso_date('2012-12-20'), datetime(2012, 12, 20))
+        self.assertEqual(parse_iso_date('0001-01-01'), datetime(1, 1, 1))
+
+    def test_parse_invalid(self):
+        """Test parse_iso_date raises the same exceptions as strptime."""
+        for value in ('2012-02-30', '20.12.2012', '2012-12-20\n', '2012-12-20 10:00', ''):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    datetime.strptime(value, '%Y-%m-%d')
+                with self.assertRaises(ValueError):
+                    parse_iso_date(value)
+        with self.assertRaises(TypeError):
+            parse_iso_date(None)
+
+
+class TestPaymentFactory(TestCase):
+    """Test PaymentFactory."""
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/7890', currency='EUR')
+        self.account.save()
+
+    def test_create(self):
+        factory = PaymentFactory(self.account)
+        with self.assertNumQueries(0):
+            payment = factory(identifier='PAYMENT', transaction_date=datetime(2012, 12, 20),
+                              counter_account_number='98765/4321', amount=Money('10.50', 'EUR'),
+                              variable_symbol='123')
+        self.assertIsNone(payment.pk)
+        self.assertTrue(payment._state.adding)
+        self.assertEqual(payment.account, self.account)
+        self.assertEqual(payment.account_id, self.account.pk)
+        self.assertEqual(payment.identifier, 'PAYMENT')
+        self.assertEqual(payment.amount, Money('10.50', 'EUR'))
+        self.assertEqual(payment.variable_symbol, '123')
+        self.assertEqual(payment.state, PaymentState.IMPORTED)
+        self.assertEqual(payment.description, '')
+        self.assertEqual(payment.processing_attempts, 0)
+        payment.full_clean()
+        payment.save()
+        self.assertQuerysetEqual(BankPayment.objects.values_list('identifier', 'amount_currency'),
+                                 [('PAYMENT', 'EUR')], transform=tuple)
+
+    def test_create_decimal_amount(self):
+        """Test decimal amount is in currency of the account."""
+        factory = PaymentFactory(self.account)
+        payment = factory(identifier='PAYMENT', amount=Decimal('10.50'))
+        self.assertEqual(payment.amount_currency, 'EUR')
+        self.assertEqual(payment.amount, Money('10.50', 'EUR'))
+
+    def test_create_uuid(self):
+        """Test callable defaults are evaluated for each payment."""
+        factory = PaymentFactory(self.account)
+        self.assertNotEqual(factory(identifier='1').uuid, factory(identifier='2').uuid)
+
+    def test_create_equal(self):
+        """Test payment is equal to payment created by model constructor."""
+        values = {
+            'identifier': 'PAYMENT',
+            'transaction_date': datetime(2012, 12, 20),
+            'counter_account_number': '98765/4321',
+            'counter_account_name': 'Company Ltd.',
+            'amount': Money('10.50', 'EUR'),
+            'description': 'Memo',
+            'constant_symbol': '0558',
+            'variable_symbol': '123',
+            'specific_symbol': '600',
+        }
+        payment = PaymentFactory(self.account)(**values)
+        expected = BankPayment(account=self.account, **values)
+        self.assertEqual(self._get_values(payment), self._get_values(expected))
+
+    @staticmethod
+    def _get_values(payment):
+        """Return instance attributes of payment except of the random UUID."""
+        return {name: value for name, value in payment.__dict__.items() if name not in ('_state', 'uuid')}
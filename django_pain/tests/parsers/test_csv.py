@@ -0,0 +1,66 @@
+"""Test CsvStatementParser."""
+import csv
+from datetime import datetime
+from io import BytesIO
+
+from django.test import TestCase
+from djmoney.money import Money
+
+from django_pain.parsers.csv import CsvStatementParser
+from django_pain.parsers.records import Column, date_parser
+from django_pain.tests.utils import get_account
+
+
+class SemicolonDialect(csv.excel):
+    """Excel dialect with semicolon delimiter."""
+
+    delimiter = ';'
+
+
+class CzechCsvStatementParser(CsvStatementParser):
+    """Parser of CSV files with semicolon separated columns named in Czech."""
+
+    encoding = 'cp1250'
+    dialect = SemicolonDialect
+    columns = {
+        'account': Column('Účet'),
+        'identifier': Column('ID'),
+        'transaction_date': Column('Datum', date_parser('%d.%m.%Y')),
+        'counter_account_number': Column('Protiúčet'),
+        'amount': Column('Částka'),
+    }
+
+
+class TestCsvStatementParser(TestCase):
+    """Test CsvStatementParser."""
+
+    CSV_INPUT = (
+        '﻿account,identifier,transaction_date,counter_account_number,counter_account_name,amount,description,'
+        'constant_symbol,variable_symbol,specific_symbol\r\n'
+        '123456/0300,PAYMENT_1,2012-12-20,98765/4321,"Company, Inc.",1000.00,"See you\r\nlater",0558,1234,\r\n'
+        '123456/0300,PAYMENT_2,2012-12-21,98765/4321,,-20.5,,,,600\r\n'
+    ).encode()
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/0300', currency='CZK')
+        self.account.save()
+
+    def test_parse(self):
+        handle = BytesIO(self.CSV_INPUT)
+        payments = list(CsvStatementParser().parse(handle))
+
+        self.assertFalse(handle.closed)
+        self.assertEqual(
+            [(p.account, p.identifier, p.transaction_date, p.counter_account_number, p.counter_account_name,
+              p.amount, p.description, p.constant_symbol, p.variable_symbol, p.specific_symbol) for p in payments],
+            [(self.account, 'PAYMENT_1', datetime(2012, 12, 20), '98765/4321', 'Company, Inc.',
+              Money('1000.00', 'CZK'), 'See you\r\nlater', '0558', '1234', ''),
+             (self.account, 'PAYMENT_2', datetime(2012, 12, 21), '98765/4321', '',
+              Money('-20.50', 'CZK'), '', '', '', '600')])
+
+    def test_parse_columns(self):
+        csv_input = 'Účet;ID;Datum;Protiúčet;Částka\n123456/0300;PAYMENT_1;20.12.2012;98765/4321;10\n'
+        payments = list(CzechCsvStatementParser().parse(BytesIO(csv_input.encode('cp1250'))))
+
+        self.assertEqual([(p.identifier, p.transaction_date, p.amount) for p in payments],
+                         [('PAYMENT_1', datetime(2012, 12, 20), Money('10', 'CZK'))])
@@ -17,3 +17,14 @@ class TestCzechSlovakBankStatementParser(SimpleTestCase):
     def test_compose_account_number(self):
         parser = DummyParser()
         self.assertEqual(parser.compose_account_number('123456', '0300'), '123456/0300')
+
+    def test_compose_prefixed_account_number(self):
+        parser = DummyParser()
+        self.assertEqual(parser.compose_prefixed_account_number('000000', '0000123456', '0300'), '123456/0300')
+        self.assertEqual(parser.compose_prefixed_account_number('000019', '0000123457', '0100'), '19-123457/0100')
+
+    def test_iban_to_account_number(self):
+        parser = DummyParser()
+        self.assertEqual(parser.iban_to_account_number('CZ65 0300 0000 0001 2345 6789'), '123456789/0300')
+        self.assertEqual(parser.iban_to_account_number('SK3112000000198742637541'), '19-8742637541/1200')
+        self.assertEqual(parser.iban_to_account_number('DE89370400440532013000'), 'DE89370400440532013000')
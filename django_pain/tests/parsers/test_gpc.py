@@ -0,0 +1,54 @@
+"""Test GpcStatementParser."""
+from datetime import datetime
+from io import BytesIO
+
+from django.test import TestCase
+from djmoney.money import Money
+
+from django_pain.parsers.gpc import GpcStatementParser
+from django_pain.tests.utils import get_account
+
+
+class DummyGpcStatementParser(GpcStatementParser):
+    """GPC parser of statements of accounts in bank 0300."""
+
+    bank_code = '0300'
+
+
+class TestGpcStatementParser(TestCase):
+    """Test GpcStatementParser."""
+
+    GPC_INPUT = (
+        '0740000000123456789Company account     19121200000001000000+00000001100050+00000000002000 00000000100050+'
+        '001211212              \r\n'
+        '0750000000123456789000019000012345700000000001110000001000502000000123400010005580000000600201212Company I'
+        'nc.        00203201212\r\n'
+        '0750000000123456789000000000000000000000000002220000000020001000000000000000000000000000000211212Poplatek '
+        '           00203211212\r\n'
+        '078Příchozí platba\r\n'
+    ).encode('cp1250')
+
+    def setUp(self):
+        self.account = get_account(account_number='123456789/0300', currency='CZK')
+        self.account.save()
+
+    def test_parse(self):
+        handle = BytesIO(self.GPC_INPUT)
+        payments = list(DummyGpcStatementParser().parse(handle))
+
+        self.assertFalse(handle.closed)
+        self.assertEqual(
+            [(p.account, p.identifier, p.transaction_date, p.counter_account_number, p.counter_account_name,
+              p.amount, p.constant_symbol, p.variable_symbol, p.specific_symbol) for p in payments],
+            [(self.account, '0000000000111', datetime(2012, 12, 20), '19-123457/0100', 'Company Inc.',
+              Money('1000.50', 'CZK'), '0558', '1234', '600'),
+             (self.account, '0000000000222', datetime(2012, 12, 21), '', 'Poplatek',
+              Money('-20.00', 'CZK'), '', '', '')])
+
+    def test_parse_invalid_amount(self):
+        line = ('0750000000123456789000000000000000000000000002220000000020001000000000000000000000000000000211212'
+                'Poplatek            00203211212\r\n')
+        handle = BytesIO((line[:48] + '0000000002O0' + line[60:]).encode('cp1250'))
+        payments = list(DummyGpcStatementParser().parse(handle))
+
+        self.assertEqual([(p.identifier, p.amount) for p in payments], [('0000000000222', None)])
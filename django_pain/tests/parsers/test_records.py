@@ -0,0 +1,125 @@
+"""Test RecordBankStatementParser."""
+import json
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+from typing import IO, Dict, List
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from djmoney.money import Money
+
+from django_pain.models import BankAccount
+from django_pain.parsers.records import Column, RecordBankStatementParser, date_parser, parse_amount
+from django_pain.tests.utils import get_account
+
+
+def get_statement(records: List[Dict[str, str]]) -> IO[bytes]:
+    """Return bank statement with records as JSON lines."""
+    return BytesIO(b''.join(json.dumps(record).encode() + b'\n' for record in records))
+
+
+class DummyRecordParser(RecordBankStatementParser):
+    """Parser of records given as JSON lines."""
+
+    columns = {
+        'account': Column('ACCOUNT'),
+        'identifier': Column('ID'),
+        'transaction_date': Column('DATE', date_parser('%d.%m.%Y')),
+        'counter_account_number': Column('COUNTER_ACCOUNT', default='0/0000'),
+        'amount': Column('AMOUNT', lambda value: value.replace(',', '.')),
+        'variable_symbol': Column('VS'),
+    }
+
+    def iter_records(self, bank_statement):
+        return (json.loads(line) for line in bank_statement)
+
+
+class TestDateParser(SimpleTestCase):
+    """Test date_parser."""
+
+    def test_parse(self):
+        self.assertEqual(date_parser('%d.%m.%Y')('20.12.2012'), datetime(2012, 12, 20))
+        self.assertEqual(date_parser('%Y-%m-%d')('2012-12-20'), datetime(2012, 12, 20))
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            date_parser('%d.%m.%Y')('2012-12-20')
+
+
+class TestColumn(SimpleTestCase):
+    """Test Column."""
+
+    def test_get_value(self):
+        self.assertEqual(Column('A').get_value({'A': 'value'}), 'value')
+        self.assertEqual(Column('A', int).get_value({'A': '42'}), 42)
+
+    def test_get_value_default(self):
+        self.assertEqual(Column('A', int).get_value({'A': ''}), '')
+        self.assertEqual(Column('A', int, default=None).get_value({}), None)
+
+    def test_get_value_invalid(self):
+        self.assertEqual(Column('A', int).get_value({'A': 'value'}), 'value')
+        self.assertEqual(Column('A', date_parser('%d.%m.%Y')).get_value({'A': '32.12.2012'}), '32.12.2012')
+
+
+class TestParseAmount(SimpleTestCase):
+    """Test parse_amount."""
+
+    def test_parse(self):
+        self.assertEqual(parse_amount('100.50'), Decimal('100.50'))
+
+    def test_parse_missing(self):
+        self.assertIsNone(parse_amount(''))
+        self.assertIsNone(parse_amount(None))
+
+    def test_parse_invalid(self):
+        self.assertIsNone(parse_amount('1O0'))
+
+
+class TestRecordBankStatementParser(TestCase):
+    """Test RecordBankStatementParser."""
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/0300', currency='CZK')
+        self.account.save()
+        self.other_account = get_account(account_number='654321/0300', currency='EUR')
+        self.other_account.save()
+
+    def test_parse(self):
+        records = [
+            {'ACCOUNT': '123456/0300', 'ID': 'PAYMENT_1', 'DATE': '20.12.2012', 'COUNTER_ACCOUNT': '98765/4321',
+             'AMOUNT': '100,50', 'VS': '1234'},
+            {'ACCOUNT': '654321/0300', 'ID': 'PAYMENT_2', 'DATE': '21.12.2012', 'AMOUNT': '-10', 'VS': ''},
+            {'ACCOUNT': '123456/0300', 'ID': 'PAYMENT_3', 'DATE': '22.12.2012', 'AMOUNT': '1'},
+        ]
+        with self.assertNumQueries(2):
+            payments = list(DummyRecordParser().parse(get_statement(records)))
+
+        self.assertEqual(
+            [(p.account, p.identifier, p.transaction_date, p.counter_account_number, p.amount, p.variable_symbol)
+             for p in payments],
+            [(self.account, 'PAYMENT_1', datetime(2012, 12, 20), '98765/4321', Money('100.50', 'CZK'), '1234'),
+             (self.other_account, 'PAYMENT_2', datetime(2012, 12, 21), '0/0000', Money('-10', 'EUR'), ''),
+             (self.account, 'PAYMENT_3', datetime(2012, 12, 22), '0/0000', Money('1', 'CZK'), '')])
+        for payment in payments:
+            payment.full_clean()
+
+    def test_parse_account_not_exists(self):
+        records = [{'ACCOUNT': '111111/0300', 'ID': 'PAYMENT_1', 'DATE': '20.12.2012', 'AMOUNT': '1'}]
+        with self.assertRaisesMessage(BankAccount.DoesNotExist, 'Bank account 111111/0300 does not exist.'):
+            list(DummyRecordParser().parse(get_statement(records)))
+
+    def test_parse_invalid_values(self):
+        records = [
+            {'ACCOUNT': '123456/0300', 'ID': 'PAYMENT_1', 'DATE': '20.12.2012', 'AMOUNT': ''},
+            {'ACCOUNT': '123456/0300', 'ID': 'PAYMENT_2', 'DATE': '32.12.2012', 'AMOUNT': '1'},
+            {'ACCOUNT': '123456/0300', 'ID': 'PAYMENT_3', 'DATE': '22.12.2012', 'AMOUNT': '1O0'},
+        ]
+        payments = list(DummyRecordParser().parse(get_statement(records)))
+
+        self.assertEqual([payment.identifier for payment in payments], ['PAYMENT_1', 'PAYMENT_2', 'PAYMENT_3'])
+        for payment, field in zip(payments, ['amount', 'transaction_date', 'amount']):
+            with self.assertRaises(ValidationError) as context:
+                payment.full_clean(exclude=['account'], validate_unique=False)
+            self.assertEqual(list(context.exception.message_dict), [field])
@@ -5,12 +5,14 @@ from io import BytesIO
 from django.test import TestCase
 from djmoney.money import Money
 
-from django_pain.models import BankAccount
-from django_pain.parsers.transproc import TransprocXMLParser
+from django_pain.models import BankAccount, BankPayment
+from django_pain.parsers.transproc import StreamingTransprocXMLParser, TransprocXMLParser
 
 
 class TestTransprocXMLParser(TestCase):
-    """Test FioXMLParser."""
+    """Test TransprocXMLParser."""
+
+    parser_class = TransprocXMLParser
 
     XML_INPUT = b'''<?xml version="1.0" encoding="UTF-8"?>
         <statements>
@@ -50,7 +52,7 @@ class TestTransprocXMLParser(TestCase):
     def test_parse(self):
         account = BankAccount(account_number='123456789/0123', currency='CZK')
         account.save()
-        parser = TransprocXMLParser()
+        parser = self.parser_class()
         payments = list(parser.parse(BytesIO(self.XML_INPUT)))
 
         payment1 = {
@@ -87,7 +89,51 @@ class TestTransprocXMLParser(TestCase):
 
     def test_parse_account_not_exists(self):
         """Parser should raise an exception if bank account does not exist."""
-        parser = TransprocXMLParser()
+        parser = self.parser_class()
         with self.assertRaisesRegex(BankAccount.DoesNotExist, 'Bank account 123456789/0123 does not exist.'):
             output = parser.parse(BytesIO(self.XML_INPUT))
             next(output)
+
+    def test_parse_equal(self):
+        """Test payments are equal to payments created by model constructor."""
+        account = BankAccount(account_number='123456789/0123', currency='CZK')
+        account.save()
+        parser = self.parser_class()
+        payments = list(parser.parse(BytesIO(self.XML_INPUT)))
+        expected = [
+            BankPayment(identifier='111', account=account, transaction_date=datetime(2012, 12, 20),
+                        counter_account_number='123456777/0123', counter_account_name='Company Inc.',
+                        amount=Money('1000.00', 'CZK'), description='See you later', constant_symbol='0558',
+                        variable_symbol='11111111', specific_symbol=''),
+            BankPayment(identifier='222', account=account, transaction_date=datetime(2012, 12, 20),
+                        counter_account_number='123456888/1234', counter_account_name='Company Ltd.',
+                        amount=Money('2000.00', 'CZK'), description='', constant_symbol='0558',
+                        variable_symbol='', specific_symbol='600'),
+        ]
+
+        self.assertEqual([self._get_values(p) for p in payments], [self._get_values(p) for p in expected])
+        with self.assertNumQueries(0):
+            for payment in payments:
+                self.assertEqual(payment.account, account)
+
+    @staticmethod
+    def _get_values(payment):
+        """Return instance attributes of payment except of the random UUID."""
+        return {name: value for name, value in payment.__dict__.items() if name not in ('_state', 'uuid')}
+
+
+class TestStreamingTransprocXMLParser(TestTransprocXMLParser):
+    """Test StreamingTransprocXMLParser."""
+
+    parser_class = StreamingTransprocXMLParser
+
+    def test_parse_item_before_header(self):
+        """Streaming parser should raise an exception if statement item precedes account header."""
+        account = BankAccount(account_number='123456789/0123', currency='CZK')
+        account.save()
+        # Move bank code of the account behind items.
+        xml_input = self.XML_INPUT.replace(b'<account_bank_code>0123</account_bank_code>', b'', 1)
+        xml_input = xml_input.replace(b'</items>', b'</items><account_bank_code>0123</account_bank_code>')
+        parser = StreamingTransprocXMLParser()
+        with self.assertRaisesMessage(ValueError, 'Statement item precedes account header.'):
+            list(parser.parse(BytesIO(xml_input)))
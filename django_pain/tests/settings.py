@@ -7,6 +7,7 @@ INSTALLED_APPS = [
     'django.contrib.auth',
     'django.contrib.sessions',
     'django.contrib.admin',
+    'django.contrib.messages',
     'djmoney',
     'django_pain.apps.DjangoPainConfig',
 ]
@@ -14,6 +15,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
 DATABASES = {
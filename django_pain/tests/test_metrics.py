@@ -0,0 +1,120 @@
+"""Test metrics."""
+from django.db import connection
+from django.test import TestCase, override_settings
+from testfixtures import LogCapture
+
+from django_pain import metrics
+from django_pain.models import BankAccount
+from django_pain.tests.utils import get_memory_metrics_backend
+
+
+class TestMemoryMetricsBackend(TestCase):
+    """Test MemoryMetricsBackend."""
+
+    def test_metrics(self):
+        """Test timings and counts are summed up."""
+        backend = metrics.MemoryMetricsBackend()
+        backend.timing('stage', 1.5)
+        backend.timing('stage', 0.5)
+        backend.timing('stage', 1, processor='dummy')
+        backend.count('counter', 2)
+        backend.count('counter', 3)
+        backend.count('counter', 1, processor='dummy')
+
+        self.assertEqual(backend.get_timing('stage'), 2)
+        self.assertEqual(backend.get_timing('stage', processor='dummy'), 1)
+        self.assertEqual(backend.get_timing('other'), 0)
+        self.assertEqual(backend.get_count('counter'), 5)
+        self.assertEqual(backend.get_count('counter', processor='dummy'), 1)
+        self.assertEqual(backend.get_count('other'), 0)
+
+    def test_reset(self):
+        """Test reset."""
+        backend = metrics.MemoryMetricsBackend()
+        backend.timing('stage', 1)
+        backend.count('counter', 1)
+        backend.reset()
+
+        self.assertEqual(backend.get_timing('stage'), 0)
+        self.assertEqual(backend.get_count('counter'), 0)
+
+
+class TestLoggingMetricsBackend(TestCase):
+    """Test LoggingMetricsBackend."""
+
+    def test_metrics(self):
+        """Test metrics are logged."""
+        backend = metrics.LoggingMetricsBackend()
+        with LogCapture('django_pain.metrics') as log:
+            backend.timing('stage', 1.5, processor='dummy')
+            backend.count('counter', 2)
+
+        log.check(
+            ('django_pain.metrics', 'INFO', 'stage [processor=dummy]: 1.500000 s'),
+            ('django_pain.metrics', 'INFO', 'counter []: 2'),
+        )
+
+
+@override_settings(PAIN_METRICS_BACKEND='django_pain.metrics.MemoryMetricsBackend')
+class TestStage(TestCase):
+    """Test measuring stages."""
+
+    def setUp(self):
+        self.backend = get_memory_metrics_backend()
+
+    def test_get_backend(self):
+        """Test get_backend returns the same instance of configured backend."""
+        self.assertIsInstance(self.backend, metrics.MemoryMetricsBackend)
+        self.assertIs(metrics.get_backend(), self.backend)
+
+    def test_measure(self):
+        """Test measure."""
+        with metrics.measure('stage', processor='dummy') as stage:
+            list(BankAccount.objects.all())
+            list(BankAccount.objects.all())
+
+        self.assertEqual(stage.queries, 2)
+        self.assertEqual(self.backend.get_count('stage.queries', processor='dummy'), 2)
+        self.assertGreater(self.backend.get_timing('stage', processor='dummy'), 0)
+
+    def test_iterate(self):
+        """Test measuring retrieval of items."""
+        stage = metrics.Stage('stage')
+        items = [BankAccount.objects.count() for i in range(3)]
+        self.assertEqual(list(stage.iterate(iter(items))), [0, 0, 0])
+        self.assertEqual(stage.queries, 0)
+
+        def generate():
+            for i in range(3):
+                yield BankAccount.objects.count()
+
+        for item in stage.iterate(generate()):
+            # Queries outside of the stage are not counted.
+            BankAccount.objects.count()
+        stage.emit()
+
+        self.assertEqual(self.backend.get_count('stage.queries'), 3)
+
+    def test_iterate_execute_wrapper(self):
+        """Test execute wrapper is installed once for the whole iteration and removed afterwards."""
+        stage = metrics.Stage('stage')
+        wrappers = []
+        for item in stage.iterate(range(3)):
+            wrappers.append(list(connection.execute_wrappers))
+            with metrics.measure('other'):
+                BankAccount.objects.count()
+
+        self.assertEqual(wrappers, [[stage]] * 3)
+        self.assertEqual(connection.execute_wrappers, [])
+        self.assertEqual(stage.queries, 0)
+        self.assertEqual(self.backend.get_count('other.queries'), 3)
+
+        iterator = stage.iterate(range(3))
+        next(iterator)
+        iterator.close()
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_count(self):
+        """Test count."""
+        metrics.count('counter', 2, processor='dummy')
+        self.assertEqual(self.backend.get_count('counter', processor='dummy'), 2)
@@ -1,10 +1,13 @@
 """Test models."""
+from decimal import Decimal
+
 from django.core.exceptions import ValidationError
 from django.db.models import BLANK_CHOICE_DASH
-from django.test import SimpleTestCase, override_settings
+from django.test import SimpleTestCase, TestCase, override_settings
 from djmoney.money import Money
 
 from django_pain.models import BankAccount, BankPayment
+from django_pain.tests.utils import get_account, get_payment
 
 
 class TestBankAccount(SimpleTestCase):
@@ -33,8 +36,71 @@ class TestBankPayment(SimpleTestCase):
                                                     'than bank account 123 (USD).'):
             payment.clean()
 
+    def test_constraint_currency_code(self):
+        """Test clean method compares currency codes without construction of money."""
+        account = BankAccount(account_number='123', currency='USD')
+        payment = BankPayment(identifier='PAYMENT', account=account, amount=Decimal('999.00'), amount_currency='CZK')
+        with self.assertRaisesMessage(ValidationError, 'Bank payment PAYMENT is in different currency (CZK) '
+                                                       'than bank account 123 (USD).'):
+            payment.clean()
+        self.assertIsInstance(payment.__dict__['amount'], Decimal)
+
+    def test_clean_amount(self):
+        for amount in (Decimal('999.00'), Money('0.0000000001', 'USD'), Decimal('-1E+53'), '12.5',
+                       Decimal('1.000000000000'), Decimal('9' * 54 + '.' + '9' * 10)):
+            with self.subTest(amount=amount):
+                BankPayment(amount=amount, amount_currency='USD').clean_amount()
+
+    def test_clean_amount_invalid(self):
+        for amount in (Decimal('0.00000000001'), Decimal('1E+54'), Decimal('9' * 55 + '.5'), Decimal('NaN'),
+                       Decimal('Infinity')):
+            with self.subTest(amount=amount):
+                with self.assertRaisesMessage(ValidationError, 'Ensure that amount has at most 64 digits '
+                                                               'and 10 decimal places.'):
+                    BankPayment(amount=amount, amount_currency='USD').clean_amount()
+
+    def test_clean_amount_null(self):
+        payment = BankPayment()
+        payment.__dict__['amount'] = None
+        with self.assertRaises(ValidationError) as context:
+            payment.clean_amount()
+        self.assertEqual(context.exception.error_dict['amount'][0].code, 'null')
+
+    def test_clean_fields(self):
+        """Test amount errors are reported together with errors of other fields."""
+        payment = BankPayment(identifier='', amount=Decimal('0.00000000001'), amount_currency='USD')
+        with self.assertRaises(ValidationError) as context:
+            payment.clean_fields(exclude=['account'])
+        self.assertEqual(set(context.exception.error_dict), {'identifier', 'transaction_date', 'counter_account_number',
+                                                             'amount'})
+
+    def test_clean_fields_exclude_amount(self):
+        payment = BankPayment(identifier='PAYMENT', amount=Decimal('0.00000000001'), amount_currency='USD')
+        payment.clean_fields(exclude=['account', 'transaction_date', 'counter_account_number', 'amount'])
+
     @override_settings(PAIN_PROCESSORS=['django_pain.tests.utils.DummyPaymentProcessor'])
     def test_objective_choices(self):
         self.assertEqual(BankPayment.objective_choices(), BLANK_CHOICE_DASH + [
             ('django_pain.tests.utils.DummyPaymentProcessor', 'Dummy objective'),
         ])
+
+
+class TestBankPaymentDeferredAmount(TestCase):
+    """Test validation of BankPayment loaded with deferred amount."""
+
+    def test_full_clean(self):
+        account = get_account(account_number='123456/7890', currency='CZK')
+        account.save()
+        get_payment(account=account).save()
+
+        BankPayment.objects.defer('amount').get().full_clean()
+
+    def test_clean_amount(self):
+        account = get_account(account_number='123456/7890', currency='CZK')
+        account.save()
+        get_payment(account=account).save()
+        payment = BankPayment.objects.defer('amount').get()
+
+        with self.assertNumQueries(1):
+            payment.clean_amount()
+        self.assertEqual(payment.amount, Money('42.00', 'CZK'))
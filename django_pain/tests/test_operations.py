@@ -0,0 +1,57 @@
+"""Test migration operations."""
+from unittest.mock import patch
+
+from django.apps import apps
+from django.db import NotSupportedError, connection, models
+from django.db.migrations.state import ProjectState
+from django.test import SimpleTestCase
+
+from django_pain.operations import AddIndexConcurrently
+
+
+class TestAddIndexConcurrently(SimpleTestCase):
+    """Test AddIndexConcurrently operation."""
+
+    def setUp(self):
+        self.operation = AddIndexConcurrently(model_name='bankpayment',
+                                              index=models.Index(fields=['state'], name='test_state_idx'))
+        self.from_state = ProjectState.from_apps(apps)
+        self.to_state = self.from_state.clone()
+        self.operation.state_forwards('django_pain', self.to_state)
+
+    def test_state_forwards(self):
+        """Test index is added to model state."""
+        self.assertIn('test_state_idx', [index.name for index in
+                                         self.to_state.models['django_pain', 'bankpayment'].options['indexes']])
+
+    def test_describe(self):
+        """Test operation description."""
+        self.assertEqual(self.operation.describe(),
+                         'Concurrently create index test_state_idx on field(s) state of model bankpayment')
+
+    def test_postgresql(self):
+        """Test index is created and dropped concurrently on PostgreSQL."""
+        schema_editor = connection.schema_editor(collect_sql=True, atomic=False)
+        with patch.object(connection, 'vendor', 'postgresql'):
+            self.operation.database_forwards('django_pain', schema_editor, self.from_state, self.to_state)
+            self.operation.database_backwards('django_pain', schema_editor, self.to_state, self.from_state)
+
+        self.assertEqual(len(schema_editor.collected_sql), 2)
+        self.assertTrue(schema_editor.collected_sql[0].startswith(
+            'CREATE INDEX CONCURRENTLY "test_state_idx" ON "django_pain_bankpayment"'))
+        self.assertEqual(schema_editor.collected_sql[1], 'DROP INDEX CONCURRENTLY "test_state_idx";')
+
+    def test_postgresql_atomic(self):
+        """Test index cannot be created concurrently in atomic migration."""
+        schema_editor = connection.schema_editor(collect_sql=True, atomic=True)
+        with patch.object(connection, 'vendor', 'postgresql'):
+            with self.assertRaisesMessage(NotSupportedError, 'cannot be created concurrently in atomic migration'):
+                self.operation.database_forwards('django_pain', schema_editor, self.from_state, self.to_state)
+
+    def test_other_database(self):
+        """Test index is created as usual on other databases."""
+        schema_editor = connection.schema_editor(collect_sql=True, atomic=True)
+        self.operation.database_forwards('django_pain', schema_editor, self.from_state, self.to_state)
+
+        self.assertEqual(len(schema_editor.collected_sql), 1)
+        self.assertTrue(schema_editor.collected_sql[0].startswith('CREATE INDEX "test_state_idx"'))
@@ -0,0 +1,137 @@
+"""Test processors."""
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from djmoney.money import Money
+
+from django_pain.constants import PaymentState
+from django_pain.models import BankPayment
+from django_pain.processors import AsyncPaymentProcessor, PaymentSnapshot, ProcessPaymentResult
+from django_pain.tests.utils import DummyPaymentProcessor, get_account, get_payment
+
+
+class TestPaymentSnapshot(TestCase):
+    """Test PaymentSnapshot."""
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/7890')
+        self.account.save()
+        self.payment = get_payment(account=self.account, variable_symbol='1234')
+        self.payment.save()
+
+    def test_from_payment(self):
+        """Test from_payment."""
+        snapshot = PaymentSnapshot.from_payment(self.payment)
+        self.assertEqual(snapshot.uuid, self.payment.uuid)
+        self.assertEqual(snapshot.identifier, 'PAYMENT1')
+        self.assertEqual(snapshot.account_number, '123456/7890')
+        self.assertEqual(snapshot.transaction_date, date(2018, 5, 9))
+        self.assertEqual(snapshot.amount, Money('42.00', 'CZK'))
+        self.assertEqual(snapshot.state, PaymentState.IMPORTED)
+        self.assertEqual(snapshot.variable_symbol, '1234')
+
+    def test_from_payment_account(self):
+        """Test from_payment with provided account."""
+        other_account = get_account(account_number='987654/3210')
+        with self.assertNumQueries(0):
+            snapshot = PaymentSnapshot.from_payment(self.payment, other_account)
+        self.assertEqual(snapshot.account_number, '987654/3210')
+
+    def test_immutable(self):
+        """Test snapshot cannot be modified."""
+        snapshot = PaymentSnapshot.from_payment(self.payment)
+        with self.assertRaises(AttributeError):
+            snapshot.state = PaymentState.PROCESSED  # type: ignore
+        with self.assertRaises(AttributeError):
+            snapshot.extra = 'value'  # type: ignore
+
+
+class TestAbstractPaymentProcessor(SimpleTestCase):
+    """Test AbstractPaymentProcessor."""
+
+    def test_assign_payments(self):
+        """Test assign_payments calls assign_payment for each payment."""
+        class AssignPaymentProcessor(DummyPaymentProcessor):
+            def assign_payment(self, payment, client_id):
+                return ProcessPaymentResult(result=payment.identifier == client_id, objective='Objective')
+
+        payments = [get_payment(identifier='PAYMENT_1'), get_payment(identifier='PAYMENT_2')]
+        self.assertEqual(list(AssignPaymentProcessor().assign_payments(payments, 'PAYMENT_2')), [
+            ProcessPaymentResult(result=False, objective='Objective'),
+            ProcessPaymentResult(result=True, objective='Objective'),
+        ])
+
+
+class TestAsyncPaymentProcessor(SimpleTestCase):
+    """Test AsyncPaymentProcessor."""
+
+    def test_process_payments(self):
+        """Test synchronous process_payments is not supported."""
+        class DummyAsyncPaymentProcessor(AsyncPaymentProcessor):
+            default_objective = 'Async objective'
+
+            async def process_payments_async(self, payments):
+                return []
+
+            def assign_payment(self, payment, client_id):
+                return ProcessPaymentResult(result=False, objective='')
+
+        with self.assertRaisesMessage(NotImplementedError, 'process_payments_async'):
+            DummyAsyncPaymentProcessor().process_payments([get_payment()])
+
+
+class TestGetPaymentFilter(TestCase):
+    """Test AbstractPaymentProcessor.get_payment_filter."""
+
+    def setUp(self):
+        self.account = get_account(account_number='123456/7890')
+        self.account.save()
+        other_account = get_account(account_number='654321/7890')
+        other_account.save()
+        get_payment(identifier='PAYMENT_1', account=self.account, variable_symbol='1234').save()
+        get_payment(identifier='PAYMENT_2', account=self.account, variable_symbol='5678').save()
+        get_payment(identifier='PAYMENT_3', account=self.account, amount=Money('1000.00', 'CZK')).save()
+        get_payment(identifier='PAYMENT_4', account=self.account, amount=Money('1.00', 'EUR')).save()
+        get_payment(identifier='PAYMENT_5', account=other_account).save()
+
+    def _get_identifiers(self, processor):
+        return sorted(BankPayment.objects.filter(processor.get_payment_filter()).values_list('identifier', flat=True))
+
+    def test_no_criteria(self):
+        self.assertIsNone(DummyPaymentProcessor().get_payment_filter())
+
+    def test_accounts(self):
+        class AccountPaymentProcessor(DummyPaymentProcessor):
+            accounts = ['123456/7890']
+
+        self.assertEqual(self._get_identifiers(AccountPaymentProcessor()),
+                         ['PAYMENT_1', 'PAYMENT_2', 'PAYMENT_3', 'PAYMENT_4'])
+
+    def test_currencies(self):
+        class CurrencyPaymentProcessor(DummyPaymentProcessor):
+            currencies = ['EUR', 'USD']
+
+        self.assertEqual(self._get_identifiers(CurrencyPaymentProcessor()), ['PAYMENT_4'])
+
+    def test_variable_symbol_regex(self):
+        class SymbolPaymentProcessor(DummyPaymentProcessor):
+            variable_symbol_regex = '^12'
+
+        self.assertEqual(self._get_identifiers(SymbolPaymentProcessor()), ['PAYMENT_1'])
+
+    def test_amounts(self):
+        class AmountPaymentProcessor(DummyPaymentProcessor):
+            min_amount = Decimal('1.00')
+            max_amount = Decimal('42.00')
+
+        self.assertEqual(self._get_identifiers(AmountPaymentProcessor()),
+                         ['PAYMENT_1', 'PAYMENT_2', 'PAYMENT_4', 'PAYMENT_5'])
+
+    def test_combined(self):
+        class CombinedPaymentProcessor(DummyPaymentProcessor):
+            accounts = ['123456/7890']
+            currencies = ['CZK']
+            min_amount = Decimal('100')
+
+        self.assertEqual(self._get_identifiers(CombinedPaymentProcessor()), ['PAYMENT_3'])
@@ -0,0 +1,47 @@
+"""Test settings."""
+from django.test import SimpleTestCase, override_settings
+
+from django_pain.models import BankPayment
+from django_pain.settings import get_processor_instance, get_processor_instances
+from django_pain.tests.utils import DummyPaymentProcessor
+
+
+class CountingPaymentProcessor(DummyPaymentProcessor):
+    """Processor counting its instances."""
+
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+
+
+@override_settings(PAIN_PROCESSORS=['django_pain.tests.test_settings.CountingPaymentProcessor'])
+class TestProcessorInstances(SimpleTestCase):
+    """Test cached instances of payment processors."""
+
+    def setUp(self):
+        get_processor_instance.cache_clear()
+        CountingPaymentProcessor.instances = 0
+
+    def test_get_processor_instance(self):
+        """Test processor is created once."""
+        processor = get_processor_instance(CountingPaymentProcessor)
+        self.assertIsInstance(processor, CountingPaymentProcessor)
+        self.assertIs(get_processor_instance(CountingPaymentProcessor), processor)
+        self.assertEqual(get_processor_instances(), [processor])
+        BankPayment.objective_choices()
+        self.assertEqual(CountingPaymentProcessor.instances, 1)
+
+    def test_cache_clear(self):
+        """Test processors are created again after cache is reset."""
+        processor = get_processor_instance(CountingPaymentProcessor)
+        get_processor_instance.cache_clear()
+        self.assertIsNot(get_processor_instance(CountingPaymentProcessor), processor)
+        self.assertEqual(CountingPaymentProcessor.instances, 2)
+
+    def test_setting_changed(self):
+        """Test processors are created again after processors setting changes."""
+        processor = get_processor_instance(CountingPaymentProcessor)
+        with override_settings(PAIN_PROCESSORS=[]):
+            self.assertEqual(get_processor_instances(), [])
+        self.assertIsNot(get_processor_instance(CountingPaymentProcessor), processor)
@@ -2,7 +2,7 @@
 from django.test import SimpleTestCase
 
 from django_pain.models.bank import BankAccount
-from django_pain.utils import full_class_name
+from django_pain.utils import chunked, full_class_name
 
 
 class TestUtils(SimpleTestCase):
@@ -10,3 +10,9 @@ class TestUtils(SimpleTestCase):
     def test_str(self):
         """Test full_class_name."""
         self.assertEqual(full_class_name(BankAccount), 'django_pain.models.bank.BankAccount')
+
+    def test_chunked(self):
+        """Test chunked."""
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked(iter(range(4)), 2)), [[0, 1], [2, 3]])
+        self.assertEqual(list(chunked([], 2)), [])
@@ -4,6 +4,7 @@ from typing import Any
 
 from djmoney.money import Money
 
+from django_pain import metrics
 from django_pain.models import BankAccount, BankPayment
 from django_pain.processors import AbstractPaymentProcessor
 
@@ -43,3 +44,11 @@ def get_payment(**kwargs: Any) -> BankPayment:
     }
     default.update(kwargs)
     return BankPayment(**default)
+
+
+def get_memory_metrics_backend() -> metrics.MemoryMetricsBackend:
+    """Return configured memory metrics backend with all metrics deleted."""
+    backend = metrics.get_backend()
+    assert isinstance(backend, metrics.MemoryMetricsBackend), 'PAIN_METRICS_BACKEND has to be MemoryMetricsBackend.'
+    backend.reset()
+    return backend
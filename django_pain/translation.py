@@ -1,7 +1,7 @@
 """Translation module for django-modeltranslation."""
 from modeltranslation import translator
 
-from django_pain.models import BankPayment
+from django_pain.models import ArchivedBankPayment, BankPayment
 
 
 @translator.register(BankPayment)
@@ -9,3 +9,10 @@ class BankPaymentTranslationOptions(translator.TranslationOptions):
     """Translate field ``objective``."""
 
     fields = ('objective',)
+
+
+@translator.register(ArchivedBankPayment)
+class ArchivedBankPaymentTranslationOptions(translator.TranslationOptions):
+    """Translate field ``objective``, so archived payments keep translations of their objectives."""
+
+    fields = ('objective',)
@@ -1,6 +1,19 @@
 """Various utils."""
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
 
 
 def full_class_name(cls):
     """Return full class name includeing the module path."""
     return "%s.%s" % (cls.__module__, cls.__qualname__)
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split iterable into lists of at most ``size`` items."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
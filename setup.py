@@ -24,7 +24,7 @@ setup(name='django-pain',
       url='https://github.com/stinovlas/django-pain',
       author='Jan Musílek',
       author_email='jan.musilek@nic.cz',
-      packages=find_packages(),
+      packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
       install_requires=INSTALL_REQUIRES,
       extras_require=EXTRAS_REQUIRE,
       classifiers=[